@@ -20,7 +20,7 @@ import statsmodels.formula.api as smf
 # Suppress convergence warnings for cleaner output
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-from analysis.toolkit import load_columns, cohens_d
+from analysis.toolkit import load_columns, cohens_d, ols_many
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -52,132 +52,129 @@ ALL_COLUMNS = [
 # Helper: run a single regression test and return structured results
 # ---------------------------------------------------------------------------
 
-def run_regression_test(
-    df: pd.DataFrame,
+def unadjusted_effect(
+    subset: pd.DataFrame,
     outcome: str,
     predictor: str,
-    controls: list[str],
-    predictor_is_continuous: bool = False,
+    predictor_is_continuous: bool,
 ) -> dict[str, Any]:
-    """Run OLS regression: outcome ~ predictor + controls.
-
-    Returns unadjusted means/effect, adjusted coefficients, R-squared,
-    significance, and the largest control variable coefficient.
-    """
-    cols_needed = [outcome, predictor] + controls
-    subset = df[cols_needed].dropna().copy()
-
-    if len(subset) < 50:
-        return {"error": f"Too few complete cases: {len(subset)}", "n": len(subset)}
-
-    # --- Unadjusted effect ---
+    """Bivariate effect on the complete-case subset: correlation or group means."""
     if predictor_is_continuous:
         from scipy import stats as sp_stats
         r, p = sp_stats.pearsonr(subset[predictor].astype(float), subset[outcome].astype(float))
-        unadjusted = {
+        return {
             "type": "correlation",
             "r": round(r, 4),
             "p": p,
             "n": len(subset),
         }
-    else:
-        subset[predictor] = subset[predictor].astype(str)
-        group_means = subset.groupby(predictor)[outcome].agg(["mean", "count"]).round(4)
-        group_dict = {
-            str(idx): {"mean": float(row["mean"]), "n": int(row["count"])}
-            for idx, row in group_means.iterrows()
-        }
-        # For 2-group: Cohen's d
-        groups = list(group_dict.keys())
-        if len(groups) == 2:
-            g1 = subset.loc[subset[predictor] == groups[0], outcome]
-            g2 = subset.loc[subset[predictor] == groups[1], outcome]
-            d = cohens_d(g1, g2)
-            unadjusted = {"type": "group_means", "groups": group_dict, "cohens_d": round(d, 4)}
-        else:
-            # For 3+ groups, compute max spread
-            means = [v["mean"] for v in group_dict.values()]
-            spread = max(means) - min(means)
-            unadjusted = {"type": "group_means", "groups": group_dict, "max_spread": round(spread, 4)}
-
-    # --- Adjusted effect (OLS) ---
-    # Encode categorical variables
-    for c in [predictor] + controls:
-        if subset[c].dtype == object or subset[c].dtype.name == "category":
-            subset[c] = subset[c].astype("category")
-
-    # Build formula
-    if predictor_is_continuous:
-        pred_term = f"Q('{predictor}')"
-    else:
-        pred_term = f"C(Q('{predictor}'))"
-
-    formula_parts = [pred_term]
-    for c in controls:
-        if subset[c].dtype.name == "category":
-            formula_parts.append(f"C(Q('{c}'))")
-        else:
-            formula_parts.append(f"Q('{c}')")
-
-    formula = f"Q('{outcome}') ~ " + " + ".join(formula_parts)
-
-    try:
-        model = smf.ols(formula, data=subset).fit()
-    except Exception as e:
-        return {"error": str(e), "n": len(subset)}
-
-    # Extract predictor coefficients
-    predictor_coeffs = {}
-    for k, v in model.params.items():
-        if predictor in str(k):
-            predictor_coeffs[str(k)] = {
-                "coef": round(float(v), 4),
-                "pvalue": float(model.pvalues[k]),
-                "significant": bool(model.pvalues[k] < 0.05),
-            }
 
-    # Is predictor still significant? (any predictor term p < 0.05)
-    predictor_significant = any(
-        v["pvalue"] < 0.05 for v in predictor_coeffs.values()
+    labels = subset[predictor].astype(str)
+    group_means = subset.groupby(labels)[outcome].agg(["mean", "count"]).round(4)
+    group_dict = {
+        str(idx): {"mean": float(row["mean"]), "n": int(row["count"])}
+        for idx, row in group_means.iterrows()
+    }
+    # For 2-group: Cohen's d
+    groups = list(group_dict.keys())
+    if len(groups) == 2:
+        g1 = subset.loc[labels == groups[0], outcome]
+        g2 = subset.loc[labels == groups[1], outcome]
+        d = cohens_d(g1, g2)
+        return {"type": "group_means", "groups": group_dict, "cohens_d": round(d, 4)}
+    # For 3+ groups, compute max spread
+    means = [v["mean"] for v in group_dict.values()]
+    spread = max(means) - min(means)
+    return {"type": "group_means", "groups": group_dict, "max_spread": round(spread, 4)}
+
+
+def run_regression_tests(
+    df: pd.DataFrame,
+    outcomes: list[str],
+    predictor: str,
+    controls: list[str],
+    predictor_is_continuous: bool = False,
+) -> dict[str, dict[str, Any]]:
+    """Run OLS regression: outcome ~ predictor + controls, for several outcomes.
+
+    Outcomes sharing a predictor and controls are fitted together with
+    toolkit.ols_many, which factorizes each complete-case design matrix once.
+    Returns {outcome: result} with the same fields as run_regression_test.
+    """
+    full = ols_many(df, outcomes, predictor, controls, predictor_is_continuous, min_n=50)
+    # Predictor-only fits on the same complete cases as the full model
+    controls_complete = df[controls].notna().all(axis=1)
+    predictor_only = ols_many(
+        df.loc[controls_complete], outcomes, predictor, [], predictor_is_continuous, min_n=50
     )
 
-    # Find the control with the largest absolute coefficient
-    control_coeffs = {}
-    for k, v in model.params.items():
-        if k == "Intercept" or predictor in str(k):
+    results = {}
+    for outcome in outcomes:
+        model = full[outcome]
+        if "error" in model:
+            results[outcome] = {"error": f"Too few complete cases: {model['n']}", "n": model["n"]}
             continue
-        control_coeffs[str(k)] = {
-            "coef": round(float(v), 4),
-            "abs_coef": round(abs(float(v)), 4),
-            "pvalue": float(model.pvalues[k]),
+        subset = df[[outcome, predictor] + controls].dropna()
+        coefficients = model["coefficients"]
+
+        # Extract predictor coefficients
+        predictor_coeffs = {
+            term: {
+                "coef": round(v["coef"], 4),
+                "pvalue": v["pvalue"],
+                "significant": bool(v["pvalue"] < 0.05),
+            }
+            for term, v in coefficients.items()
+            if predictor in term
         }
 
-    largest_control = None
-    if control_coeffs:
-        largest_key = max(control_coeffs, key=lambda k: control_coeffs[k]["abs_coef"])
-        largest_control = {
-            "term": largest_key,
-            "coef": control_coeffs[largest_key]["coef"],
-            "pvalue": control_coeffs[largest_key]["pvalue"],
+        # Is predictor still significant? (any predictor term p < 0.05)
+        predictor_significant = any(
+            v["pvalue"] < 0.05 for v in predictor_coeffs.values()
+        )
+
+        # Find the control with the largest absolute coefficient
+        control_coeffs = {
+            term: v for term, v in coefficients.items()
+            if term != "Intercept" and predictor not in term
+        }
+        largest_control = None
+        if control_coeffs:
+            largest_key = max(control_coeffs, key=lambda k: round(abs(control_coeffs[k]["coef"]), 4))
+            largest_control = {
+                "term": largest_key,
+                "coef": round(control_coeffs[largest_key]["coef"], 4),
+                "pvalue": control_coeffs[largest_key]["pvalue"],
+            }
+
+        pred_only = predictor_only[outcome]
+        results[outcome] = {
+            "n": model["n"],
+            "unadjusted": unadjusted_effect(subset, outcome, predictor, predictor_is_continuous),
+            "r_squared_predictor_only": (
+                round(pred_only["r_squared"], 5) if "error" not in pred_only else None
+            ),
+            "r_squared_full": round(model["r_squared"], 5),
+            "predictor_coefficients": predictor_coeffs,
+            "predictor_still_significant": predictor_significant,
+            "largest_control": largest_control,
         }
+    return results
 
-    # Also run predictor-only model for comparison R-squared
-    formula_pred_only = f"Q('{outcome}') ~ {pred_term}"
-    try:
-        model_pred_only = smf.ols(formula_pred_only, data=subset).fit()
-        r2_pred_only = round(float(model_pred_only.rsquared), 5)
-    except Exception:
-        r2_pred_only = None
-
-    return {
-        "n": len(subset),
-        "unadjusted": unadjusted,
-        "r_squared_predictor_only": r2_pred_only,
-        "r_squared_full": round(float(model.rsquared), 5),
-        "predictor_coefficients": predictor_coeffs,
-        "predictor_still_significant": predictor_significant,
-        "largest_control": largest_control,
-    }
+
+def run_regression_test(
+    df: pd.DataFrame,
+    outcome: str,
+    predictor: str,
+    controls: list[str],
+    predictor_is_continuous: bool = False,
+) -> dict[str, Any]:
+    """Run OLS regression: outcome ~ predictor + controls.
+
+    Returns unadjusted means/effect, adjusted coefficients, R-squared,
+    significance, and the largest control variable coefficient.
+    """
+    return run_regression_tests(df, [outcome], predictor, controls, predictor_is_continuous)[outcome]
 
 
 def format_p(p: float) -> str:
@@ -247,14 +244,11 @@ def main():
         "pregnancy", "mythical", "brutality", "mentalalteration",
         "obedience", "gentleness", "transform", "incest",
     ]
-    results["2_politics_kinks"] = {}
-    for kink in top_politics_kinks:
-        print(f"Test 2: Politics → {kink} (controls: biomale, straightness)")
-        r = run_regression_test(
-            df, outcome=kink, predictor="politics",
-            controls=["biomale", "straightness"]
-        )
-        results["2_politics_kinks"][kink] = r
+    print(f"Test 2: Politics → {len(top_politics_kinks)} kinks (controls: biomale, straightness)")
+    results["2_politics_kinks"] = run_regression_tests(
+        df, outcomes=top_politics_kinks, predictor="politics",
+        controls=["biomale", "straightness"]
+    )
 
     # ==== TEST 3: Gender → pain (give/receive) ====
     print("Test 3a: Gender → receivepain (controls: age, straightness, politics)")
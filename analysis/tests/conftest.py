@@ -0,0 +1,22 @@
+"""Shared fixtures for the analysis tests."""
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import analysis.toolkit as toolkit  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def column_cache_dir(tmp_path_factory: pytest.TempPathFactory):
+    """Keep the on-disk column cache out of the user's cache dir for the whole run."""
+    cache_dir = tmp_path_factory.mktemp("column-cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(toolkit, "COLUMN_CACHE_DIR", cache_dir)
+        yield cache_dir
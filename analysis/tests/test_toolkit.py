@@ -4,26 +4,57 @@ from __future__ import annotations
 from pathlib import Path
 import sys
 
+import duckdb
 import numpy as np
 import pandas as pd
 import pytest
+from scipy import stats
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+import analysis.toolkit as toolkit
 from analysis.toolkit import (
     bootstrap_ci,
     bootstrap_diff,
+    bootstrap_many,
     cohens_d,
+    cohens_d_sql,
+    cohens_d_stream,
+    compact_dtypes,
     cramers_v,
+    cramers_v_matrix,
+    cramers_v_stream,
+    find_optimal_k,
+    ols_many,
     load_columns,
+    load_data,
+    memory_report,
     pearson_with_ci,
+    pearson_with_ci_sql,
+    pearson_with_ci_stream,
+    permutation_test,
+    permutation_test_groups,
+    quantiles_stream,
+    QuantileSketch,
+    RunningMoments,
     scan_correlations,
     scan_group_diffs,
+    scan_group_diffs_sql,
+    stats_cube,
     missingness_by_group,
+    missingness_by_group_sql,
+    missingness_clusters,
+    missingness_matrix,
     winsorized_mean,
+    rake_weights,
+    weighted_bootstrap_ci,
+    weighted_cohens_d,
+    weighted_group_means,
     compare_binnings,
+    quantile_stat,
+    winsorized_mean_stat,
     KINK_INTENSITY_COLUMNS,
 )
 
@@ -68,6 +99,141 @@ def test_bootstrap_diff_detects_significance(base_df: pd.DataFrame) -> None:
     assert result["n_b"] > 100
 
 
+def test_bootstrap_ci_matches_per_resample_loop(base_df: pd.DataFrame) -> None:
+    data = base_df["sadomasochism"].dropna().values
+    rng = np.random.default_rng(7)
+    loop_stats = [np.median(rng.choice(data, size=len(data), replace=True)) for _ in range(200)]
+    expected = np.quantile(loop_stats, [0.025, 0.975])
+    ci = bootstrap_ci(
+        base_df["sadomasochism"], stat_func=np.median, n_boot=200, seed=7, method="resample"
+    )
+    assert (ci["ci_low"], ci["ci_high"]) == tuple(expected)
+
+
+def test_bootstrap_diff_matches_per_resample_loop(base_df: pd.DataFrame) -> None:
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    a, b = men.dropna().values, women.dropna().values
+    rng = np.random.default_rng(11)
+    loop_diffs = [
+        np.mean(rng.choice(a, size=len(a), replace=True))
+        - np.mean(rng.choice(b, size=len(b), replace=True))
+        for _ in range(200)
+    ]
+    expected = np.quantile(loop_diffs, [0.025, 0.975])
+    result = bootstrap_diff(men, women, n_boot=200, seed=11, method="resample")
+    assert (result["ci_low"], result["ci_high"]) == tuple(expected)
+
+
+def test_bootstrap_diff_independent_of_block_size(
+    base_df: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    default = bootstrap_diff(men, women, n_boot=300, method="resample")
+    monkeypatch.setattr(toolkit, "BOOTSTRAP_BLOCK_ELEMENTS", 5_000)
+    assert bootstrap_diff(men, women, n_boot=300, method="resample") == default
+
+
+def test_count_bootstrap_agrees_with_resampling(base_df: pd.DataFrame) -> None:
+    series = base_df["sadomasochism"]
+    for stat_func in (np.mean, np.std, winsorized_mean_stat()):
+        counts = bootstrap_ci(series, stat_func=stat_func, n_boot=2000, method="counts")
+        resampled = bootstrap_ci(series, stat_func=stat_func, n_boot=2000, method="resample")
+        width = resampled["ci_high"] - resampled["ci_low"]
+        assert counts["estimate"] == resampled["estimate"]
+        assert counts["ci_low"] == pytest.approx(resampled["ci_low"], abs=0.1 * width)
+        assert counts["ci_high"] == pytest.approx(resampled["ci_high"], abs=0.1 * width)
+
+
+def test_count_bootstrap_rejects_ineligible_input() -> None:
+    continuous = pd.Series(np.linspace(0, 1, 500))
+    with pytest.raises(ValueError):
+        bootstrap_ci(continuous, method="counts")
+    with pytest.raises(ValueError):
+        bootstrap_ci(pd.Series([1.0, 2.0, 3.0] * 10), stat_func=lambda x: x[0], method="counts")
+
+
+def test_axis_statistics_match_scalar_versions(base_df: pd.DataFrame) -> None:
+    series = base_df["sadomasochism"]
+    assert winsorized_mean_stat()(series.dropna().values) == pytest.approx(winsorized_mean(series))
+    ci = bootstrap_ci(series, stat_func=quantile_stat(0.25), n_boot=200)
+    assert ci["estimate"] == pytest.approx(series.quantile(0.25))
+
+
+def test_parallel_bootstrap_independent_of_worker_count(base_df: pd.DataFrame) -> None:
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    serial = bootstrap_diff(men, women, n_boot=600, method="resample", workers=1)
+    assert bootstrap_diff(men, women, n_boot=600, method="resample", workers=2) == serial
+
+    series = {"men": men, "women": women, "empty": pd.Series([], dtype=float)}
+    many = bootstrap_many(series, stat_func=quantile_stat(0.5), n_boot=600, workers=2)
+    pd.testing.assert_frame_equal(many, bootstrap_many(series, stat_func=quantile_stat(0.5), n_boot=600))
+    assert many["ci_low"].iloc[:2].notna().all()
+    assert np.isnan(many["ci_low"].iloc[2])
+
+
+def test_parallel_bootstrap_rejects_unpicklable_statistic(base_df: pd.DataFrame) -> None:
+    series = base_df["sadomasochism"]
+    with pytest.raises(ValueError, match="picklable"):
+        bootstrap_ci(series, stat_func=lambda x: np.mean(x), n_boot=200, workers=2)
+    serial = bootstrap_ci(series, stat_func=lambda x: np.mean(x), n_boot=200, method="resample", workers=1)
+    assert serial["ci_low"] < serial["ci_high"]
+
+
+def test_compact_dtypes_preserves_values() -> None:
+    df = pd.DataFrame({
+        "scale": [0.0, 5.0, 3.0, 1.0],
+        "gated": [1.0, np.nan, 4.0, 2.0],
+        "count": [0.0, 300.0, 12.0, 7.0],
+        "score": [0.5, 1.25, np.nan, 2.0],
+        "label": ["a", "b", "a", "a"],
+    })
+    compact = compact_dtypes(df)
+    assert compact.dtypes.astype(str).to_dict() == {
+        "scale": "int8", "gated": "Int8", "count": "int16", "score": "float64", "label": "category",
+    }
+    for column in ["scale", "gated", "count", "score"]:
+        np.testing.assert_array_equal(compact[column].to_numpy(dtype=float, na_value=np.nan), df[column])
+    assert compact["label"].tolist() == df["label"].tolist()
+    assert memory_report(compact).attrs["total_bytes"] < memory_report(df).attrs["total_bytes"]
+
+
+def test_load_columns_serves_from_column_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    parquet_path = tmp_path / "sample.parquet"
+    duckdb.sql(
+        "SELECT * FROM (VALUES (1, 2.5, 'a', true), (NULL, NULL, NULL, NULL), (3, 0.0, 'b', false)) "
+        "AS t(scale, score, label, flag)"
+    ).write_parquet(str(parquet_path))
+    monkeypatch.setattr(toolkit, "COLUMN_CACHE_DIR", tmp_path / "cache")
+    columns = ["flag", "label", "scale", "score"]
+
+    expected = load_columns(columns, parquet_path=parquet_path, use_cache=False)
+    cold = load_columns(columns, parquet_path=parquet_path)
+    warm = load_columns(columns, parquet_path=parquet_path)
+    pd.testing.assert_frame_equal(cold, expected)
+    pd.testing.assert_frame_equal(warm, expected)
+    fingerprint_dir = tmp_path / "cache" / toolkit.dataset_fingerprint(parquet_path)
+    assert len(list(fingerprint_dir.glob("*.json"))) == len(columns)
+
+    warm.loc[0, "score"] = -1.0
+    assert load_columns(["score"], parquet_path=parquet_path).loc[0, "score"] == 2.5
+
+    duckdb.sql("SELECT 7 AS scale").write_parquet(str(parquet_path))
+    assert load_columns(["scale"], parquet_path=parquet_path)["scale"].tolist() == [7]
+    assert not fingerprint_dir.exists()
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_load_columns_compact() -> None:
+    df = load_columns(["sadomasochism", "politics"], compact=True)
+    assert str(df["sadomasochism"].dtype) == "Int8"
+    assert df["politics"].dtype == "category"
+
+
 def test_pearson_with_ci_valid(base_df: pd.DataFrame) -> None:
     result = pearson_with_ci(base_df["agreeablenessvariable"], base_df["lightbondage"])
     assert -1 <= result["r"] <= 1
@@ -82,6 +248,16 @@ def test_cramers_v_range() -> None:
     assert 0 <= v <= 1
 
 
+def test_cramers_v_matrix_matches_pairwise(base_df: pd.DataFrame) -> None:
+    df = base_df.assign(male=base_df["biomale"].map({1: "M", 0: "F"}))
+    columns = ["politics", "straightness", "male"]
+    v, n = cramers_v_matrix(df, columns)
+    for ci in columns:
+        for cj in columns:
+            assert v.loc[ci, cj] == pytest.approx(cramers_v(df[ci], df[cj]))
+            assert n.loc[ci, cj] == (df[ci].notna() & df[cj].notna()).sum()
+
+
 def test_scan_group_diffs_returns_results(base_df: pd.DataFrame) -> None:
     result = scan_group_diffs(base_df, "politics", ["sadomasochism", "lightbondage"])
     assert len(result) > 0
@@ -89,6 +265,16 @@ def test_scan_group_diffs_returns_results(base_df: pd.DataFrame) -> None:
     assert all(result["effect_size"] >= 0)
 
 
+def test_scan_group_diffs_matches_per_group_means(base_df: pd.DataFrame) -> None:
+    result = scan_group_diffs(base_df, "politics", ["lightbondage", "politics"]).set_index("outcome")
+    assert list(result.index) == ["lightbondage"]
+    row = result.loc["lightbondage"]
+    for group, mean in row["group_means"].items():
+        values = base_df.loc[base_df["politics"].astype(str) == group, "lightbondage"].dropna()
+        assert mean == pytest.approx(values.mean())
+        assert row["group_ns"][group] == len(values)
+
+
 def test_scan_correlations_returns_sorted(base_df: pd.DataFrame) -> None:
     result = scan_correlations(
         base_df,
@@ -99,12 +285,262 @@ def test_scan_correlations_returns_sorted(base_df: pd.DataFrame) -> None:
     assert result["abs_r"].is_monotonic_decreasing
 
 
+def test_scan_correlations_matches_pearsonr(
+    base_df: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(toolkit, "SCAN_BLOCK_ELEMENTS", len(base_df))
+    result = scan_correlations(base_df, ["agreeablenessvariable", "politics"], ["sadomasochism", "lightbondage"])
+    assert set(result["x"]) == {"agreeablenessvariable"}
+    for row in result.itertuples():
+        mask = base_df[row.x].notna() & base_df[row.y].notna()
+        r, p = stats.pearsonr(base_df.loc[mask, row.x], base_df.loc[mask, row.y])
+        assert row.n == mask.sum()
+        assert row.r == pytest.approx(round(r, 4))
+        assert row.p == pytest.approx(p, rel=1e-6)
+
+
+def test_ols_many_matches_statsmodels(base_df: pd.DataFrame) -> None:
+    import statsmodels.formula.api as smf
+
+    outcomes = ["sadomasochism", "lightbondage", "agreeablenessvariable"]
+    results = ols_many(base_df, outcomes, "politics", ["biomale", "straightness"])
+    for outcome in outcomes:
+        subset = base_df[[outcome, "politics", "biomale", "straightness"]].dropna().copy()
+        subset["politics"] = subset["politics"].astype(str)
+        model = smf.ols(
+            f"Q('{outcome}') ~ C(Q('politics')) + Q('biomale') + C(Q('straightness'))", data=subset
+        ).fit()
+        result = results[outcome]
+        assert result["n"] == len(subset)
+        assert result["r_squared"] == pytest.approx(model.rsquared)
+        assert list(result["coefficients"]) == [str(term) for term in model.params.index]
+        for term, coef in result["coefficients"].items():
+            assert coef["coef"] == pytest.approx(model.params[term])
+            assert coef["se"] == pytest.approx(model.bse[term])
+            assert coef["pvalue"] == pytest.approx(model.pvalues[term], rel=1e-6, abs=1e-300)
+
+
 def test_missingness_by_group_valid(base_df: pd.DataFrame) -> None:
     result = missingness_by_group(base_df, "sadomasochism", "politics")
     assert "pct_missing" in result.columns
     assert len(result) > 0
 
 
+def test_find_optimal_k_parallel_and_sampled_modes() -> None:
+    rng = np.random.default_rng(0)
+    centers = np.array([[0, 0, 0], [5, 5, 0], [0, 5, 5]])
+    df = pd.DataFrame(
+        np.vstack([center + rng.normal(size=(300, 3)) for center in centers]), columns=["a", "b", "c"]
+    )
+    serial = find_optimal_k(df, ["a", "b", "c"], range(2, 5), n_jobs=1)
+    assert find_optimal_k(df, ["a", "b", "c"], range(2, 5), n_jobs=2) == serial
+
+    sampled = find_optimal_k(
+        df, ["a", "b", "c"], range(2, 5), method="minibatch", warm_start=True, sample_size=300
+    )
+    assert [row["k"] for row in sampled] == [2, 3, 4]
+    best = max(sampled, key=lambda row: row["silhouette"])
+    assert best["k"] == 3
+    assert best["inertia"] == pytest.approx(serial[1]["inertia"], rel=0.2)
+
+    # Same fits with compute_labels=True report the exact full-data inertia.
+    exact = find_optimal_k(df, ["a", "b", "c"], range(2, 5), method="minibatch", warm_start=True)
+    for estimated, full in zip(sampled, exact):
+        assert estimated["inertia"] == pytest.approx(full["inertia"], rel=0.1)
+
+
+def test_missingness_matrix_and_clusters() -> None:
+    df = pd.DataFrame({
+        "screener": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "gated_a": [1.0, np.nan, 2.0, np.nan, 3.0, np.nan],
+        "gated_b": [4.0, np.nan, 5.0, np.nan, 6.0, np.nan],
+        "other": [np.nan, 1.0, 2.0, 3.0, 4.0, np.nan],
+    })
+    columns = list(df.columns)
+    matrix = missingness_matrix(df, columns)
+    for ci in columns:
+        for cj in columns:
+            assert matrix.loc[ci, cj] == (df[ci].notna() & df[cj].notna()).mean()
+
+    clusters = missingness_clusters(df, columns)
+    assert list(clusters["column"]) == ["gated_a", "gated_b", "other"]
+    assert list(clusters["cluster"]) == [1, 1, 2]
+    assert list(clusters["cluster_size"]) == [2, 2, 1]
+
+
+def test_sql_push_down_matches_pandas(base_df: pd.DataFrame) -> None:
+    conn, _ = load_data(columns=["biomale"])
+    try:
+        men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+        women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+        assert cohens_d_sql(conn, "lightbondage", "biomale", 1, 0) == pytest.approx(cohens_d(men, women))
+
+        expected = pearson_with_ci(base_df["agreeablenessvariable"], base_df["lightbondage"])
+        result = pearson_with_ci_sql(conn, "agreeablenessvariable", "lightbondage")
+        assert result == pytest.approx(expected)
+
+        pd.testing.assert_frame_equal(
+            missingness_by_group_sql(conn, "sadomasochism", "politics"),
+            missingness_by_group(base_df, "sadomasochism", "politics"),
+        )
+
+        outcomes = ["sadomasochism", "lightbondage"]
+        men_only = base_df[base_df["biomale"] == 1]
+        for source, where, frame in [(conn, None, base_df), (conn, "biomale = 1", men_only),
+                                     (conn.sql("SELECT * FROM data WHERE biomale = 1"), None, men_only)]:
+            sql_result = scan_group_diffs_sql(source, "politics", outcomes, where=where)
+            pandas_result = scan_group_diffs(frame, "politics", outcomes)
+            assert list(sql_result["outcome"]) == list(pandas_result["outcome"])
+            assert list(sql_result["group_ns"]) == list(pandas_result["group_ns"])
+            assert list(sql_result["effect_size"]) == list(pandas_result["effect_size"])
+    finally:
+        conn.close()
+
+
+def test_streaming_matches_in_memory(base_df: pd.DataFrame, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(toolkit, "STREAM_BATCH_ROWS", 997)
+    conn, _ = load_data(columns=["biomale"])
+    try:
+        men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+        women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+        assert cohens_d_stream(conn, "lightbondage", "biomale", 1, 0) == pytest.approx(cohens_d(men, women))
+
+        result = pearson_with_ci_stream(conn, "agreeablenessvariable", "lightbondage")
+        expected = pearson_with_ci(base_df["agreeablenessvariable"], base_df["lightbondage"])
+        assert result == pytest.approx(expected)
+
+        v = cramers_v_stream(conn, "politics", "straightness")
+        assert v == pytest.approx(cramers_v(base_df["politics"], base_df["straightness"]))
+
+        summary = quantiles_stream(conn, "lightbondage", quantiles=(0.25, 0.5, 0.75))
+        assert summary["exact"]
+        assert summary["std"] == pytest.approx(base_df["lightbondage"].std())
+        assert list(summary["quantiles"].values()) == list(base_df["lightbondage"].quantile([0.25, 0.5, 0.75]))
+    finally:
+        conn.close()
+
+
+def test_accumulators_merge_like_one_pass() -> None:
+    values = np.random.default_rng(3).normal(size=50_000)
+    merged, merged_sketch = RunningMoments(), QuantileSketch(max_centroids=200)
+    for chunk in np.array_split(values, 7):
+        merged.merge(RunningMoments().update(chunk))
+        merged_sketch.merge(QuantileSketch(max_centroids=200).update(chunk))
+    assert merged.n == len(values)
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.variance() == pytest.approx(values.var(ddof=1))
+    assert not merged_sketch.exact
+    for q in (0.05, 0.5, 0.95):
+        assert merged_sketch.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.02)
+
+
+def test_stats_cube_matches_row_level(
+    base_df: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(toolkit, "COLUMN_CACHE_DIR", tmp_path / "cache")
+    outcomes = ["lightbondage", "sadomasochism", "agreeablenessvariable"]
+    built = stats_cube(outcomes, ["biomale", "politics"])
+    cube = stats_cube(outcomes, ["biomale", "politics"])
+    assert list(cube.levels) == list(built.levels)
+    assert list(cube.is_scale) == [True, True, False]
+
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    assert cube.cohens_d("lightbondage", "biomale", 1, 0) == pytest.approx(cohens_d(men, women))
+    welch = stats.ttest_ind(men.dropna(), women.dropna(), equal_var=False)
+    result = cube.welch_test("lightbondage", "biomale", 1, 0)
+    assert (result["t"], result["p"]) == pytest.approx((welch.statistic, welch.pvalue))
+    assert cube.bootstrap_diff("lightbondage", "biomale", 1, 0, n_boot=500) == bootstrap_diff(
+        men, women, n_boot=500, method="counts"
+    )
+    with pytest.raises(ValueError):
+        cube.bootstrap_ci("agreeablenessvariable", "biomale", 1)
+    with pytest.raises(ValueError, match="not a 0-5 scale"):
+        cube.cohens_d("agreeablenessvariable", "biomale", 1, 0)
+    with pytest.raises(ValueError, match="not a 0-5 scale"):
+        cube.welch_test("agreeablenessvariable", "biomale", 1, 0)
+
+    means = cube.group_means("politics", "sadomasochism").set_index("level")
+    expected = base_df.groupby("politics")["sadomasochism"].agg(["count", "mean"])
+    assert list(means["n"]) == list(expected["count"])
+    assert np.allclose(means["mean"], expected["mean"])
+    from_cube = cube.scan_group_diffs("politics")
+    from_rows = scan_group_diffs(base_df, "politics", outcomes)
+    assert list(from_cube["outcome"]) == list(from_rows["outcome"])
+    assert list(from_cube["group_ns"]) == list(from_rows["group_ns"])
+
+
+def test_permutation_test_engines_agree(base_df: pd.DataFrame) -> None:
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    counts = permutation_test(men, women, n_perm=2000, method="counts")
+    shuffled = permutation_test(men, women, n_perm=2000, method="shuffle")
+    assert counts["diff"] == pytest.approx(men.mean() - women.mean())
+    welch_p = stats.ttest_ind(men.dropna(), women.dropna(), equal_var=False).pvalue
+    assert counts["p"] == pytest.approx(welch_p, abs=0.005)
+    assert shuffled["p"] == pytest.approx(welch_p, abs=0.005)
+    assert permutation_test(men, women, n_perm=1500, workers=1) == permutation_test(
+        men, women, n_perm=1500, workers=2
+    )
+    assert permutation_test(men, women, n_perm=2000, alternative="less")["p"] < counts["p"]
+
+    result = permutation_test_groups(base_df, "lightbondage", "politics", n_perm=2000)
+    groups = [g.dropna() for _, g in base_df.groupby("politics")["lightbondage"]]
+    anova = stats.f_oneway(*groups)
+    assert result["f"] == pytest.approx(anova.statistic)
+    assert result["p"] == pytest.approx(anova.pvalue, abs=0.03)
+    assert sum(result["group_ns"].values()) == sum(len(g) for g in groups)
+
+
+def test_rake_weights_validates_base_weights() -> None:
+    df = pd.DataFrame({"sex": [0, 1, 0, 1, None]}, index=[10, 11, 12, 13, 14])
+    targets = {"sex": {0: 0.5, 1: 0.5}}
+    base = pd.Series([1.0, 2.0, 1.0, 2.0, np.nan], index=df.index)
+    weights = rake_weights(df, targets, base_weights=base)
+    assert weights.attrs["converged"]
+    assert np.isnan(weights[14])
+
+    for bad in (base.replace(2.0, np.nan), base.drop(13), base.replace(2.0, 0.0)):
+        with pytest.raises(ValueError, match="base_weights"):
+            rake_weights(df, targets, base_weights=bad)
+
+
+def test_rake_weights_match_targets(base_df: pd.DataFrame) -> None:
+    targets = {
+        "biomale": {0: 0.6, 1: 0.4},
+        "straightness": {"Straight": 0.7, "Not straight": 0.3},
+        "politics": {"Liberal": 5, "Moderate": 3, "Conservative": 2},
+    }
+    weights = rake_weights(base_df, targets)
+    assert weights.attrs["converged"]
+    assert weights.mean() == pytest.approx(1.0)
+    assert 0 < weights.attrs["effective_n"] < len(base_df)
+    for column, shares in targets.items():
+        achieved = weights.groupby(base_df[column]).sum() / weights.sum()
+        total = sum(shares.values())
+        for level, share in shares.items():
+            assert achieved[level] == pytest.approx(share / total)
+
+    means = weighted_group_means(base_df, "lightbondage", "politics", weights).set_index("group")
+    liberal = base_df["politics"] == "Liberal"
+    expected = np.average(
+        base_df.loc[liberal, "lightbondage"].dropna(),
+        weights=weights[liberal & base_df["lightbondage"].notna()],
+    )
+    assert means.loc["Liberal", "mean"] == pytest.approx(expected)
+
+    ones = pd.Series(1.0, index=base_df.index)
+    men = base_df.loc[base_df["biomale"] == 1, "lightbondage"]
+    women = base_df.loc[base_df["biomale"] == 0, "lightbondage"]
+    assert weighted_cohens_d(men, women, ones) == pytest.approx(cohens_d(men, women))
+    assert weighted_bootstrap_ci(base_df["lightbondage"], ones, n_boot=500) == pytest.approx(
+        bootstrap_ci(base_df["lightbondage"], n_boot=500)
+    )
+    with pytest.raises(ValueError):
+        rake_weights(base_df, {"biomale": {1: 1.0}})
+
+
 def test_winsorized_mean_finite(base_df: pd.DataFrame) -> None:
     wm = winsorized_mean(base_df["sadomasochism"])
     assert isinstance(wm, float)
@@ -118,5 +554,21 @@ def test_compare_binnings_multiple_schemes(base_df: pd.DataFrame) -> None:
     assert all(len(v) > 0 for v in result.values())
 
 
+def test_compare_binnings_many_outcomes_match_single(base_df: pd.DataFrame) -> None:
+    outcomes = ["lightbondage", "sadomasochism", "biomale"]
+    combined = compare_binnings(base_df, "agreeablenessvariable", outcomes)
+    assert list(combined) == outcomes
+    for outcome in outcomes:
+        assert combined[outcome] == compare_binnings(base_df, "agreeablenessvariable", outcome)
+
+    edges = {"custom": [-6.0, 0.0, 6.0]}
+    result = compare_binnings(base_df, "agreeablenessvariable", "lightbondage", edges)["custom"]
+    subset = base_df[["agreeablenessvariable", "lightbondage"]].dropna()
+    low = subset.loc[subset["agreeablenessvariable"] <= 0, "lightbondage"]
+    assert result[0] == {"bin": "(-6.001, 0.0]", "mean": round(float(low.mean()), 3), "n": len(low)}
+    with pytest.raises(ValueError):
+        compare_binnings(base_df, "lightbondage", "sadomasochism")
+
+
 def test_kink_intensity_columns_nonempty() -> None:
     assert len(KINK_INTENSITY_COLUMNS) >= 30
@@ -9,14 +9,22 @@ Usage:
 """
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 import duckdb
 import numpy as np
 import pandas as pd
 from scipy import stats
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 
 from analysis.explore import DEFAULT_PARQUET_PATH, connect_data, quote_identifier
@@ -25,37 +33,311 @@ from analysis.explore import DEFAULT_PARQUET_PATH, connect_data, quote_identifie
 # Data loading
 # ---------------------------------------------------------------------------
 
+DTYPE_BACKENDS = ("numpy", "pyarrow")
+# String columns become categoricals when distinct values are at most this share of rows.
+CATEGORICAL_MAX_RATIO = 0.5
+_COMPACT_INT_TYPES = (np.int8, np.int16, np.int32)
+
+
+def _smallest_int_type(values: np.ndarray) -> type[np.signedinteger] | None:
+    """Smallest signed integer type holding every value, or None if any is fractional."""
+    present = values[~np.isnan(values)]
+    if len(present) == 0 or not np.array_equal(present, np.round(present)):
+        return None
+    low, high = present.min(), present.max()
+    for int_type in _COMPACT_INT_TYPES:
+        info = np.iinfo(int_type)
+        if info.min <= low and high <= info.max:
+            return int_type
+    return None
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of df with memory-lean dtypes.
+
+    Integer-valued numeric columns (the 0-5 scales, flags, counts) get the
+    smallest integer type that holds them: int8/int16/int32, or the nullable
+    Int8/Int16/Int32 when they contain nulls. String columns with few distinct
+    values become categoricals. Fractional floats are left as float64.
+    """
+    out: dict[str, pd.Series] = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            out[column] = series
+        elif pd.api.types.is_numeric_dtype(series):
+            int_type = _smallest_int_type(series.to_numpy(dtype=float, na_value=np.nan))
+            if int_type is None:
+                out[column] = series
+            elif series.isna().any():
+                out[column] = series.astype(pd.api.types.pandas_dtype(int_type.__name__.capitalize()))
+            else:
+                out[column] = series.astype(int_type)
+        elif series.nunique(dropna=True) <= CATEGORICAL_MAX_RATIO * len(series):
+            out[column] = series.astype("category")
+        else:
+            out[column] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+def _compact_arrow(table):
+    """Arrow counterpart of compact_dtypes: integral floats narrowed, strings dictionary-encoded."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arrays = []
+    for column in table.columns:
+        if pa.types.is_floating(column.type) or pa.types.is_integer(column.type):
+            values = column.to_numpy(zero_copy_only=False).astype(float)
+            int_type = _smallest_int_type(values)
+            if int_type is not None:
+                column = column.cast(pa.from_numpy_dtype(int_type), safe=False)
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            if pc.count_distinct(column).as_py() <= CATEGORICAL_MAX_RATIO * len(column):
+                column = column.dictionary_encode()
+        arrays.append(column)
+    return pa.table(arrays, names=table.column_names)
+
+
+def _require_pyarrow(feature: str) -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(f"{feature} requires pyarrow (pip install pyarrow)") from exc
+
+
+def _fetch_frame(
+    conn: duckdb.DuckDBPyConnection,
+    sql: str,
+    compact: bool,
+    dtype_backend: str,
+) -> pd.DataFrame:
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"dtype_backend must be one of {DTYPE_BACKENDS}, got {dtype_backend!r}")
+    if dtype_backend == "numpy":
+        df = conn.execute(sql).fetchdf()
+        return compact_dtypes(df) if compact else df
+
+    _require_pyarrow("dtype_backend='pyarrow'")
+    result = conn.execute(sql)
+    # DuckDB 1.5 renamed fetch_arrow_table to to_arrow_table.
+    table = result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+    if compact:
+        table = _compact_arrow(table)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
 def load_data(
     parquet_path: Path = DEFAULT_PARQUET_PATH,
     columns: list[str] | None = None,
+    compact: bool = False,
+    dtype_backend: str = "numpy",
 ) -> tuple[duckdb.DuckDBPyConnection, pd.DataFrame]:
     """Load the parquet into a DuckDB connection and return a full DataFrame.
 
     Returns (connection, dataframe). The connection has a `data` view.
     If columns is provided, only those columns are loaded into the DataFrame.
+    compact=True applies compact_dtypes (int8 scales, categorical strings);
+    dtype_backend="pyarrow" returns Arrow-backed columns (requires pyarrow).
+    Use memory_report() to see the resulting footprint.
     """
     conn = connect_data(parquet_path)
     if columns:
         quoted = ", ".join(quote_identifier(c) for c in columns)
-        df = conn.execute(f"SELECT {quoted} FROM data").fetchdf()
+        df = _fetch_frame(conn, f"SELECT {quoted} FROM data", compact, dtype_backend)
     else:
-        df = conn.execute("SELECT * FROM data").fetchdf()
+        df = _fetch_frame(conn, "SELECT * FROM data", compact, dtype_backend)
     return conn, df
 
 
+COLUMN_CACHE_DIR = Path(
+    os.environ.get("BKS_COLUMN_CACHE_DIR")
+    or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "bks-analysis" / "columns"
+)
+
+
+def dataset_fingerprint(parquet_path: Path = DEFAULT_PARQUET_PATH) -> str:
+    """Short key for a dataset file: hash of resolved path, size and mtime.
+
+    This is metadata, not content: a rewrite that keeps the same size and
+    mtime (e.g. a copy with preserved timestamps) keeps the same key.
+    """
+    resolved = parquet_path.resolve()
+    stat = resolved.stat()
+    raw = f"{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _column_cache_path(parquet_path: Path, column: str) -> Path:
+    column_key = hashlib.sha256(column.encode()).hexdigest()[:16]
+    return COLUMN_CACHE_DIR / dataset_fingerprint(parquet_path) / column_key
+
+
+def _claim_dataset_cache(parquet_path: Path) -> None:
+    """Record which file a dataset cache directory belongs to and evict its older versions.
+
+    Each fingerprint directory gets a `source` file holding the resolved
+    parquet path; when a new fingerprint is first written, sibling directories
+    for the same path (the file before it was regenerated) are deleted.
+    """
+    target = COLUMN_CACHE_DIR / dataset_fingerprint(parquet_path)
+    marker = target / "source"
+    if marker.exists():
+        return
+    source = str(parquet_path.resolve())
+    target.mkdir(parents=True, exist_ok=True)
+    marker.write_text(source)
+    for sibling in COLUMN_CACHE_DIR.iterdir():
+        sibling_marker = sibling / "source"
+        if sibling != target and sibling_marker.is_file() and sibling_marker.read_text() == source:
+            shutil.rmtree(sibling, ignore_errors=True)
+
+
+def _save_array(path: Path, array: np.ndarray) -> None:
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as handle:
+        np.save(handle, array, allow_pickle=False)
+    os.replace(temporary, path)
+
+
+def _write_cached_column(base: Path, column: str, series: pd.Series) -> None:
+    """Persist one column as .npy arrays plus a JSON header; unsupported dtypes are skipped.
+
+    numpy numeric/bool columns store their values; nullable extension columns
+    store values plus a null mask; string columns store int32 codes plus their
+    categories in the header. The header is written last, so a reader never
+    sees a partially written column.
+    """
+    dtype = series.dtype
+    header: dict[str, Any] = {"column": column, "dtype": str(dtype)}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        header["kind"] = "array"
+        arrays = {"values": series.to_numpy()}
+    elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.name in {
+        "Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32", "UInt64",
+        "Float32", "Float64", "boolean",
+    }:
+        header["kind"] = "masked"
+        arrays = {
+            "values": series.to_numpy(dtype=dtype.numpy_dtype, na_value=dtype.numpy_dtype.type(0)),
+            "mask": series.isna().to_numpy(),
+        }
+    elif pd.api.types.is_string_dtype(dtype) and series.map(lambda v: isinstance(v, str) or pd.isna(v)).all():
+        codes, categories = pd.factorize(series)
+        header["kind"] = "strings"
+        header["categories"] = [str(c) for c in categories]
+        arrays = {"codes": codes.astype(np.int32)}
+    else:
+        return
+
+    base.parent.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        _save_array(base.with_suffix(f".{name}.npy"), array)
+    temporary = base.with_name(f"{base.name}.{os.getpid()}.json.tmp")
+    temporary.write_text(json.dumps(header))
+    os.replace(temporary, base.with_suffix(".json"))
+
+
+def _read_cached_column(base: Path, column: str) -> pd.Series | None:
+    """Memory-map a cached column (copy-on-write, so edits never reach the file)."""
+    header_path = base.with_suffix(".json")
+    if not header_path.exists():
+        return None
+    header = json.loads(header_path.read_text())
+    if header.get("column") != column:
+        return None
+
+    def load(name: str) -> np.ndarray:
+        return np.load(base.with_suffix(f".{name}.npy"), mmap_mode="c", allow_pickle=False)
+
+    if header["kind"] == "array":
+        return pd.Series(load("values"), name=column, copy=False)
+    if header["kind"] == "masked":
+        dtype = pd.api.types.pandas_dtype(header["dtype"])
+        values = dtype.construct_array_type()(load("values"), load("mask"))
+        return pd.Series(values, name=column, copy=False)
+    # Code -1 (null) indexes the trailing None.
+    lookup = np.array(header["categories"] + [None], dtype=object)
+    return pd.Series(lookup[load("codes")], name=column, dtype=header["dtype"])
+
+
+def clear_column_cache(parquet_path: Path | None = None) -> None:
+    """Delete cached columns for one dataset, or the whole cache when parquet_path is None."""
+    target = COLUMN_CACHE_DIR if parquet_path is None else COLUMN_CACHE_DIR / dataset_fingerprint(parquet_path)
+    shutil.rmtree(target, ignore_errors=True)
+
+
+def _load_cached_columns(columns: list[str], parquet_path: Path) -> pd.DataFrame:
+    """Serve columns from the column cache, decoding only the misses from Parquet."""
+    found: dict[str, pd.Series | None] = {
+        column: _read_cached_column(_column_cache_path(parquet_path, column), column)
+        for column in dict.fromkeys(columns)
+    }
+    missing = [column for column, series in found.items() if series is None]
+    if missing:
+        conn = connect_data(parquet_path)
+        try:
+            quoted = ", ".join(quote_identifier(c) for c in missing)
+            fetched = conn.execute(f"SELECT {quoted} FROM data").fetchdf()
+        finally:
+            conn.close()
+        try:
+            _claim_dataset_cache(parquet_path)
+            for column in missing:
+                _write_cached_column(_column_cache_path(parquet_path, column), column, fetched[column])
+        except OSError:
+            pass  # the cache is best-effort; a read-only cache dir still loads from Parquet
+        for column in missing:
+            found[column] = fetched[column]
+    return pd.DataFrame({column: found[column] for column in columns}, copy=False)
+
+
 def load_columns(
     columns: list[str],
     parquet_path: Path = DEFAULT_PARQUET_PATH,
+    compact: bool = False,
+    dtype_backend: str = "numpy",
+    use_cache: bool = True,
 ) -> pd.DataFrame:
-    """Load specific columns into a DataFrame (no connection returned)."""
+    """Load specific columns into a DataFrame (no connection returned).
+
+    compact and dtype_backend behave as in load_data. With use_cache (numpy
+    backend only), columns are served from COLUMN_CACHE_DIR, keyed by
+    dataset_fingerprint: the first load decodes Parquet and writes one .npy
+    set per column, later loads memory-map them without decoding.
+
+    COLUMN_CACHE_DIR is $BKS_COLUMN_CACHE_DIR, else $XDG_CACHE_HOME (or
+    ~/.cache) /bks-analysis/columns. Invalidation is metadata-based (path,
+    size, mtime), and older versions of a file are evicted when a new version
+    is cached; call clear_column_cache() if a file is replaced by one with the
+    same size and mtime.
+    """
+    if use_cache and dtype_backend == "numpy":
+        df = _load_cached_columns(columns, parquet_path)
+        return compact_dtypes(df) if compact else df
     conn = connect_data(parquet_path)
     try:
         quoted = ", ".join(quote_identifier(c) for c in columns)
-        return conn.execute(f"SELECT {quoted} FROM data").fetchdf()
+        return _fetch_frame(conn, f"SELECT {quoted} FROM data", compact, dtype_backend)
     finally:
         conn.close()
 
 
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column memory footprint (deep), largest first.
+
+    Returns DataFrame with column, dtype, bytes; the total is attrs["total_bytes"].
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "column": usage.index,
+        "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.to_numpy(),
+    }).sort_values("bytes", ascending=False, kind="stable").reset_index(drop=True)
+    report.attrs["total_bytes"] = int(usage.sum())
+    return report
+
+
 # ---------------------------------------------------------------------------
 # Effect sizes
 # ---------------------------------------------------------------------------
@@ -95,6 +377,88 @@ def cramers_v(x: pd.Series, y: pd.Series) -> float:
     return float(np.sqrt(chi2 / (n * min_dim)))
 
 
+# Upper bound on one-hot cells materialized per row block in cramers_v_matrix (~32 MB).
+CONTINGENCY_BLOCK_ELEMENTS = 8_000_000
+
+
+def _cramers_v_from_table(table: np.ndarray) -> float:
+    """Cramér's V for a contingency table, as cramers_v computes it.
+
+    Empty rows/columns are dropped (crosstab never produces them) and the Yates
+    continuity correction is applied to 2x2 tables, as chi2_contingency does.
+    """
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0].astype(float)
+    n = table.sum()
+    min_dim = min(table.shape) - 1
+    if min_dim <= 0 or n == 0:
+        return 0.0
+    expected = table.sum(axis=1, keepdims=True) * table.sum(axis=0, keepdims=True) / n
+    observed = table
+    if (table.shape[0] - 1) * (table.shape[1] - 1) == 1:
+        diff = expected - observed
+        observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    chi2 = float(((observed - expected) ** 2 / expected).sum())
+    return float(np.sqrt(chi2 / (n * min_dim)))
+
+
+def cramers_v_matrix(
+    df: pd.DataFrame,
+    columns: list[str],
+    max_levels: int = 50,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Cramér's V for every pair of categorical columns.
+
+    Each column is dictionary-encoded once to integer codes. Every pair's
+    contingency table is then a block of one product of the stacked one-hot
+    codes (built in row blocks bounded by CONTINGENCY_BLOCK_ELEMENTS), so
+    nulls drop out pairwise without per-pair index intersection. Values match
+    cramers_v pair by pair; pairs with < 10 shared rows, and columns with more
+    than max_levels distinct values, are NaN.
+
+    Returns (v, n): square DataFrames of V and pairwise-complete row counts.
+    """
+    codes: list[np.ndarray] = []
+    offsets: list[int] = []
+    encoded: list[str] = []
+    width = 0
+    for column in dict.fromkeys(columns):
+        column_codes, uniques = pd.factorize(df[column], sort=True)
+        if len(uniques) > max_levels:
+            continue
+        codes.append(column_codes)
+        offsets.append(width)
+        encoded.append(column)
+        width += len(uniques)
+
+    counts = np.zeros((width, width), dtype=np.int64)
+    block_rows = min(2 ** 24, max(1, CONTINGENCY_BLOCK_ELEMENTS // max(width, 1)))
+    for start in range(0, len(df), block_rows):
+        rows = min(block_rows, len(df) - start)
+        one_hot = np.zeros((rows, width), dtype=np.float32)
+        for column_codes, offset in zip(codes, offsets):
+            block = column_codes[start:start + rows]
+            present = np.flatnonzero(block >= 0)
+            one_hot[present, offset + block[present]] = 1.0
+        counts += np.rint(one_hot.T @ one_hot).astype(np.int64)
+
+    labels = list(dict.fromkeys(columns))
+    position = {column: labels.index(column) for column in encoded}
+    v = np.full((len(labels), len(labels)), np.nan)
+    n = np.zeros((len(labels), len(labels)), dtype=np.int64)
+    bounds = offsets + [width]
+    for i, ci in enumerate(encoded):
+        for j in range(i, len(encoded)):
+            table = counts[bounds[i]:bounds[i + 1], bounds[j]:bounds[j + 1]]
+            a, b = position[ci], position[encoded[j]]
+            n[a, b] = n[b, a] = table.sum()
+            if n[a, b] >= 10:
+                v[a, b] = v[b, a] = _cramers_v_from_table(table)
+    return (
+        pd.DataFrame(v, index=labels, columns=labels),
+        pd.DataFrame(n, index=labels, columns=labels),
+    )
+
+
 def pearson_with_ci(
     x: pd.Series,
     y: pd.Series,
@@ -121,21 +485,377 @@ def pearson_with_ci(
 # Bootstrap confidence intervals
 # ---------------------------------------------------------------------------
 
+# Upper bound on resample indices held in memory at once (~16 MB of int64).
+BOOTSTRAP_BLOCK_ELEMENTS = 2_000_000
+# Samples with at most this many distinct values can be bootstrapped on value counts.
+COUNT_BOOTSTRAP_MAX_LEVELS = 64
+# Replicates per independently seeded chunk when bootstrapping with `workers`.
+BOOTSTRAP_PARALLEL_CHUNK = 500
+BOOTSTRAP_METHODS = ("auto", "counts", "resample")
+
+
+class AxisStatistic:
+    """A statistic that works on one sample and, row-wise, on a block of resamples.
+
+    Calling it on a 1-D array returns a scalar; `batch` takes a 2-D array with one
+    resample per row and returns one value per row. The optional `counts` form
+    takes a (replicates, k) matrix of value counts plus the k sorted values, which
+    enables the multinomial fast path for low-cardinality data.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[np.ndarray], float],
+        batch: Callable[[np.ndarray], np.ndarray],
+        name: str,
+        counts: Callable[[np.ndarray, np.ndarray], np.ndarray] | None = None,
+    ) -> None:
+        self.func = func
+        self.batch = batch
+        self.name = name
+        self.counts = counts
+
+    def __call__(self, values: np.ndarray) -> float:
+        return float(self.func(np.asarray(values)))
+
+    def __repr__(self) -> str:
+        return f"AxisStatistic({self.name})"
+
+
+def _values_at_rank(counts: np.ndarray, values: np.ndarray, rank: int) -> np.ndarray:
+    """Per row, the value at 0-based `rank` of the sorted sample described by counts."""
+    cumulative = counts.cumsum(axis=1)
+    return values[(cumulative <= rank).sum(axis=1)]
+
+
+def _count_quantile(counts: np.ndarray, values: np.ndarray, q: float) -> np.ndarray:
+    """np.quantile's default linear interpolation, computed from value counts."""
+    n = int(counts[0].sum())
+    position = (n - 1) * q
+    lower_rank = int(np.floor(position))
+    lower = _values_at_rank(counts, values, lower_rank)
+    upper = _values_at_rank(counts, values, min(lower_rank + 1, n - 1))
+    return lower + (upper - lower) * (position - lower_rank)
+
+
+def _count_mean(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return counts @ values / counts.sum(axis=1)
+
+
+def _count_var(counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    n = counts.sum(axis=1)
+    mean = counts @ values / n
+    return counts @ (values ** 2) / n - mean ** 2
+
+
+def _quantile_batch(block: np.ndarray, q: float) -> np.ndarray:
+    return np.quantile(block, q, axis=1)
+
+
+def _winsorized_batch(block: np.ndarray, limits: tuple[float, float]) -> np.ndarray:
+    n = block.shape[1]
+    low_idx = int(limits[0] * n)
+    high_idx = n - int(limits[1] * n) - 1
+    ordered = np.sort(block, axis=1)
+    clipped = np.clip(block, ordered[:, [low_idx]], ordered[:, [high_idx]])
+    return clipped.mean(axis=1)
+
+
+def _winsorized_scalar(values: np.ndarray, limits: tuple[float, float]) -> float:
+    return _winsorized_batch(np.asarray(values, dtype=float)[None, :], limits)[0]
+
+
+def _winsorized_counts(
+    counts: np.ndarray, values: np.ndarray, limits: tuple[float, float]
+) -> np.ndarray:
+    n = int(counts[0].sum())
+    low = _values_at_rank(counts, values, int(limits[0] * n))
+    high = _values_at_rank(counts, values, n - int(limits[1] * n) - 1)
+    clipped = np.clip(values[None, :], low[:, None], high[:, None])
+    return (counts * clipped).sum(axis=1) / n
+
+
+# Built from module-level functions via partial so they pickle into worker processes.
+def quantile_stat(q: float) -> AxisStatistic:
+    """Axis-aware quantile statistic for bootstrap_ci / bootstrap_diff."""
+    return AxisStatistic(
+        partial(np.quantile, q=q),
+        partial(_quantile_batch, q=q),
+        f"quantile({q})",
+        counts=partial(_count_quantile, q=q),
+    )
+
+
+def winsorized_mean_stat(limits: tuple[float, float] = (0.05, 0.05)) -> AxisStatistic:
+    """Axis-aware winsorized mean, matching scipy.stats.mstats.winsorize clipping."""
+    return AxisStatistic(
+        partial(_winsorized_scalar, limits=limits),
+        partial(_winsorized_batch, limits=limits),
+        f"winsorized_mean({limits[0]}, {limits[1]})",
+        counts=partial(_winsorized_counts, limits=limits),
+    )
+
+
+_NUMPY_BATCH_STATS: dict[Any, Callable[[np.ndarray], np.ndarray]] = {
+    np.mean: lambda block: block.mean(axis=1),
+    np.median: lambda block: np.median(block, axis=1),
+    np.std: lambda block: block.std(axis=1),
+    np.var: lambda block: block.var(axis=1),
+    np.sum: lambda block: block.sum(axis=1),
+    np.min: lambda block: block.min(axis=1),
+    np.max: lambda block: block.max(axis=1),
+    np.nanmean: lambda block: np.nanmean(block, axis=1),
+    np.nanmedian: lambda block: np.nanmedian(block, axis=1),
+}
+
+
+_NUMPY_COUNT_STATS: dict[Any, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    np.mean: _count_mean,
+    np.median: lambda counts, values: _count_quantile(counts, values, 0.5),
+    np.std: lambda counts, values: np.sqrt(np.maximum(_count_var(counts, values), 0)),
+    np.var: _count_var,
+    np.sum: lambda counts, values: counts @ values,
+    np.min: lambda counts, values: values[(counts > 0).argmax(axis=1)],
+    np.max: lambda counts, values: values[len(values) - 1 - (counts[:, ::-1] > 0).argmax(axis=1)],
+}
+
+
+def _count_statistic(stat_func) -> Callable[[np.ndarray, np.ndarray], np.ndarray] | None:
+    if isinstance(stat_func, AxisStatistic):
+        return stat_func.counts
+    return _NUMPY_COUNT_STATS.get(stat_func)
+
+
+def _value_table(sample: np.ndarray) -> tuple[np.ndarray, np.ndarray] | None:
+    """Sorted distinct values and their counts, or None if the sample is not low-cardinality numeric."""
+    if sample.dtype.kind not in "biuf":
+        return None
+    values, counts = np.unique(sample, return_counts=True)
+    if len(values) > COUNT_BOOTSTRAP_MAX_LEVELS:
+        return None
+    return values.astype(float), counts
+
+
+def _batch_statistic(stat_func) -> Callable[[np.ndarray], np.ndarray]:
+    """Row-wise version of stat_func; arbitrary callables fall back to a per-row loop."""
+    if isinstance(stat_func, AxisStatistic):
+        return stat_func.batch
+    batch = _NUMPY_BATCH_STATS.get(stat_func)
+    if batch is not None:
+        return batch
+    return lambda block: np.array([stat_func(row) for row in block], dtype=float)
+
+
+def _count_replicates(
+    tables: list[tuple[np.ndarray, np.ndarray]],
+    count_stat: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    n_boot: int,
+    rng: np.random.Generator,
+) -> list[np.ndarray]:
+    """Multinomial replicates for samples given as (sorted values, counts) tables."""
+    replicates = []
+    for values, counts in tables:
+        n = int(counts.sum())
+        draws = rng.multinomial(n, counts / n, size=n_boot)
+        replicates.append(np.asarray(count_stat(draws, values), dtype=float))
+    return replicates
+
+
+def _bootstrap_replicates(
+    samples: list[np.ndarray],
+    stat_func,
+    n_boot: int,
+    rng: np.random.Generator,
+    method: str = "auto",
+) -> list[np.ndarray]:
+    """Bootstrap replicate statistics for one or more samples.
+
+    `counts` (chosen by `auto` when every sample has at most
+    COUNT_BOOTSTRAP_MAX_LEVELS distinct numeric values and the statistic has a
+    counts form) draws each replicate as a multinomial over the k value counts:
+    O(k) per replicate instead of O(n), and equivalent in distribution to
+    resampling rows.
+
+    `resample` draws row indices in memory-bounded blocks. Each replicate draws
+    the indices for every sample in order, so the random stream is consumed
+    exactly as a per-replicate loop of `rng.choice` calls would: results are
+    identical to the loop and independent of block size.
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"method must be one of {BOOTSTRAP_METHODS}, got {method!r}")
+
+    if method != "resample":
+        count_stat = _count_statistic(stat_func)
+        tables = [_value_table(sample) for sample in samples] if count_stat else []
+        if count_stat is not None and all(table is not None for table in tables):
+            return _count_replicates(tables, count_stat, n_boot, rng)
+        if method == "counts":
+            raise ValueError(
+                "method='counts' needs a statistic with a counts form and samples with at most "
+                f"{COUNT_BOOTSTRAP_MAX_LEVELS} distinct numeric values"
+            )
+
+    batch = _batch_statistic(stat_func)
+    sizes = [len(sample) for sample in samples]
+    total = sum(sizes)
+
+    replicates = [np.empty(n_boot, dtype=float) for _ in samples]
+    block_rows = max(1, BOOTSTRAP_BLOCK_ELEMENTS // max(total, 1))
+    for start in range(0, n_boot, block_rows):
+        rows = min(block_rows, n_boot - start)
+        if len(samples) == 1:
+            blocks = [rng.integers(0, sizes[0], size=(rows, sizes[0]))]
+        else:
+            # One draw per sample per replicate: a single call with an array
+            # `high` would consume the stream in a different order.
+            blocks = [np.empty((rows, size), dtype=np.int64) for size in sizes]
+            for row in range(rows):
+                for block, size in zip(blocks, sizes):
+                    block[row] = rng.integers(0, size, size=size)
+        for out, sample, indices in zip(replicates, samples, blocks):
+            out[start:start + rows] = batch(sample[indices])
+    return replicates
+
+
+def _attach_samples(specs: list[tuple[str, tuple[int, ...], str]]):
+    """Open shared-memory blocks and return (handles, array views) for them."""
+    handles = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [
+        np.ndarray(shape, dtype=np.dtype(dtype), buffer=handle.buf)
+        for handle, (_, shape, dtype) in zip(handles, specs)
+    ]
+    return handles, arrays
+
+
+def _bootstrap_chunk(
+    specs: list[tuple[str, tuple[int, ...], str]],
+    stat_func,
+    rows: int,
+    seed_seq: np.random.SeedSequence,
+    method: str,
+) -> list[np.ndarray]:
+    """Worker entry point: one chunk of replicates over samples held in shared memory."""
+    handles, samples = _attach_samples(specs)
+    try:
+        return _bootstrap_replicates(samples, stat_func, rows, np.random.default_rng(seed_seq), method)
+    finally:
+        del samples
+        for handle in handles:
+            handle.close()
+
+
+def _parallel_replicates(
+    jobs: list[tuple[list[np.ndarray], np.random.SeedSequence]],
+    stat_func,
+    n_boot: int,
+    method: str,
+    workers: int,
+) -> list[list[np.ndarray]]:
+    """Bootstrap replicates for several jobs, split into fixed-size chunks.
+
+    Each job's replicates are cut into BOOTSTRAP_PARALLEL_CHUNK-sized chunks and
+    every chunk gets its own stream from `seed_seq.spawn`, so the chunking (and
+    therefore every result) depends only on n_boot, never on `workers`. With
+    workers > 1 the samples are copied once into shared memory and the chunks
+    run on a process pool; workers attach to the blocks instead of unpickling
+    copies of the data.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    if workers > 1:
+        try:
+            pickle.dumps(stat_func)
+        except (pickle.PicklingError, AttributeError, TypeError) as exc:
+            raise ValueError(
+                f"stat_func must be picklable to run with workers={workers} "
+                f"(use a module-level function or AxisStatistic, not a lambda or local function): {exc}"
+            ) from exc
+    chunk_rows = [
+        min(BOOTSTRAP_PARALLEL_CHUNK, n_boot - start)
+        for start in range(0, n_boot, BOOTSTRAP_PARALLEL_CHUNK)
+    ]
+    tasks = [
+        (job_index, rows, child)
+        for job_index, (_, seed_seq) in enumerate(jobs)
+        for rows, child in zip(chunk_rows, seed_seq.spawn(len(chunk_rows)))
+    ]
+    pieces: list[list[list[np.ndarray]]] = [[] for _ in jobs]
+
+    if workers == 1:
+        for job_index, rows, child in tasks:
+            samples = jobs[job_index][0]
+            pieces[job_index].append(
+                _bootstrap_replicates(samples, stat_func, rows, np.random.default_rng(child), method)
+            )
+    else:
+        blocks: list[shared_memory.SharedMemory] = []
+        try:
+            job_specs = []
+            for samples, _ in jobs:
+                specs = []
+                for sample in samples:
+                    block = shared_memory.SharedMemory(create=True, size=max(sample.nbytes, 1))
+                    blocks.append(block)
+                    np.ndarray(sample.shape, dtype=sample.dtype, buffer=block.buf)[:] = sample
+                    specs.append((block.name, sample.shape, sample.dtype.str))
+                job_specs.append(specs)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    (job_index, pool.submit(
+                        _bootstrap_chunk, job_specs[job_index], stat_func, rows, child, method
+                    ))
+                    for job_index, rows, child in tasks
+                ]
+                for job_index, future in futures:
+                    pieces[job_index].append(future.result())
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    return [
+        [np.concatenate(per_sample) for per_sample in zip(*job_pieces)]
+        for job_pieces in pieces
+    ]
+
+
+def _numeric_sample(series: pd.Series) -> np.ndarray:
+    data = series.dropna().values
+    if data.dtype.kind not in "biuf":
+        data = np.asarray(data, dtype=float)
+    return np.ascontiguousarray(data)
+
+
 def bootstrap_ci(
     series: pd.Series,
     stat_func=np.mean,
     n_boot: int = 2000,
     confidence: float = 0.95,
     seed: int = 42,
+    method: str = "auto",
+    workers: int | None = None,
 ) -> dict[str, float]:
     """Bootstrap confidence interval for any statistic.
 
+    Resamples are drawn and evaluated in vectorized blocks. NumPy reducers
+    (np.mean, np.median, ...) and AxisStatistic objects (quantile_stat,
+    winsorized_mean_stat) run across a whole block at once; any other callable
+    is applied row by row. With method="resample", results match a per-resample
+    loop for the same seed. Low-cardinality numeric data (e.g. 0-5 scales) is
+    bootstrapped on its value counts by default, which is near-instant at any n.
+
     Args:
         series: Data to bootstrap.
         stat_func: Statistic function (default: np.mean).
         n_boot: Number of bootstrap resamples.
         confidence: Confidence level.
         seed: Random seed for reproducibility.
+        method: "auto" (counts when eligible), "counts", or "resample".
+        workers: None runs one serial stream. An integer switches to chunked
+            SeedSequence-spawned streams run on that many processes; results are
+            identical for every worker count (but differ from workers=None).
+            With workers > 1, stat_func must be picklable (a module-level
+            function or AxisStatistic, not a lambda).
 
     Returns dict with keys: estimate, ci_low, ci_high, n.
     """
@@ -144,11 +864,12 @@ def bootstrap_ci(
     if n < 5:
         return {"estimate": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"), "n": n}
 
-    rng = np.random.default_rng(seed)
-    boot_stats = np.array([
-        stat_func(rng.choice(data, size=n, replace=True))
-        for _ in range(n_boot)
-    ])
+    if workers is None:
+        rng = np.random.default_rng(seed)
+        (boot_stats,) = _bootstrap_replicates([data], stat_func, n_boot, rng, method)
+    else:
+        jobs = [([_numeric_sample(series)], np.random.SeedSequence(seed))]
+        ((boot_stats,),) = _parallel_replicates(jobs, stat_func, n_boot, method, workers)
     alpha = (1 - confidence) / 2
     ci_low, ci_high = np.quantile(boot_stats, [alpha, 1 - alpha])
     return {
@@ -166,9 +887,13 @@ def bootstrap_diff(
     n_boot: int = 2000,
     confidence: float = 0.95,
     seed: int = 42,
+    method: str = "auto",
+    workers: int | None = None,
 ) -> dict[str, float]:
     """Bootstrap confidence interval for the DIFFERENCE in a statistic between two groups.
 
+    Uses the same engine, `method` and `workers` options as bootstrap_ci.
+
     Returns dict with: diff, ci_low, ci_high, n_a, n_b, significant (CI excludes 0).
     """
     a = group_a.dropna().values
@@ -177,12 +902,13 @@ def bootstrap_diff(
         return {"diff": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"),
                 "n_a": len(a), "n_b": len(b), "significant": False}
 
-    rng = np.random.default_rng(seed)
-    diffs = np.array([
-        stat_func(rng.choice(a, size=len(a), replace=True)) -
-        stat_func(rng.choice(b, size=len(b), replace=True))
-        for _ in range(n_boot)
-    ])
+    if workers is None:
+        rng = np.random.default_rng(seed)
+        boot_a, boot_b = _bootstrap_replicates([a, b], stat_func, n_boot, rng, method)
+    else:
+        jobs = [([_numeric_sample(group_a), _numeric_sample(group_b)], np.random.SeedSequence(seed))]
+        ((boot_a, boot_b),) = _parallel_replicates(jobs, stat_func, n_boot, method, workers)
+    diffs = boot_a - boot_b
     alpha = (1 - confidence) / 2
     ci_low, ci_high = np.quantile(diffs, [alpha, 1 - alpha])
     return {
@@ -195,6 +921,266 @@ def bootstrap_diff(
     }
 
 
+def bootstrap_many(
+    series: dict[str, pd.Series],
+    stat_func=np.mean,
+    n_boot: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 42,
+    method: str = "auto",
+    workers: int = 1,
+) -> pd.DataFrame:
+    """Bootstrap confidence intervals for many series in one process pool.
+
+    Each series gets its own child of SeedSequence(seed) (in dict order) and is
+    chunked like bootstrap_ci(workers=...), so results do not depend on
+    `workers`. Series with fewer than 5 non-null values get NaN intervals.
+
+    Returns DataFrame with columns: name, estimate, ci_low, ci_high, n.
+    """
+    samples = {name: _numeric_sample(values) for name, values in series.items()}
+    children = dict(zip(samples, np.random.SeedSequence(seed).spawn(len(samples))))
+    eligible = [name for name, data in samples.items() if len(data) >= 5]
+    replicates = _parallel_replicates(
+        [([samples[name]], children[name]) for name in eligible], stat_func, n_boot, method, workers
+    )
+    boot_by_name = {name: boot for name, (boot,) in zip(eligible, replicates)}
+
+    alpha = (1 - confidence) / 2
+    rows = []
+    for name, data in samples.items():
+        if name not in boot_by_name:
+            rows.append({"name": name, "estimate": float("nan"), "ci_low": float("nan"),
+                         "ci_high": float("nan"), "n": len(data)})
+            continue
+        ci_low, ci_high = np.quantile(boot_by_name[name], [alpha, 1 - alpha])
+        rows.append({
+            "name": name,
+            "estimate": float(stat_func(data)),
+            "ci_low": float(ci_low),
+            "ci_high": float(ci_high),
+            "n": len(data),
+        })
+    return pd.DataFrame(rows, columns=["name", "estimate", "ci_low", "ci_high", "n"])
+
+
+# ---------------------------------------------------------------------------
+# Permutation tests
+# ---------------------------------------------------------------------------
+
+# Upper bound on permuted labels held in memory at once (~16 MB of int64).
+PERMUTATION_BLOCK_ELEMENTS = 2_000_000
+# Permutations per independently seeded chunk when running with `workers`.
+PERMUTATION_PARALLEL_CHUNK = 1000
+PERMUTATION_METHODS = ("auto", "counts", "shuffle")
+PERMUTATION_ALTERNATIVES = ("two-sided", "greater", "less")
+
+
+def _permuted_group_sums(
+    values: np.ndarray,
+    group_sizes: np.ndarray,
+    n_perm: int,
+    rng: np.random.Generator,
+    method: str = "auto",
+) -> np.ndarray:
+    """Group sums of `values` under n_perm random relabelings, shape (n_perm, groups).
+
+    values is the pooled sample ordered by group. `shuffle` permutes label
+    codes in memory-bounded blocks and sums each block with one bincount.
+    `counts` (chosen by `auto` when values has at most
+    COUNT_BOOTSTRAP_MAX_LEVELS distinct numeric values, e.g. ordinal scales)
+    never touches rows: a relabeling only decides how many copies of each
+    distinct value every group receives, which is a multivariate
+    hypergeometric draw, sampled exactly as a chain of vectorized univariate
+    hypergeometrics. Both are exact permutation distributions; they consume the
+    random stream differently.
+    """
+    if method not in PERMUTATION_METHODS:
+        raise ValueError(f"method must be one of {PERMUTATION_METHODS}, got {method!r}")
+    k = len(group_sizes)
+
+    table = _value_table(values) if method != "shuffle" else None
+    if method == "counts" and table is None:
+        raise ValueError(
+            f"method='counts' needs at most {COUNT_BOOTSTRAP_MAX_LEVELS} distinct numeric values"
+        )
+    if table is not None:
+        levels, level_counts = table
+        remaining = np.tile(level_counts.astype(np.int64), (n_perm, 1))
+        sums = np.empty((n_perm, k))
+        for g, size in enumerate(group_sizes[:-1]):
+            draws = np.zeros_like(remaining)
+            needed = np.full(n_perm, size, dtype=np.int64)
+            left = remaining.sum(axis=1)
+            for level in range(len(levels) - 1):
+                left -= remaining[:, level]
+                draws[:, level] = rng.hypergeometric(remaining[:, level], left, needed)
+                needed -= draws[:, level]
+            draws[:, -1] = needed
+            remaining -= draws
+            sums[:, g] = draws @ levels
+        sums[:, -1] = remaining @ levels
+        return sums
+
+    n = len(values)
+    codes = np.repeat(np.arange(k), group_sizes)
+    sums = np.empty((n_perm, k))
+    block_rows = max(1, PERMUTATION_BLOCK_ELEMENTS // max(n, 1))
+    for start in range(0, n_perm, block_rows):
+        rows = min(block_rows, n_perm - start)
+        labels = rng.permuted(np.tile(codes, (rows, 1)), axis=1)
+        labels += (np.arange(rows) * k)[:, None]
+        block = np.bincount(labels.ravel(), weights=np.tile(values, rows), minlength=rows * k)
+        sums[start:start + rows] = block.reshape(rows, k)
+    return sums
+
+
+def _permutation_chunk(
+    specs: list[tuple[str, tuple[int, ...], str]],
+    group_sizes: np.ndarray,
+    rows: int,
+    seed_seq: np.random.SeedSequence,
+    method: str,
+) -> np.ndarray:
+    """Worker entry point: one chunk of permutations over a pooled sample in shared memory."""
+    handles, (values,) = _attach_samples(specs)
+    try:
+        return _permuted_group_sums(values, group_sizes, rows, np.random.default_rng(seed_seq), method)
+    finally:
+        del values
+        for handle in handles:
+            handle.close()
+
+
+def _permutation_sums(
+    values: np.ndarray,
+    group_sizes: np.ndarray,
+    n_perm: int,
+    seed: int,
+    method: str,
+    workers: int | None,
+) -> np.ndarray:
+    """Permuted group sums: one stream, or SeedSequence-spawned chunks as in bootstrap_ci(workers=...)."""
+    if workers is None:
+        return _permuted_group_sums(values, group_sizes, n_perm, np.random.default_rng(seed), method)
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+    chunk_rows = [
+        min(PERMUTATION_PARALLEL_CHUNK, n_perm - start)
+        for start in range(0, n_perm, PERMUTATION_PARALLEL_CHUNK)
+    ]
+    children = np.random.SeedSequence(seed).spawn(len(chunk_rows))
+    if workers == 1:
+        return np.concatenate([
+            _permuted_group_sums(values, group_sizes, rows, np.random.default_rng(child), method)
+            for rows, child in zip(chunk_rows, children)
+        ])
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+        specs = [(block.name, values.shape, values.dtype.str)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_permutation_chunk, specs, group_sizes, rows, child, method)
+                for rows, child in zip(chunk_rows, children)
+            ]
+            return np.concatenate([future.result() for future in futures])
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _permutation_p(observed: float, permuted: np.ndarray) -> float:
+    """(1 + #permuted at least as extreme) / (n_perm + 1), with a tolerance for rounding ties."""
+    tolerance = 1e-9 * max(1.0, abs(observed))
+    return float((1 + np.count_nonzero(permuted >= observed - tolerance)) / (len(permuted) + 1))
+
+
+def permutation_test(
+    group_a: pd.Series,
+    group_b: pd.Series,
+    n_perm: int = 10000,
+    alternative: str = "two-sided",
+    seed: int = 42,
+    method: str = "auto",
+    workers: int | None = None,
+) -> dict[str, float]:
+    """Permutation test for the difference in means between two groups.
+
+    Group labels of the pooled sample are permuted n_perm times (see
+    _permuted_group_sums for the `shuffle` and ordinal `counts` engines);
+    `workers` behaves as in bootstrap_ci. alternative is "two-sided"
+    (|diff|), "greater" (mean_a > mean_b) or "less".
+
+    Returns dict with: diff, p, n_a, n_b, n_perm.
+    """
+    if alternative not in PERMUTATION_ALTERNATIVES:
+        raise ValueError(f"alternative must be one of {PERMUTATION_ALTERNATIVES}, got {alternative!r}")
+    a = _numeric_sample(group_a)
+    b = _numeric_sample(group_b)
+    if len(a) < 2 or len(b) < 2:
+        return {"diff": float("nan"), "p": float("nan"), "n_a": len(a), "n_b": len(b), "n_perm": n_perm}
+
+    sizes = np.array([len(a), len(b)])
+    sums = _permutation_sums(np.concatenate([a, b]).astype(float), sizes, n_perm, seed, method, workers)
+    diffs = sums[:, 0] / sizes[0] - sums[:, 1] / sizes[1]
+    observed = float(a.mean() - b.mean())
+    if alternative == "two-sided":
+        p = _permutation_p(abs(observed), np.abs(diffs))
+    elif alternative == "greater":
+        p = _permutation_p(observed, diffs)
+    else:
+        p = _permutation_p(-observed, -diffs)
+    return {"diff": observed, "p": p, "n_a": len(a), "n_b": len(b), "n_perm": n_perm}
+
+
+def permutation_test_groups(
+    df: pd.DataFrame,
+    value_column: str,
+    group_column: str,
+    n_perm: int = 10000,
+    seed: int = 42,
+    method: str = "auto",
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Permutation one-way ANOVA: do mean values differ across the levels of group_column?
+
+    The test statistic is the between-group sum of squares (equivalent to F
+    under permutation, since the total sum of squares is fixed). Engines and
+    `workers` are shared with permutation_test.
+
+    Returns dict with: f, eta_squared, p, group_ns, n_perm.
+    """
+    data = df[[value_column, group_column]].dropna()
+    grouped = {
+        str(level): _numeric_sample(values)
+        for level, values in data.groupby(group_column, sort=True, observed=True)[value_column]
+    }
+    group_ns = {level: len(values) for level, values in grouped.items()}
+    n = sum(group_ns.values())
+    k = len(grouped)
+    if k < 2 or n <= k:
+        return {"f": float("nan"), "eta_squared": float("nan"), "p": float("nan"),
+                "group_ns": group_ns, "n_perm": n_perm}
+
+    values = np.concatenate(list(grouped.values())).astype(float)
+    sizes = np.array(list(group_ns.values()))
+    total = values.sum()
+    total_ss = float(((values - total / n) ** 2).sum())
+    observed_sums = np.array([group.sum() for group in grouped.values()])
+    between = float((observed_sums ** 2 / sizes).sum() - total ** 2 / n)
+    sums = _permutation_sums(values, sizes, n_perm, seed, method, workers)
+    permuted = (sums ** 2 / sizes).sum(axis=1) - total ** 2 / n
+    within = total_ss - between
+    return {
+        "f": float((between / (k - 1)) / (within / (n - k))) if within > 0 else float("inf"),
+        "eta_squared": between / total_ss if total_ss > 0 else float("nan"),
+        "p": _permutation_p(between, permuted),
+        "group_ns": group_ns,
+        "n_perm": n_perm,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Multivariate controls
 # ---------------------------------------------------------------------------
@@ -242,6 +1228,129 @@ def controlled_means(
     }
 
 
+def _ols_design(rhs: pd.DataFrame, categorical: list[str], numeric: list[str]) -> pd.DataFrame:
+    """Treatment-coded design matrix laid out exactly as patsy builds it.
+
+    Column names and order match `C(Q('cat')) + Q('num')` formulas: the
+    intercept, then categorical terms (dropping the first sorted level), then
+    numeric terms. Built from category codes instead of patsy's per-value
+    level lookup, which dominates fit time on large frames.
+    """
+    columns: dict[str, np.ndarray] = {"Intercept": np.ones(len(rhs))}
+    for c in categorical:
+        codes = rhs[c].cat.codes.to_numpy()
+        for j, level in enumerate(rhs[c].cat.categories[1:], start=1):
+            columns[f"C(Q('{c}'))[T.{level}]"] = (codes == j).astype(float)
+    for c in numeric:
+        columns[f"Q('{c}')"] = rhs[c].to_numpy(dtype=float)
+    return pd.DataFrame(columns, index=rhs.index)
+
+
+def _ols_solve(x: np.ndarray, y: np.ndarray) -> dict[str, np.ndarray]:
+    """OLS for every column of y against one design x, from a single SVD of x.
+
+    Uses the pseudo-inverse (rcond 1e-15, as statsmodels does), so rank-deficient
+    designs get the same minimum-norm solution and df_resid = n - rank.
+    """
+    u, singular, vt = np.linalg.svd(x, full_matrices=False)
+    keep = singular > 1e-15 * singular.max()
+    u, singular, vt = u[:, keep], singular[keep], vt[keep]
+    params = vt.T @ ((u.T @ y) / singular[:, None])
+    resid = y - x @ params
+    df_resid = x.shape[0] - int(keep.sum())
+    ssr = (resid ** 2).sum(axis=0)
+    centered = ((y - y.mean(axis=0)) ** 2).sum(axis=0)
+    xtx_inv_diag = ((vt / singular[:, None]) ** 2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = ssr / df_resid
+        bse = np.sqrt(np.outer(xtx_inv_diag, scale))
+        tvalues = params / bse
+        r_squared = 1 - ssr / centered
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid)
+    return {"params": params, "bse": bse, "pvalues": pvalues, "r_squared": r_squared}
+
+
+def ols_many(
+    df: pd.DataFrame,
+    outcomes: list[str],
+    predictor: str,
+    controls: list[str],
+    predictor_is_continuous: bool = False,
+    min_n: int = 30,
+) -> dict[str, dict[str, Any]]:
+    """Fit `outcome ~ predictor + controls` by OLS for many outcomes at once.
+
+    The design matrix is built once (patsy's treatment coding and term names,
+    as in controlled_means) over all rows with complete predictors. Outcomes are grouped by complete-case
+    mask; each group slices that design (rebuilding only if a factor level is
+    absent from its rows), factorizes it once, and solves every outcome in the
+    group against the factorization. Coefficients, standard errors, p-values
+    and R-squared match a per-outcome smf.ols fit.
+
+    Returns {outcome: {"n", "r_squared", "coefficients": {term: {"coef", "se", "pvalue"}}}};
+    outcomes with fewer than min_n complete cases map to {"error", "n"}.
+    """
+    rhs_columns = [predictor] + controls
+    base = df[rhs_columns].notna().all(axis=1).to_numpy()
+    groups: dict[bytes, list[str]] = {}
+    for outcome in dict.fromkeys(outcomes):
+        mask = base & df[outcome].notna().to_numpy()
+        groups.setdefault(np.packbits(mask).tobytes(), []).append(outcome)
+
+    # One design over every row with complete predictors; categoricals carry
+    # sorted categories, which is patsy's level order.
+    rhs = df.loc[base, rhs_columns].copy()
+    categorical = [] if predictor_is_continuous else [predictor]
+    categorical += [
+        c for c in controls
+        if not pd.api.types.is_numeric_dtype(rhs[c]) or pd.api.types.is_bool_dtype(rhs[c])
+        or rhs[c].dtype.name == "category"
+    ]
+    numeric = [c for c in rhs_columns if c not in categorical]
+    if not predictor_is_continuous:
+        rhs[predictor] = rhs[predictor].astype(str)
+    for c in categorical:
+        if rhs[c].dtype.name != "category":
+            rhs[c] = rhs[c].astype("category")
+    design = _ols_design(rhs, categorical, numeric)
+
+    results: dict[str, dict[str, Any]] = {}
+    for key, group in groups.items():
+        mask = np.unpackbits(np.frombuffer(key, dtype=np.uint8), count=len(df)).astype(bool)
+        n = int(mask.sum())
+        if n < min_n:
+            for outcome in group:
+                results[outcome] = {"error": "Too few complete cases", "n": n}
+            continue
+
+        rows = mask[base]
+        subset = rhs.loc[rows]
+        if all(subset[c].cat.codes.nunique() == len(subset[c].cat.categories) for c in categorical):
+            x = design.loc[rows]
+        else:
+            # A level is absent from these rows: rebuild so reference levels match a fresh fit
+            subset = subset.copy()
+            for c in categorical:
+                subset[c] = subset[c].cat.remove_unused_categories()
+            x = _ols_design(subset, categorical, numeric)
+
+        fit = _ols_solve(x.to_numpy(dtype=float), df.loc[mask, group].to_numpy(dtype=float))
+        for i, outcome in enumerate(group):
+            results[outcome] = {
+                "n": n,
+                "r_squared": float(fit["r_squared"][i]),
+                "coefficients": {
+                    term: {
+                        "coef": float(fit["params"][j, i]),
+                        "se": float(fit["bse"][j, i]),
+                        "pvalue": float(fit["pvalues"][j, i]),
+                    }
+                    for j, term in enumerate(x.columns)
+                },
+            }
+    return {outcome: results[outcome] for outcome in dict.fromkeys(outcomes)}
+
+
 # ---------------------------------------------------------------------------
 # Missingness diagnostics
 # ---------------------------------------------------------------------------
@@ -264,6 +1373,24 @@ def missingness_by_group(
     return grouped
 
 
+# Upper bound on mask cells converted to float32 per row block (~32 MB).
+MISSINGNESS_BLOCK_ELEMENTS = 8_000_000
+
+
+def _not_null_overlap(df: pd.DataFrame, columns: list[str]) -> np.ndarray:
+    """Pairwise counts of rows where both columns are non-null, as int64 M.T @ M.
+
+    The not-null mask is converted in row blocks small enough that float32
+    products stay exact (< 2**24 rows per block), then accumulated as int64.
+    """
+    overlap = np.zeros((len(columns), len(columns)), dtype=np.int64)
+    block_rows = min(2 ** 24, max(1, MISSINGNESS_BLOCK_ELEMENTS // max(len(columns), 1)))
+    for start in range(0, len(df), block_rows):
+        mask = df[columns].iloc[start:start + block_rows].notna().to_numpy(dtype=np.float32)
+        overlap += np.rint(mask.T @ mask).astype(np.int64)
+    return overlap
+
+
 def missingness_matrix(
     df: pd.DataFrame,
     columns: list[str],
@@ -273,15 +1400,68 @@ def missingness_matrix(
     Cell (i,j) = fraction of rows where BOTH columns i and j are non-null.
     Diagonal = fraction non-null for that column.
     """
-    result = pd.DataFrame(index=columns, columns=columns, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = _not_null_overlap(df, columns) / len(df)
+    return pd.DataFrame(fractions, index=columns, columns=columns, dtype=float)
+
+
+def missingness_clusters(
+    df: pd.DataFrame,
+    columns: list[str],
+    min_similarity: float = 0.9,
+) -> pd.DataFrame:
+    """Group columns that tend to be missing on the same rows.
+
+    Similarity is the Jaccard index of the two columns' missing-row sets,
+    derived from the same M.T @ M overlap counts as missingness_matrix. Columns
+    are clustered by average linkage and cut at 1 - min_similarity, so gated
+    question blocks (asked only after a screener) surface as one cluster.
+    Columns with no missing values are left out.
+
+    Returns DataFrame with cluster, column, pct_missing, cluster_size; clusters
+    are numbered from 1 by descending size.
+    """
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+
+    result_columns = ["cluster", "column", "pct_missing", "cluster_size"]
     n = len(df)
-    for i, ci in enumerate(columns):
-        for j, cj in enumerate(columns):
-            if i == j:
-                result.loc[ci, cj] = float(df[ci].notna().sum()) / n
-            else:
-                result.loc[ci, cj] = float((df[ci].notna() & df[cj].notna()).sum()) / n
-    return result
+    overlap = _not_null_overlap(df, columns)
+    not_null = np.diag(overlap)
+    missing = n - not_null
+    has_missing = missing > 0
+    if not has_missing.any():
+        return pd.DataFrame(columns=result_columns)
+
+    kept = [c for c, keep in zip(columns, has_missing) if keep]
+    missing = missing[has_missing]
+    both_not_null = overlap[np.ix_(has_missing, has_missing)]
+    # Inclusion-exclusion: rows missing both = n - nn_i - nn_j + nn_ij.
+    both_missing = n - (n - missing)[:, None] - (n - missing)[None, :] + both_not_null
+    either_missing = missing[:, None] + missing[None, :] - both_missing
+    distance = 1 - both_missing / either_missing
+    np.fill_diagonal(distance, 0.0)
+
+    if len(kept) == 1:
+        labels = np.array([1])
+    else:
+        tree = linkage(squareform(np.clip(distance, 0, 1), checks=False), method="average")
+        labels = fcluster(tree, t=1 - min_similarity, criterion="distance")
+
+    result = pd.DataFrame({
+        "column": kept,
+        "pct_missing": (missing / n * 100).round(1),
+        "label": labels,
+    })
+    sizes = result["label"].map(result["label"].value_counts())
+    order = sizes.groupby(result["label"]).first().sort_values(ascending=False, kind="stable")
+    result["cluster"] = result["label"].map({label: i + 1 for i, label in enumerate(order.index)})
+    result["cluster_size"] = sizes
+    return (
+        result.sort_values(["cluster", "pct_missing"], ascending=[True, False], kind="stable")
+        [result_columns]
+        .reset_index(drop=True)
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -301,28 +1481,59 @@ KINK_INTENSITY_COLUMNS = [
 ]
 
 
+CLUSTER_METHODS = ("kmeans", "minibatch")
+MINIBATCH_SIZE = 4096
+
+
+def _complete_scaled(df: pd.DataFrame, columns: list[str]) -> tuple[pd.DataFrame, np.ndarray]:
+    """Complete rows of the available columns and their standardized matrix."""
+    available = [c for c in columns if c in df.columns]
+    subset = df[available].dropna()
+    if subset.empty:
+        return subset, np.empty((0, len(available)))
+    return subset, StandardScaler().fit_transform(subset)
+
+
+def _kmeans_model(
+    method: str,
+    n_clusters: int,
+    seed: int,
+    init: Any = "k-means++",
+    compute_labels: bool = True,
+):
+    if method not in CLUSTER_METHODS:
+        raise ValueError(f"method must be one of {CLUSTER_METHODS}, got {method!r}")
+    n_init = 1 if not isinstance(init, str) else (10 if method == "kmeans" else 3)
+    if method == "minibatch":
+        return MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=seed, n_init=n_init, init=init,
+            batch_size=MINIBATCH_SIZE, compute_labels=compute_labels,
+        )
+    return KMeans(n_clusters=n_clusters, random_state=seed, n_init=n_init, init=init)
+
+
 def cluster_profiles(
     df: pd.DataFrame,
     columns: list[str] | None = None,
     n_clusters: int = 5,
     seed: int = 42,
+    method: str = "kmeans",
 ) -> dict[str, Any]:
     """K-means clustering on kink intensity columns.
 
     Returns cluster assignments and per-cluster mean profiles.
-    Rows with any NaN in the selected columns are dropped.
+    Rows with any NaN in the selected columns are dropped. method="minibatch"
+    fits MiniBatchKMeans on batches of MINIBATCH_SIZE rows, which scales to the
+    full respondent matrix at a small cost in inertia.
     """
     cols = columns or KINK_INTENSITY_COLUMNS
-    available = [c for c in cols if c in df.columns]
-    subset = df[available].dropna()
+    subset, scaled = _complete_scaled(df, cols)
+    available = list(subset.columns)
 
     if len(subset) < n_clusters * 10:
         return {"error": "Too few complete rows for clustering", "n": len(subset)}
 
-    scaler = StandardScaler()
-    scaled = scaler.fit_transform(subset)
-
-    km = KMeans(n_clusters=n_clusters, random_state=seed, n_init=10)
+    km = _kmeans_model(method, n_clusters, seed)
     labels = km.fit_predict(scaled)
 
     subset = subset.copy()
@@ -341,32 +1552,105 @@ def cluster_profiles(
     }
 
 
+def _warm_start_centers(
+    scaled: np.ndarray, centers: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """Previous centers plus one new center drawn k-means++ style (D^2 weighting)."""
+    distances = (
+        (scaled ** 2).sum(axis=1)[:, None] - 2 * scaled @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    ).min(axis=1).clip(min=0)
+    total = distances.sum()
+    choice = rng.choice(len(scaled), p=distances / total) if total > 0 else rng.integers(len(scaled))
+    return np.vstack([centers, scaled[choice]])
+
+
 def find_optimal_k(
     df: pd.DataFrame,
     columns: list[str] | None = None,
     k_range: range = range(2, 11),
     seed: int = 42,
+    method: str = "kmeans",
+    n_jobs: int | None = None,
+    warm_start: bool = False,
+    sample_size: int | None = None,
 ) -> list[dict[str, Any]]:
-    """Elbow method: compute inertia for a range of k values."""
+    """Elbow method: compute inertia for a range of k values.
+
+    The complete rows are scaled once and the matrix is shared by every k.
+    Independent fits run on `n_jobs` threads. With warm_start=True the k values
+    are fitted in order instead, each seeded from the previous k's centers
+    plus one k-means++ draw (a single init rather than n_init restarts).
+
+    With sample_size set, each entry also gets a silhouette score computed on a
+    seeded sample of that many rows. In minibatch mode the inertia is then
+    estimated on the same sample and scaled up to n, and MiniBatchKMeans skips
+    its final full-data labelling pass (compute_labels=False).
+    """
+    from joblib import Parallel, delayed
+    from sklearn.metrics import silhouette_score
+
     cols = columns or KINK_INTENSITY_COLUMNS
-    available = [c for c in cols if c in df.columns]
-    subset = df[available].dropna()
+    subset, scaled = _complete_scaled(df, cols)
+    n = len(subset)
+    sample = None
+    if sample_size is not None and n > 0:
+        sample_rows = np.random.default_rng(seed).choice(n, size=min(sample_size, n), replace=False)
+        sample = scaled[np.sort(sample_rows)]
+    estimate_inertia = sample is not None and method == "minibatch"
+
+    def model(k: int, init: Any = "k-means++"):
+        return _kmeans_model(method, k, seed, init=init, compute_labels=not estimate_inertia)
+
+    def evaluate(km, k: int) -> dict[str, Any]:
+        if estimate_inertia:
+            inertia = -km.score(sample) * n / len(sample)
+        else:
+            inertia = km.inertia_
+        result = {"k": k, "inertia": float(inertia), "n": n}
+        if sample is not None:
+            sample_labels = km.predict(sample)
+            if 1 < len(np.unique(sample_labels)) < len(sample):
+                result["silhouette"] = float(silhouette_score(sample, sample_labels))
+            else:
+                result["silhouette"] = float("nan")
+        return result
+
+    if warm_start:
+        results = []
+        rng = np.random.default_rng(seed)
+        centers = None
+        for k in k_range:
+            if centers is not None and len(centers) == k - 1:
+                init = _warm_start_centers(scaled, centers, rng)
+            else:
+                init = "k-means++"
+            km = model(k, init).fit(scaled)
+            centers = km.cluster_centers_
+            results.append(evaluate(km, k))
+        return results
 
-    scaler = StandardScaler()
-    scaled = scaler.fit_transform(subset)
+    def fit(k: int) -> dict[str, Any]:
+        return evaluate(model(k).fit(scaled), k)
 
-    results = []
-    for k in k_range:
-        km = KMeans(n_clusters=k, random_state=seed, n_init=10)
-        km.fit(scaled)
-        results.append({"k": k, "inertia": float(km.inertia_), "n": len(subset)})
-    return results
+    return Parallel(n_jobs=n_jobs, prefer="threads")(delayed(fit)(k) for k in k_range)
 
 
 # ---------------------------------------------------------------------------
 # Pairwise association scanning
 # ---------------------------------------------------------------------------
 
+# Upper bound on float64 cells per column chunk in scan_correlations (~64 MB each).
+SCAN_BLOCK_ELEMENTS = 8_000_000
+
+
+def _numeric_block(df: pd.DataFrame, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Column-centered values with NaNs zeroed, plus the float 0/1 presence mask."""
+    values = df[columns].to_numpy(dtype=float, na_value=np.nan)
+    present = ~np.isnan(values)
+    centered = values - np.nanmean(np.where(present.any(axis=0), values, 0.0), axis=0)
+    return np.where(present, centered, 0.0), present.astype(float)
+
+
 def scan_correlations(
     df: pd.DataFrame,
     x_columns: list[str],
@@ -375,22 +1659,51 @@ def scan_correlations(
     """Compute Pearson r for every (x, y) pair. Returns sorted by |r|.
 
     Only numeric columns are correlated. Pairs with < 100 shared non-null
-    observations are skipped.
+    observations are skipped. Pairwise-complete n, sums, sums of squares and
+    cross-products come from masked matrix products over column chunks of at
+    most SCAN_BLOCK_ELEMENTS cells, so all pairs are computed without a Python
+    loop per pair.
     """
+    def numeric(columns: list[str]) -> list[str]:
+        keep = [c for c in columns if c in df.columns]
+        return [c for c in dict.fromkeys(keep)
+                if pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c])]
+
+    xs, ys = numeric(x_columns), numeric(y_columns)
+    chunk = max(1, SCAN_BLOCK_ELEMENTS // max(len(df), 1))
+    found: dict[tuple[str, str], tuple[float, float, int]] = {}
+
+    for x_start in range(0, len(xs), chunk):
+        x_cols = xs[x_start:x_start + chunk]
+        x0, x_mask = _numeric_block(df, x_cols)
+        for y_start in range(0, len(ys), chunk):
+            y_cols = ys[y_start:y_start + chunk]
+            y0, y_mask = _numeric_block(df, y_cols)
+            n = x_mask.T @ y_mask
+            sum_x = x0.T @ y_mask
+            sum_y = x_mask.T @ y0
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ss_x = (x0 ** 2).T @ y_mask - sum_x ** 2 / n
+                ss_y = x_mask.T @ (y0 ** 2) - sum_y ** 2 / n
+                cross = x0.T @ y0 - sum_x * sum_y / n
+                r = np.clip(cross / np.sqrt(ss_x * ss_y), -1.0, 1.0)
+                t = r * np.sqrt((n - 2) / (1 - r ** 2))
+            p = 2 * stats.t.sf(np.abs(t), np.maximum(n - 2, 1))
+            for i, xc in enumerate(x_cols):
+                for j, yc in enumerate(y_cols):
+                    if n[i, j] >= 100:
+                        found[(xc, yc)] = (float(r[i, j]), float(p[i, j]), int(n[i, j]))
+
     rows = []
     for xc in x_columns:
-        if xc not in df.columns:
-            continue
         for yc in y_columns:
-            if yc not in df.columns or xc == yc:
-                continue
-            mask = df[xc].notna() & df[yc].notna()
-            n = mask.sum()
-            if n < 100:
+            if xc == yc or (xc, yc) not in found:
                 continue
-            r, p = stats.pearsonr(df.loc[mask, xc].astype(float), df.loc[mask, yc].astype(float))
-            rows.append({"x": xc, "y": yc, "r": round(r, 4), "abs_r": round(abs(r), 4), "p": p, "n": int(n)})
-    return pd.DataFrame(rows).sort_values("abs_r", ascending=False).reset_index(drop=True)
+            r_value, p_value, n_value = found[(xc, yc)]
+            rows.append({"x": xc, "y": yc, "r": round(r_value, 4), "abs_r": round(abs(r_value), 4),
+                         "p": p_value, "n": n_value})
+    columns = ["x", "y", "r", "abs_r", "p", "n"]
+    return pd.DataFrame(rows, columns=columns).sort_values("abs_r", ascending=False).reset_index(drop=True)
 
 
 def scan_group_diffs(
@@ -400,37 +1713,1086 @@ def scan_group_diffs(
 ) -> pd.DataFrame:
     """For a categorical grouping variable, compute mean outcome by group and effect size.
 
-    Returns a DataFrame sorted by largest effect size (max_diff / pooled_std).
+    All numeric outcomes share one groupby (block-wise count and mean per
+    group), and overall standard deviations come from one vectorized call.
+    Groups with fewer than 20 non-null values are ignored per outcome.
+
+    Returns a DataFrame sorted by largest effect size (max_diff / overall std).
     """
     groups = df[group_column].dropna().unique()
+    columns = ["outcome", "max_diff", "effect_size", "group_means", "group_ns"]
     if len(groups) < 2 or len(groups) > 10:
         return pd.DataFrame()
 
+    outcomes = [
+        oc for oc in dict.fromkeys(outcome_columns)
+        if oc in df.columns
+        and (pd.api.types.is_numeric_dtype(df[oc]) or pd.api.types.is_bool_dtype(df[oc]))
+    ]
+    if not outcomes:
+        return pd.DataFrame(columns=columns)
+
+    values = df[outcomes].astype(float)
+    # Unnamed key so the grouping column itself stays in the aggregated outcomes.
+    keys = df[group_column].rename(None)
+    grouped = values.groupby(keys, sort=True, observed=True)
+    return _group_diff_table(grouped.count(), grouped.mean(), values.std(), outcome_columns)
+
+
+def _group_diff_table(
+    counts: pd.DataFrame,
+    means: pd.DataFrame,
+    overall_std: pd.Series,
+    outcome_columns: list[str],
+) -> pd.DataFrame:
+    """scan_group_diffs output from per-group counts/means (groups x outcomes) and overall stds."""
+    columns = ["outcome", "max_diff", "effect_size", "group_means", "group_ns"]
+    means = means.where(counts >= 20)
+    max_diff = means.max() - means.min()
+    effect = (max_diff / overall_std).where(overall_std > 0, 0.0)
+    eligible = means.notna().sum() >= 2
+    labels = [str(g) for g in means.index]
+
     rows = []
     for oc in outcome_columns:
-        if oc not in df.columns:
-            continue
-        group_means = {}
-        group_ns = {}
-        for g in sorted(groups):
-            vals = df.loc[df[group_column] == g, oc].dropna()
-            if len(vals) < 20:
-                continue
-            group_means[str(g)] = float(vals.mean())
-            group_ns[str(g)] = len(vals)
-        if len(group_means) < 2:
+        if oc not in eligible.index or not eligible[oc]:
             continue
-        max_diff = max(group_means.values()) - min(group_means.values())
-        overall_std = df[oc].dropna().std()
-        effect = max_diff / overall_std if overall_std > 0 else 0
+        kept = means[oc].notna().to_numpy()
         rows.append({
             "outcome": oc,
-            "max_diff": round(max_diff, 3),
-            "effect_size": round(effect, 3),
-            "group_means": group_means,
-            "group_ns": group_ns,
+            "max_diff": round(float(max_diff[oc]), 3),
+            "effect_size": round(float(effect[oc]), 3),
+            "group_means": {
+                label: float(m) for label, m, k in zip(labels, means[oc], kept) if k
+            },
+            "group_ns": {
+                label: int(n) for label, n, k in zip(labels, counts[oc], kept) if k
+            },
         })
-    return pd.DataFrame(rows).sort_values("effect_size", ascending=False).reset_index(drop=True)
+    result = pd.DataFrame(rows, columns=columns)
+    return result.sort_values("effect_size", ascending=False).reset_index(drop=True)
+
+
+# ---------------------------------------------------------------------------
+# SQL push-down
+# ---------------------------------------------------------------------------
+
+_SQL_NUMERIC_TYPES = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT",
+    "UINTEGER", "UBIGINT", "UHUGEINT", "FLOAT", "DOUBLE", "BOOLEAN",
+}
+
+
+def _as_relation(source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation) -> duckdb.DuckDBPyRelation:
+    """A relation over `source`: the `data` view of a connection, or the relation itself."""
+    if isinstance(source, duckdb.DuckDBPyRelation):
+        return source
+    return source.sql("SELECT * FROM data")
+
+
+def _sql_query(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    select_sql: str,
+) -> pd.DataFrame:
+    """Run select_sql with `src` bound to source; only the aggregated result reaches pandas."""
+    return _as_relation(source).query("src", select_sql).fetchdf()
+
+
+def _sql_literal(value: Any) -> str:
+    if isinstance(value, (bool, np.bool_)):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return repr(float(value)) if isinstance(value, (float, np.floating)) else str(int(value))
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _where(where: str | None, *conditions: str) -> str:
+    parts = [f"({where})"] if where else []
+    parts.extend(conditions)
+    return f"WHERE {' AND '.join(parts)}" if parts else ""
+
+
+def cohens_d_sql(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    value_column: str,
+    group_column: str,
+    group_a: Any,
+    group_b: Any,
+    where: str | None = None,
+) -> float:
+    """cohens_d for value_column between two levels of group_column, aggregated in DuckDB.
+
+    `source` is a connection with a `data` view (as from load_data) or any
+    relation; `where` is an optional SQL filter applied first.
+    """
+    value = f"CAST({quote_identifier(value_column)} AS DOUBLE)"
+    group = quote_identifier(group_column)
+    stats_row = _sql_query(source, f"""
+        SELECT
+            count({value}) FILTER (WHERE {group} = {_sql_literal(group_a)}) AS n_a,
+            avg({value}) FILTER (WHERE {group} = {_sql_literal(group_a)}) AS mean_a,
+            var_samp({value}) FILTER (WHERE {group} = {_sql_literal(group_a)}) AS var_a,
+            count({value}) FILTER (WHERE {group} = {_sql_literal(group_b)}) AS n_b,
+            avg({value}) FILTER (WHERE {group} = {_sql_literal(group_b)}) AS mean_b,
+            var_samp({value}) FILTER (WHERE {group} = {_sql_literal(group_b)}) AS var_b
+        FROM src {_where(where)}
+    """).iloc[0]
+    n_a, n_b = int(stats_row["n_a"]), int(stats_row["n_b"])
+    if n_a < 2 or n_b < 2:
+        return float("nan")
+    pooled_std = np.sqrt(((n_a - 1) * stats_row["var_a"] + (n_b - 1) * stats_row["var_b"]) / (n_a + n_b - 2))
+    if pooled_std == 0:
+        return 0.0
+    return float((stats_row["mean_a"] - stats_row["mean_b"]) / pooled_std)
+
+
+def pearson_with_ci_sql(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    x_column: str,
+    y_column: str,
+    confidence: float = 0.95,
+    where: str | None = None,
+) -> dict[str, float]:
+    """pearson_with_ci computed from DuckDB's pairwise-complete count and corr()."""
+    x = f"CAST({quote_identifier(x_column)} AS DOUBLE)"
+    y = f"CAST({quote_identifier(y_column)} AS DOUBLE)"
+    row = _sql_query(source, f"""
+        SELECT count(*) AS n, corr({x}, {y}) AS r
+        FROM src {_where(where, f"{x} IS NOT NULL", f"{y} IS NOT NULL")}
+    """).iloc[0]
+    n = int(row["n"])
+    if n < 10:
+        return {"r": float("nan"), "p": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"), "n": n}
+    return _pearson_from_r(float(row["r"]), n, confidence)
+
+
+def _pearson_from_r(r: float, n: int, confidence: float) -> dict[str, float]:
+    """pearson_with_ci's result from r and n: t-test p-value and Fisher z interval."""
+    r = float(np.clip(r, -1.0, 1.0))
+    with np.errstate(divide="ignore"):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    p = float(2 * stats.t.sf(abs(t), n - 2))
+    z = np.arctanh(r)
+    se = 1 / np.sqrt(n - 3)
+    z_crit = stats.norm.ppf((1 + confidence) / 2)
+    ci_low = np.tanh(z - z_crit * se)
+    ci_high = np.tanh(z + z_crit * se)
+    return {"r": r, "p": p, "ci_low": float(ci_low), "ci_high": float(ci_high), "n": n}
+
+
+def missingness_by_group_sql(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    target_column: str,
+    group_column: str,
+    where: str | None = None,
+) -> pd.DataFrame:
+    """missingness_by_group as one GROUP BY in DuckDB (null groups dropped, sorted by group)."""
+    group = quote_identifier(group_column)
+    grouped = _sql_query(source, f"""
+        SELECT {group}, count(*) AS n_total, count(*) - count({quote_identifier(target_column)}) AS n_missing
+        FROM src {_where(where, f"{group} IS NOT NULL")}
+        GROUP BY {group}
+        ORDER BY {group}
+    """)
+    grouped["n_total"] = grouped["n_total"].astype(np.int64)
+    grouped["n_missing"] = grouped["n_missing"].astype(np.int64)
+    grouped["pct_missing"] = (grouped["n_missing"] / grouped["n_total"] * 100).round(1)
+    return grouped
+
+
+def scan_group_diffs_sql(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    group_column: str,
+    outcome_columns: list[str],
+    where: str | None = None,
+) -> pd.DataFrame:
+    """scan_group_diffs from one DuckDB aggregate over all numeric outcomes.
+
+    A single GROUPING SETS query returns per-group counts and means plus the
+    overall standard deviation of every outcome; only those sufficient
+    statistics are brought into pandas.
+    """
+    relation = _as_relation(source)
+    types = {column: str(dtype).upper() for column, dtype in zip(relation.columns, relation.types)}
+    group = quote_identifier(group_column)
+    n_groups = int(_sql_query(relation, f"""
+        SELECT count(DISTINCT {group}) AS n FROM src {_where(where)}
+    """).iloc[0]["n"])
+    columns = ["outcome", "max_diff", "effect_size", "group_means", "group_ns"]
+    if n_groups < 2 or n_groups > 10:
+        return pd.DataFrame()
+
+    outcomes = [
+        oc for oc in dict.fromkeys(outcome_columns)
+        if oc in types and (types[oc] in _SQL_NUMERIC_TYPES or types[oc].startswith("DECIMAL"))
+    ]
+    if not outcomes:
+        return pd.DataFrame(columns=columns)
+
+    aggregates = []
+    for i, oc in enumerate(outcomes):
+        value = f"CAST({quote_identifier(oc)} AS DOUBLE)"
+        aggregates.append(f"count({value}) AS n_{i}, avg({value}) AS mean_{i}, stddev_samp({value}) AS std_{i}")
+    stats_frame = _sql_query(relation, f"""
+        SELECT grouping({group}) AS is_total, {group} AS group_key, {", ".join(aggregates)}
+        FROM src {_where(where)}
+        GROUP BY GROUPING SETS (({group}), ())
+    """)
+    totals = stats_frame[stats_frame["is_total"] == 1].iloc[0]
+    by_group = stats_frame[(stats_frame["is_total"] == 0) & stats_frame["group_key"].notna()]
+    by_group = by_group.sort_values("group_key").set_index("group_key")
+    counts = pd.DataFrame({oc: by_group[f"n_{i}"].astype(np.int64) for i, oc in enumerate(outcomes)})
+    means = pd.DataFrame({oc: by_group[f"mean_{i}"].astype(float) for i, oc in enumerate(outcomes)})
+    overall_std = pd.Series({oc: float(totals[f"std_{i}"]) for i, oc in enumerate(outcomes)})
+    return _group_diff_table(counts, means, overall_std, outcome_columns)
+
+
+# ---------------------------------------------------------------------------
+# Streaming accumulators
+# ---------------------------------------------------------------------------
+
+STREAM_BATCH_ROWS = 100_000
+
+
+class RunningMoments:
+    """Mergeable count / mean / variance (Welford updates, Chan et al. merges). Nulls are skipped."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> RunningMoments:
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            batch = RunningMoments()
+            batch.n = len(values)
+            batch.mean = float(values.mean())
+            batch.m2 = float(((values - batch.mean) ** 2).sum())
+            self.merge(batch)
+        return self
+
+    def merge(self, other: RunningMoments) -> RunningMoments:
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+        self.n = n
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.n - ddof) if self.n > ddof else float("nan")
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.variance(ddof)))
+
+
+class RunningCovariance:
+    """Mergeable pairwise-complete moments of (x, y): means, sums of squares and co-moment."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x: np.ndarray, y: np.ndarray) -> RunningCovariance:
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        keep = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[keep], y[keep]
+        if len(x):
+            batch = RunningCovariance()
+            batch.n = len(x)
+            batch.mean_x, batch.mean_y = float(x.mean()), float(y.mean())
+            dx, dy = x - batch.mean_x, y - batch.mean_y
+            batch.m2_x, batch.m2_y, batch.c_xy = float(dx @ dx), float(dy @ dy), float(dx @ dy)
+            self.merge(batch)
+        return self
+
+    def merge(self, other: RunningCovariance) -> RunningCovariance:
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta_x = other.mean_x - self.mean_x
+        delta_y = other.mean_y - self.mean_y
+        weight = self.n * other.n / n
+        self.mean_x += delta_x * other.n / n
+        self.mean_y += delta_y * other.n / n
+        self.m2_x += other.m2_x + delta_x ** 2 * weight
+        self.m2_y += other.m2_y + delta_y ** 2 * weight
+        self.c_xy += other.c_xy + delta_x * delta_y * weight
+        self.n = n
+        return self
+
+    def covariance(self, ddof: int = 1) -> float:
+        return self.c_xy / (self.n - ddof) if self.n > ddof else float("nan")
+
+    def correlation(self) -> float:
+        denominator = np.sqrt(self.m2_x * self.m2_y)
+        return float(self.c_xy / denominator) if denominator > 0 else float("nan")
+
+
+class ContingencyCounts:
+    """Mergeable two-way frequency table over pairwise-complete (x, y) observations."""
+
+    def __init__(self) -> None:
+        self.counts: dict[tuple[Any, Any], int] = {}
+
+    def update(self, x: pd.Series, y: pd.Series) -> ContingencyCounts:
+        pairs = pd.DataFrame({"x": pd.Series(x).to_numpy(), "y": pd.Series(y).to_numpy()}).dropna()
+        for key, count in pairs.groupby(["x", "y"], sort=False).size().items():
+            self.counts[key] = self.counts.get(key, 0) + int(count)
+        return self
+
+    def merge(self, other: ContingencyCounts) -> ContingencyCounts:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        return self
+
+    def table(self) -> pd.DataFrame:
+        """Counts as an x-by-y DataFrame with sorted labels (the layout of pd.crosstab)."""
+        if not self.counts:
+            return pd.DataFrame()
+        series = pd.Series(self.counts)
+        return series.unstack(fill_value=0).sort_index().sort_index(axis=1).astype(np.int64)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch over weighted centroids.
+
+    Distinct values are kept exactly (so low-cardinality survey scales give
+    exact quantiles, matching np.quantile) until there are more than
+    max_centroids of them; then adjacent centroids are merged into
+    equal-weight buckets and quantiles are interpolated between centroid
+    midpoints.
+    """
+
+    def __init__(self, max_centroids: int = 1024) -> None:
+        self.max_centroids = max_centroids
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.exact = True
+
+    @property
+    def n(self) -> int:
+        return int(self.weights.sum())
+
+    def update(self, values: np.ndarray) -> QuantileSketch:
+        values = np.asarray(values, dtype=float)
+        values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        return self._absorb(values, counts.astype(float), exact=True)
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        return self._absorb(other.means, other.weights, exact=other.exact)
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray, exact: bool) -> QuantileSketch:
+        combined, inverse = np.unique(np.concatenate([self.means, means]), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate([self.weights, weights]))
+        self.means, self.weights = combined, totals
+        self.exact = self.exact and exact
+        if len(self.means) > self.max_centroids:
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        cumulative = np.cumsum(self.weights)
+        bucket = np.minimum(
+            ((cumulative - self.weights / 2) / cumulative[-1] * self.max_centroids).astype(int),
+            self.max_centroids - 1,
+        )
+        weights = np.bincount(bucket, weights=self.weights)
+        sums = np.bincount(bucket, weights=self.weights * self.means)
+        keep = weights > 0
+        self.means, self.weights = sums[keep] / weights[keep], weights[keep]
+        self.exact = False
+
+    def quantile(self, q: float) -> float:
+        if len(self.weights) == 0:
+            return float("nan")
+        if self.exact:
+            return float(_count_quantile(self.weights[None, :], self.means, q)[0])
+        midpoints = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), midpoints, self.means))
+
+
+def iter_record_batches(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    columns: list[str],
+    where: str | None = None,
+    batch_rows: int | None = None,
+):
+    """Yield DataFrames of at most batch_rows rows, streamed from DuckDB as Arrow record batches.
+
+    Only one batch is held in memory at a time, so the toolkit's *_stream
+    functions work on datasets larger than RAM. Requires pyarrow.
+    """
+    _require_pyarrow("streaming")
+    quoted = ", ".join(quote_identifier(c) for c in dict.fromkeys(columns))
+    relation = _as_relation(source).query("src", f"SELECT {quoted} FROM src {_where(where)}")
+    rows = batch_rows or STREAM_BATCH_ROWS
+    if hasattr(relation, "to_arrow_reader"):
+        reader = relation.to_arrow_reader(rows)
+    else:
+        reader = relation.fetch_record_batch(rows)
+    for batch in reader:
+        yield batch.to_pandas()
+
+
+def cohens_d_stream(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    value_column: str,
+    group_column: str,
+    group_a: Any,
+    group_b: Any,
+    where: str | None = None,
+) -> float:
+    """cohens_d between two levels of group_column, from RunningMoments over streamed batches."""
+    moments_a, moments_b = RunningMoments(), RunningMoments()
+    for batch in iter_record_batches(source, [value_column, group_column], where):
+        values = batch[value_column].to_numpy(dtype=float, na_value=np.nan)
+        moments_a.update(values[(batch[group_column] == group_a).to_numpy(dtype=bool, na_value=False)])
+        moments_b.update(values[(batch[group_column] == group_b).to_numpy(dtype=bool, na_value=False)])
+    if moments_a.n < 2 or moments_b.n < 2:
+        return float("nan")
+    pooled_std = np.sqrt((moments_a.m2 + moments_b.m2) / (moments_a.n + moments_b.n - 2))
+    if pooled_std == 0:
+        return 0.0
+    return float((moments_a.mean - moments_b.mean) / pooled_std)
+
+
+def pearson_with_ci_stream(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    x_column: str,
+    y_column: str,
+    confidence: float = 0.95,
+    where: str | None = None,
+) -> dict[str, float]:
+    """pearson_with_ci from a RunningCovariance over streamed batches."""
+    moments = RunningCovariance()
+    for batch in iter_record_batches(source, [x_column, y_column], where):
+        moments.update(
+            batch[x_column].to_numpy(dtype=float, na_value=np.nan),
+            batch[y_column].to_numpy(dtype=float, na_value=np.nan),
+        )
+    if moments.n < 10:
+        nan = float("nan")
+        return {"r": nan, "p": nan, "ci_low": nan, "ci_high": nan, "n": moments.n}
+    return _pearson_from_r(moments.correlation(), moments.n, confidence)
+
+
+def cramers_v_stream(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    x_column: str,
+    y_column: str,
+    where: str | None = None,
+) -> float:
+    """cramers_v from ContingencyCounts over streamed batches."""
+    counts = ContingencyCounts()
+    for batch in iter_record_batches(source, [x_column, y_column], where):
+        counts.update(batch[x_column], batch[y_column])
+    table = counts.table()
+    if table.to_numpy().sum() < 10:
+        return float("nan")
+    return _cramers_v_from_table(table.to_numpy())
+
+
+def quantiles_stream(
+    source: duckdb.DuckDBPyConnection | duckdb.DuckDBPyRelation,
+    column: str,
+    quantiles: tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95),
+    where: str | None = None,
+    max_centroids: int = 1024,
+) -> dict[str, Any]:
+    """Quantiles of a numeric column from a QuantileSketch over streamed batches.
+
+    Returns {"n", "exact", "mean", "std", "quantiles": {q: value}}; exact is
+    False once the sketch had to compress.
+    """
+    sketch = QuantileSketch(max_centroids)
+    moments = RunningMoments()
+    for batch in iter_record_batches(source, [column], where):
+        values = batch[column].to_numpy(dtype=float, na_value=np.nan)
+        sketch.update(values)
+        moments.update(values)
+    return {
+        "n": moments.n,
+        "exact": sketch.exact,
+        "mean": moments.mean if moments.n else float("nan"),
+        "std": moments.std(),
+        "quantiles": {q: sketch.quantile(q) for q in quantiles},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Sufficient-statistics cube
+# ---------------------------------------------------------------------------
+
+CUBE_GROUP_COLUMNS = ["biomale", "straightness", "politics", "age"]
+# Histogram bins kept per cell: the 0-5 survey scales.
+CUBE_SCALE_VALUES = np.arange(6, dtype=float)
+# Upper bound on float64 outcome cells per row block while building a cube (~64 MB).
+CUBE_BLOCK_ELEMENTS = 8_000_000
+
+
+class StatsCube:
+    """Per (group column, level) x outcome: count, sum, sum of squares and 0-5 histogram.
+
+    Built in one pass by stats_cube and persisted per dataset fingerprint, so
+    group means, Cohen's d, Welch tests and count-based bootstraps are answered
+    without touching row data. Levels are the non-null values of each group
+    column; the `overall` row covers every row, including those with a null
+    group. Variances come from sums of squares, which is exact for integer
+    scales; cohens_d and welch_test refuse other outcomes.
+    """
+
+    def __init__(
+        self,
+        levels: list[tuple[str, Any]],
+        outcomes: list[str],
+        count: np.ndarray,
+        total: np.ndarray,
+        total_sq: np.ndarray,
+        histogram: np.ndarray,
+        overall: np.ndarray,
+    ) -> None:
+        self.levels = levels
+        self.outcomes = outcomes
+        self.count = count
+        self.total = total
+        self.total_sq = total_sq
+        self.histogram = histogram
+        # count / sum / sum of squares over all rows, shape (3, outcomes)
+        self.overall = overall
+        self._rows = {level: i for i, level in enumerate(levels)}
+        self._columns = {outcome: j for j, outcome in enumerate(outcomes)}
+        # An outcome is histogrammed when every non-null value falls on a 0-5 bin.
+        self.is_scale = histogram.sum(axis=2).sum(axis=0) == count.sum(axis=0)
+
+    @property
+    def group_columns(self) -> list[str]:
+        return list(dict.fromkeys(column for column, _ in self.levels))
+
+    def _cell(self, group_column: str, level: Any, outcome: str) -> tuple[int, int]:
+        if outcome not in self._columns:
+            raise KeyError(f"outcome {outcome!r} is not in the cube")
+        if (group_column, level) not in self._rows:
+            if group_column not in self.group_columns:
+                raise KeyError(f"group column {group_column!r} is not in the cube")
+            raise KeyError(f"{group_column}={level!r} does not occur in the data")
+        return self._rows[(group_column, level)], self._columns[outcome]
+
+    def moments(self, group_column: str, level: Any, outcome: str) -> RunningMoments:
+        """Count, mean and squared deviations of one cell."""
+        i, j = self._cell(group_column, level, outcome)
+        moments = RunningMoments()
+        moments.n = int(self.count[i, j])
+        if moments.n:
+            moments.mean = float(self.total[i, j] / moments.n)
+            moments.m2 = max(float(self.total_sq[i, j] - self.total[i, j] ** 2 / moments.n), 0.0)
+        return moments
+
+    def value_counts(self, group_column: str, level: Any, outcome: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted observed values and their counts for one cell (the _value_table layout)."""
+        i, j = self._cell(group_column, level, outcome)
+        if not self.is_scale[j]:
+            raise ValueError(f"{outcome!r} is not a 0-5 scale, so the cube holds no histogram for it")
+        counts = self.histogram[i, j]
+        observed = counts > 0
+        return CUBE_SCALE_VALUES[observed], counts[observed]
+
+    def group_means(self, group_column: str, outcome: str) -> pd.DataFrame:
+        """Returns DataFrame with level, n, mean, std (ddof=1) for every level of group_column."""
+        rows = []
+        for column, level in self.levels:
+            if column != group_column:
+                continue
+            moments = self.moments(group_column, level, outcome)
+            rows.append({
+                "level": level,
+                "n": moments.n,
+                "mean": moments.mean if moments.n else float("nan"),
+                "std": moments.std(),
+            })
+        if not rows:
+            raise KeyError(f"group column {group_column!r} is not in the cube")
+        return pd.DataFrame(rows, columns=["level", "n", "mean", "std"])
+
+    def _scale_moments(
+        self, outcome: str, group_column: str, group_a: Any, group_b: Any
+    ) -> tuple[RunningMoments, RunningMoments]:
+        """Moments of two cells, refused for outcomes that are not 0-5 scales.
+
+        The sum-of-squares variance cancels catastrophically for continuous
+        outcomes with a large mean; use the row-level functions for those.
+        """
+        if outcome in self._columns and not self.is_scale[self._columns[outcome]]:
+            raise ValueError(
+                f"{outcome!r} is not a 0-5 scale, so its cube variance is not exact; "
+                "use the row-level function instead"
+            )
+        return (
+            self.moments(group_column, group_a, outcome),
+            self.moments(group_column, group_b, outcome),
+        )
+
+    def cohens_d(self, outcome: str, group_column: str, group_a: Any, group_b: Any) -> float:
+        """cohens_d between two levels of group_column (0-5 scale outcomes only)."""
+        a, b = self._scale_moments(outcome, group_column, group_a, group_b)
+        if a.n < 2 or b.n < 2:
+            return float("nan")
+        pooled_std = np.sqrt((a.m2 + b.m2) / (a.n + b.n - 2))
+        if pooled_std == 0:
+            return 0.0
+        return float((a.mean - b.mean) / pooled_std)
+
+    def welch_test(self, outcome: str, group_column: str, group_a: Any, group_b: Any) -> dict[str, float]:
+        """Welch's unequal-variance t-test between two levels (0-5 scale outcomes only).
+
+        Returns dict with: t, p, n_a, n_b (matches scipy.stats.ttest_ind(equal_var=False)).
+        """
+        a, b = self._scale_moments(outcome, group_column, group_a, group_b)
+        if a.n < 2 or b.n < 2:
+            return {"t": float("nan"), "p": float("nan"), "n_a": a.n, "n_b": b.n}
+        t, p = stats.ttest_ind_from_stats(a.mean, a.std(), a.n, b.mean, b.std(), b.n, equal_var=False)
+        return {"t": float(t), "p": float(p), "n_a": a.n, "n_b": b.n}
+
+    def bootstrap_ci(
+        self,
+        outcome: str,
+        group_column: str,
+        level: Any,
+        stat_func=np.mean,
+        n_boot: int = 2000,
+        confidence: float = 0.95,
+        seed: int = 42,
+    ) -> dict[str, float]:
+        """bootstrap_ci for one cell from its histogram; identical to bootstrap_ci(method="counts")."""
+        values, counts = self.value_counts(group_column, level, outcome)
+        n = int(counts.sum())
+        if n < 5:
+            return {"estimate": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"), "n": n}
+        count_stat = self._count_stat(stat_func)
+        (boot_stats,) = _count_replicates([(values, counts)], count_stat, n_boot, np.random.default_rng(seed))
+        alpha = (1 - confidence) / 2
+        ci_low, ci_high = np.quantile(boot_stats, [alpha, 1 - alpha])
+        return {
+            "estimate": float(count_stat(counts[None, :], values)[0]),
+            "ci_low": float(ci_low),
+            "ci_high": float(ci_high),
+            "n": n,
+        }
+
+    def bootstrap_diff(
+        self,
+        outcome: str,
+        group_column: str,
+        group_a: Any,
+        group_b: Any,
+        stat_func=np.mean,
+        n_boot: int = 2000,
+        confidence: float = 0.95,
+        seed: int = 42,
+    ) -> dict[str, float]:
+        """bootstrap_diff between two levels from their histograms; identical to method="counts"."""
+        table_a = self.value_counts(group_column, group_a, outcome)
+        table_b = self.value_counts(group_column, group_b, outcome)
+        n_a, n_b = int(table_a[1].sum()), int(table_b[1].sum())
+        if n_a < 5 or n_b < 5:
+            return {"diff": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"),
+                    "n_a": n_a, "n_b": n_b, "significant": False}
+        count_stat = self._count_stat(stat_func)
+        boot_a, boot_b = _count_replicates([table_a, table_b], count_stat, n_boot, np.random.default_rng(seed))
+        diffs = boot_a - boot_b
+        alpha = (1 - confidence) / 2
+        ci_low, ci_high = np.quantile(diffs, [alpha, 1 - alpha])
+        estimate_a = count_stat(table_a[1][None, :], table_a[0])[0]
+        estimate_b = count_stat(table_b[1][None, :], table_b[0])[0]
+        return {
+            "diff": float(estimate_a - estimate_b),
+            "ci_low": float(ci_low),
+            "ci_high": float(ci_high),
+            "n_a": n_a,
+            "n_b": n_b,
+            "significant": bool(ci_low > 0 or ci_high < 0),
+        }
+
+    @staticmethod
+    def _count_stat(stat_func) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+        count_stat = _count_statistic(stat_func)
+        if count_stat is None:
+            raise ValueError("cube bootstraps need a statistic with a counts form (np.mean, quantile_stat, ...)")
+        return count_stat
+
+    def scan_group_diffs(self, group_column: str, outcome_columns: list[str] | None = None) -> pd.DataFrame:
+        """scan_group_diffs answered from the cube (outcomes default to all cube outcomes)."""
+        outcome_columns = self.outcomes if outcome_columns is None else outcome_columns
+        rows = [i for i, (column, _) in enumerate(self.levels) if column == group_column]
+        if len(rows) < 2 or len(rows) > 10:
+            return pd.DataFrame()
+        outcomes = [oc for oc in dict.fromkeys(outcome_columns) if oc in self._columns]
+        columns = [self._columns[oc] for oc in outcomes]
+        index = pd.Index([self.levels[i][1] for i in rows])
+        count = self.count[np.ix_(rows, columns)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.total[np.ix_(rows, columns)] / count
+            n, total, total_sq = self.overall[:, columns]
+            overall_var = np.maximum(total_sq - total ** 2 / n, 0.0) / (n - 1)
+        return _group_diff_table(
+            pd.DataFrame(count.astype(np.int64), index=index, columns=outcomes),
+            pd.DataFrame(means, index=index, columns=outcomes),
+            pd.Series(np.sqrt(overall_var), index=outcomes),
+            outcome_columns,
+        )
+
+    def save(self, path: Path) -> None:
+        """Write the cube as <path>.npz plus a <path>.json header (written last)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "count": self.count, "total": self.total, "total_sq": self.total_sq,
+            "histogram": self.histogram, "overall": self.overall,
+        }
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        np.savez(temporary, **arrays)
+        os.replace(temporary, path.with_suffix(".npz"))
+        header = {"levels": [[column, level] for column, level in self.levels], "outcomes": self.outcomes}
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.json.tmp")
+        temporary.write_text(json.dumps(header))
+        os.replace(temporary, path.with_suffix(".json"))
+
+    @classmethod
+    def load(cls, path: Path) -> StatsCube | None:
+        """Read a cube written by save, or None if there is none at path."""
+        header_path = path.with_suffix(".json")
+        if not header_path.exists():
+            return None
+        header = json.loads(header_path.read_text())
+        with np.load(path.with_suffix(".npz"), allow_pickle=False) as arrays:
+            return cls(
+                [(column, level) for column, level in header["levels"]],
+                header["outcomes"],
+                arrays["count"], arrays["total"], arrays["total_sq"], arrays["histogram"], arrays["overall"],
+            )
+
+
+def _cube_level(value: Any) -> Any:
+    """A JSON-round-trippable level label (floats that are whole numbers become ints)."""
+    if isinstance(value, (np.integer, np.floating)):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def build_stats_cube(df: pd.DataFrame, group_columns: list[str], outcomes: list[str]) -> StatsCube:
+    """Accumulate a StatsCube from df in one pass of one-hot matrix products over row blocks."""
+    levels: list[tuple[str, Any]] = []
+    codes = []
+    for column in dict.fromkeys(group_columns):
+        column_codes, uniques = pd.factorize(df[column], sort=True)
+        codes.append(np.where(column_codes >= 0, column_codes + len(levels), -1))
+        levels.extend((column, _cube_level(u)) for u in uniques)
+
+    n_levels, n_outcomes, n_bins = len(levels), len(outcomes), len(CUBE_SCALE_VALUES)
+    count = np.zeros((n_levels, n_outcomes))
+    total = np.zeros((n_levels, n_outcomes))
+    total_sq = np.zeros((n_levels, n_outcomes))
+    histogram = np.zeros((n_levels, n_outcomes, n_bins))
+    overall = np.zeros((3, n_outcomes))
+    block_rows = max(1, CUBE_BLOCK_ELEMENTS // max(n_outcomes, 1))
+    outcome_frame = df[outcomes]
+    for start in range(0, len(df), block_rows):
+        block = outcome_frame.iloc[start:start + block_rows].to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(block)
+        values = np.where(valid, block, 0.0)
+        one_hot = np.zeros((len(block), n_levels))
+        for column_codes in codes:
+            block_codes = column_codes[start:start + block_rows]
+            present = block_codes >= 0
+            one_hot[np.flatnonzero(present), block_codes[present]] = 1.0
+        count += one_hot.T @ valid
+        total += one_hot.T @ values
+        total_sq += one_hot.T @ values ** 2
+        for b, scale_value in enumerate(CUBE_SCALE_VALUES):
+            histogram[:, :, b] += one_hot.T @ (block == scale_value)
+        overall += [valid.sum(axis=0), values.sum(axis=0), (values ** 2).sum(axis=0)]
+    return StatsCube(
+        levels, list(outcomes), count.astype(np.int64), total, total_sq, histogram.astype(np.int64), overall,
+    )
+
+
+def stats_cube(
+    outcomes: list[str] | None = None,
+    group_columns: list[str] | None = None,
+    parquet_path: Path = DEFAULT_PARQUET_PATH,
+    use_cache: bool = True,
+) -> StatsCube:
+    """The StatsCube for outcomes x group columns, from COLUMN_CACHE_DIR or built once and saved.
+
+    outcomes defaults to every numeric column that is not a group column;
+    group_columns defaults to CUBE_GROUP_COLUMNS (age is already binned in the
+    survey). Cubes are keyed by dataset_fingerprint plus the column lists, so
+    a changed dataset file gets a fresh cube.
+    """
+    group_columns = list(dict.fromkeys(group_columns or CUBE_GROUP_COLUMNS))
+    if outcomes is None:
+        conn = connect_data(parquet_path)
+        try:
+            relation = conn.sql("SELECT * FROM data")
+            outcomes = [
+                column for column, dtype in zip(relation.columns, relation.types)
+                if column not in group_columns
+                and (str(dtype).upper() in _SQL_NUMERIC_TYPES or str(dtype).upper().startswith("DECIMAL"))
+            ]
+        finally:
+            conn.close()
+    outcomes = list(dict.fromkeys(outcomes))
+
+    cube_key = hashlib.sha256(json.dumps([group_columns, outcomes]).encode()).hexdigest()[:16]
+    path = COLUMN_CACHE_DIR / dataset_fingerprint(parquet_path) / f"cube-{cube_key}"
+    if use_cache:
+        cube = StatsCube.load(path)
+        if cube is not None:
+            return cube
+    df = load_columns(group_columns + [c for c in outcomes if c not in group_columns], parquet_path,
+                      use_cache=use_cache)
+    cube = build_stats_cube(df, group_columns, outcomes)
+    if use_cache:
+        try:
+            cube.save(path)
+        except OSError:
+            pass  # best-effort, as with the column cache
+    return cube
+
+
+# ---------------------------------------------------------------------------
+# Survey weights
+# ---------------------------------------------------------------------------
+
+# Weighted bootstraps resample distinct (value, weight) pairs when there are at most this many.
+WEIGHTED_BOOTSTRAP_MAX_PAIRS = 4096
+
+
+def rake_weights(
+    df: pd.DataFrame,
+    targets: dict[str, dict[Any, float]],
+    max_iter: int = 100,
+    tol: float = 1e-8,
+    base_weights: pd.Series | None = None,
+) -> pd.Series:
+    """Raking (iterative proportional fitting) weights matching target marginals.
+
+    targets maps each raking column to {level: share or count}; shares are
+    normalized per column, e.g. {"biomale": {0: 0.5, 1: 0.5}, "age": {...}}.
+    Each column is factorized once; every iteration rescales the weights so
+    one margin at a time matches its target, with margin totals from
+    np.bincount over the level codes. Rows with a null raking value get a NaN
+    weight (the weighted_* functions drop them). Data levels missing from a
+    target, target levels absent from the data, and base_weights that are
+    missing or non-positive on a complete row raise ValueError.
+
+    Returns a weight Series aligned with df, scaled to mean 1 over weighted
+    rows; attrs holds converged, iterations and effective_n (Kish).
+    """
+    complete = df[list(targets)].notna().all(axis=1).to_numpy()
+    margins = []
+    for column, shares in targets.items():
+        codes, uniques = pd.factorize(df[column].to_numpy()[complete])
+        wanted = pd.Series(shares, dtype=float)
+        if (wanted < 0).any() or wanted.sum() <= 0:
+            raise ValueError(f"targets for {column!r} must be non-negative with a positive total")
+        unknown = [u for u in uniques if u not in wanted.index]
+        absent = [level for level in wanted.index if level not in set(uniques) and wanted[level] > 0]
+        if unknown or absent:
+            raise ValueError(
+                f"targets for {column!r} do not match the data: "
+                f"levels without a target {unknown}, targeted levels not in the data {absent}"
+            )
+        target = wanted.reindex(list(uniques)).to_numpy()
+        margins.append((codes, target / target.sum()))
+
+    if base_weights is None:
+        weights = np.ones(int(complete.sum()))
+    else:
+        weights = base_weights.reindex(df.index).to_numpy(dtype=float, na_value=np.nan)[complete].copy()
+        invalid = int((~(weights > 0)).sum())
+        if invalid:
+            raise ValueError(
+                f"base_weights must be positive for every row with complete raking values; "
+                f"{invalid} are missing or non-positive"
+            )
+    weights *= len(weights) / weights.sum()
+    n = len(weights)
+
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        for codes, target in margins:
+            totals = np.bincount(codes, weights=weights, minlength=len(target))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                factor = np.where(totals > 0, target * n / totals, 0.0)
+            weights *= factor[codes]
+        deviation = max(
+            np.abs(np.bincount(codes, weights=weights, minlength=len(target)) / n - target).max()
+            for codes, target in margins
+        )
+        if deviation < tol:
+            converged = True
+            break
+
+    result = np.full(len(df), np.nan)
+    result[complete] = weights
+    series = pd.Series(result, index=df.index, name="weight")
+    series.attrs["converged"] = converged
+    series.attrs["iterations"] = iteration
+    series.attrs["effective_n"] = float(weights.sum() ** 2 / (weights ** 2).sum()) if n else 0.0
+    return series
+
+
+def _weighted_sample(series: pd.Series, weights: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Values and weights (aligned on the index) where both are present and the weight is positive."""
+    w = weights.reindex(series.index).to_numpy(dtype=float, na_value=np.nan)
+    x = series.to_numpy(dtype=float, na_value=np.nan)
+    keep = ~np.isnan(x) & ~np.isnan(w) & (w > 0)
+    return x[keep], w[keep]
+
+
+def _weighted_moments(x: np.ndarray, w: np.ndarray) -> RunningMoments:
+    """Moments with weights rescaled to sum to n, so unit weights give the unweighted result."""
+    moments = RunningMoments()
+    moments.n = len(x)
+    if moments.n:
+        scaled = w * (len(x) / w.sum())
+        moments.mean = float(scaled @ x / moments.n)
+        moments.m2 = float(scaled @ (x - moments.mean) ** 2)
+    return moments
+
+
+def weighted_mean(series: pd.Series, weights: pd.Series) -> float:
+    """Weighted mean of series, with weights aligned on the index."""
+    x, w = _weighted_sample(series, weights)
+    return float(w @ x / w.sum()) if len(x) else float("nan")
+
+
+def weighted_group_means(
+    df: pd.DataFrame,
+    value_column: str,
+    group_column: str,
+    weights: pd.Series,
+) -> pd.DataFrame:
+    """Weighted mean of value_column per level of group_column, from one pass of bincounts.
+
+    Returns DataFrame with group, n (respondents), weight (sum), mean; sorted by group.
+    """
+    data = df[[value_column, group_column]].assign(_weight=weights.reindex(df.index)).dropna()
+    data = data[data["_weight"] > 0]
+    codes, uniques = pd.factorize(data[group_column], sort=True)
+    x = data[value_column].to_numpy(dtype=float)
+    w = data["_weight"].to_numpy(dtype=float)
+    weight_totals = np.bincount(codes, weights=w, minlength=len(uniques))
+    return pd.DataFrame({
+        "group": uniques,
+        "n": np.bincount(codes, minlength=len(uniques)),
+        "weight": weight_totals,
+        "mean": np.bincount(codes, weights=w * x, minlength=len(uniques)) / weight_totals,
+    })
+
+
+def weighted_cohens_d(group_a: pd.Series, group_b: pd.Series, weights: pd.Series) -> float:
+    """cohens_d with survey weights (aligned on the index); unit weights reproduce cohens_d."""
+    a = _weighted_moments(*_weighted_sample(group_a, weights))
+    b = _weighted_moments(*_weighted_sample(group_b, weights))
+    if a.n < 2 or b.n < 2:
+        return float("nan")
+    pooled_std = np.sqrt((a.m2 + b.m2) / (a.n + b.n - 2))
+    if pooled_std == 0:
+        return 0.0
+    return float((a.mean - b.mean) / pooled_std)
+
+
+def _weighted_mean_replicates(x: np.ndarray, w: np.ndarray, n_boot: int, rng: np.random.Generator) -> np.ndarray:
+    """Weighted means of n_boot row resamples.
+
+    Raked weights take one value per raking cell, so the sample usually has
+    few distinct (value, weight) pairs; then each replicate is a multinomial
+    draw over the pairs (as in the counts bootstrap). Otherwise row indices are
+    resampled in memory-bounded blocks.
+    """
+    pairs, counts = np.unique(np.column_stack([x, w]), axis=0, return_counts=True)
+    n = len(x)
+    replicates = np.empty(n_boot)
+    if len(pairs) <= WEIGHTED_BOOTSTRAP_MAX_PAIRS:
+        weighted_values, pair_weights = pairs[:, 0] * pairs[:, 1], pairs[:, 1]
+        block_rows = max(1, BOOTSTRAP_BLOCK_ELEMENTS // len(pairs))
+        for start in range(0, n_boot, block_rows):
+            rows = min(block_rows, n_boot - start)
+            draws = rng.multinomial(n, counts / n, size=rows)
+            replicates[start:start + rows] = draws @ weighted_values / (draws @ pair_weights)
+        return replicates
+    weighted_values = x * w
+    block_rows = max(1, BOOTSTRAP_BLOCK_ELEMENTS // n)
+    for start in range(0, n_boot, block_rows):
+        rows = min(block_rows, n_boot - start)
+        indices = rng.integers(0, n, size=(rows, n))
+        replicates[start:start + rows] = weighted_values[indices].sum(axis=1) / w[indices].sum(axis=1)
+    return replicates
+
+
+def weighted_bootstrap_ci(
+    series: pd.Series,
+    weights: pd.Series,
+    n_boot: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 42,
+) -> dict[str, float]:
+    """Bootstrap confidence interval for the weighted mean (respondents resampled with their weights).
+
+    Returns dict with keys: estimate, ci_low, ci_high, n.
+    """
+    x, w = _weighted_sample(series, weights)
+    n = len(x)
+    if n < 5:
+        return {"estimate": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"), "n": n}
+    boot_stats = _weighted_mean_replicates(x, w, n_boot, np.random.default_rng(seed))
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.quantile(boot_stats, [alpha, 1 - alpha])
+    return {"estimate": float(w @ x / w.sum()), "ci_low": float(ci_low), "ci_high": float(ci_high), "n": n}
+
+
+def weighted_bootstrap_diff(
+    group_a: pd.Series,
+    group_b: pd.Series,
+    weights: pd.Series,
+    n_boot: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 42,
+) -> dict[str, float]:
+    """Bootstrap confidence interval for the difference in weighted means between two groups.
+
+    Returns dict with: diff, ci_low, ci_high, n_a, n_b, significant (CI excludes 0).
+    """
+    x_a, w_a = _weighted_sample(group_a, weights)
+    x_b, w_b = _weighted_sample(group_b, weights)
+    if len(x_a) < 5 or len(x_b) < 5:
+        return {"diff": float("nan"), "ci_low": float("nan"), "ci_high": float("nan"),
+                "n_a": len(x_a), "n_b": len(x_b), "significant": False}
+    rng = np.random.default_rng(seed)
+    diffs = _weighted_mean_replicates(x_a, w_a, n_boot, rng) - _weighted_mean_replicates(x_b, w_b, n_boot, rng)
+    alpha = (1 - confidence) / 2
+    ci_low, ci_high = np.quantile(diffs, [alpha, 1 - alpha])
+    return {
+        "diff": float(w_a @ x_a / w_a.sum() - w_b @ x_b / w_b.sum()),
+        "ci_low": float(ci_low),
+        "ci_high": float(ci_high),
+        "n_a": len(x_a),
+        "n_b": len(x_b),
+        "significant": bool(ci_low > 0 or ci_high < 0),
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -496,28 +2858,50 @@ def winsorized_mean(series: pd.Series, limits: tuple[float, float] = (0.05, 0.05
 def compare_binnings(
     df: pd.DataFrame,
     numeric_col: str,
-    outcome_col: str,
+    outcome_col: str | list[str],
     bin_schemes: dict[str, list[float]] | None = None,
-) -> dict[str, list[dict[str, Any]]]:
+) -> dict[str, Any]:
     """Check if results are robust to different binning of a numeric variable.
 
-    Default bin schemes: tertiles, quartiles, quintiles.
+    Default bin schemes: tertiles, quartiles, quintiles. The numeric column is
+    cleaned once, every scheme's edges come from one quantile call, and each
+    scheme assigns bins once with np.digitize; per-bin counts and sums for all
+    outcomes come from a single np.bincount. Bins follow pd.cut(include_lowest=True).
+
+    Returns {scheme: [{"bin", "mean", "n"}, ...]} for one outcome column, or
+    {outcome: {scheme: [...]}} when outcome_col is a list.
     """
+    outcomes = [outcome_col] if isinstance(outcome_col, str) else list(dict.fromkeys(outcome_col))
+    x = df[numeric_col].to_numpy(dtype=float, na_value=np.nan)
     if bin_schemes is None:
-        vals = df[numeric_col].dropna()
-        bin_schemes = {
-            "tertiles": list(np.quantile(vals, [0, 1/3, 2/3, 1])),
-            "quartiles": list(np.quantile(vals, [0, 0.25, 0.5, 0.75, 1])),
-            "quintiles": list(np.quantile(vals, [0, 0.2, 0.4, 0.6, 0.8, 1])),
-        }
-
-    results = {}
+        probabilities = {"tertiles": [0, 1/3, 2/3, 1], "quartiles": [0, 0.25, 0.5, 0.75, 1],
+                         "quintiles": [0, 0.2, 0.4, 0.6, 0.8, 1]}
+        edges = np.quantile(x[~np.isnan(x)], np.concatenate(list(probabilities.values())))
+        splits = np.cumsum([len(p) for p in probabilities.values()])[:-1]
+        bin_schemes = {name: list(e) for name, e in zip(probabilities, np.split(edges, splits))}
+
+    y = df[outcomes].to_numpy(dtype=float, na_value=np.nan)
+    valid = ~np.isnan(y) & ~np.isnan(x)[:, None]
+    rows, columns = np.nonzero(valid)
+    values = y[rows, columns]
+
+    results: dict[str, dict[str, list[dict[str, Any]]]] = {oc: {} for oc in outcomes}
     for scheme_name, bins in bin_schemes.items():
-        df_temp = df[[numeric_col, outcome_col]].dropna().copy()
-        df_temp["bin"] = pd.cut(df_temp[numeric_col], bins=bins, include_lowest=True)
-        grouped = df_temp.groupby("bin", observed=True)[outcome_col].agg(["mean", "count"])
-        results[scheme_name] = [
-            {"bin": str(idx), "mean": round(float(row["mean"]), 3), "n": int(row["count"])}
-            for idx, row in grouped.iterrows()
-        ]
-    return results
+        # pd.cut on no data validates the edges and yields the interval labels.
+        labels = pd.cut(np.empty(0), bins=bins, include_lowest=True).categories
+        edges = np.asarray(bins, dtype=float)
+        codes = np.digitize(x, edges, right=True) - 1
+        codes[x == edges[0]] = 0
+        codes[(codes < 0) | (codes >= len(labels))] = -1
+        cell_codes = codes[rows]
+        in_range = cell_codes >= 0
+        flat = cell_codes[in_range] * len(outcomes) + columns[in_range]
+        size = len(labels) * len(outcomes)
+        counts = np.bincount(flat, minlength=size).reshape(len(labels), len(outcomes))
+        sums = np.bincount(flat, weights=values[in_range], minlength=size).reshape(len(labels), len(outcomes))
+        for j, oc in enumerate(outcomes):
+            results[oc][scheme_name] = [
+                {"bin": str(label), "mean": round(float(sums[b, j] / counts[b, j]), 3), "n": int(counts[b, j])}
+                for b, label in enumerate(labels) if counts[b, j]
+            ]
+    return results[outcome_col] if isinstance(outcome_col, str) else results
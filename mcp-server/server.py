@@ -2,20 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+import bisect
+import hashlib
 import json
 import os
 import re
+import threading
 import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import date, datetime, time as datetime_time
 from decimal import Decimal
 from pathlib import Path
 from typing import Any
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
 
 import duckdb
+import httpx
 from duckdb import DuckDBPyConnection
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 PARQUET_PATH = os.environ.get(
     "BKS_PARQUET_PATH",
@@ -32,11 +39,53 @@ DEFAULT_TOP_N = int(os.environ.get("BKS_TOP_N_DEFAULT", "20"))
 MAX_TOP_N = int(os.environ.get("BKS_TOP_N_MAX", "100"))
 NULL_LABEL = "<NULL>"
 
+QUERY_REJECT_ROWS = int(os.environ.get("BKS_QUERY_REJECT_ROWS", "50000000"))
+QUERY_LOW_PRIORITY_ROWS = int(os.environ.get("BKS_QUERY_LOW_PRIORITY_ROWS", "2000000"))
+LOW_PRIORITY_CONCURRENCY = int(os.environ.get("BKS_QUERY_LOW_PRIORITY_CONCURRENCY", "1"))
+UNCONSTRAINED_JOIN_OPERATORS = {
+    "CROSS_PRODUCT",
+    "NESTED_LOOP_JOIN",
+    "BLOCKWISE_NL_JOIN",
+    "PIECEWISE_MERGE_JOIN",
+}
+APPROXIMATE_SUGGESTION = (
+    "Aggregate before joining, add an equality join condition, or use approximate "
+    "aggregates (approx_count_distinct, approx_quantile) over `data USING SAMPLE 10%`."
+)
+
+APPROX_DISTINCT_THRESHOLD = int(os.environ.get("BKS_APPROX_DISTINCT_THRESHOLD", "5000"))
+# DuckDB's approx_count_distinct is a HyperLogLog with 64 registers: 1.04 / sqrt(64).
+HLL_RELATIVE_STANDARD_ERROR = 0.13
+
+DEFAULT_BINS = 10
+MAX_BINS = 100
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+MAX_QUANTILES = 50
+MAX_DISTRIBUTION_GROUPS = int(os.environ.get("BKS_DISTRIBUTION_MAX_GROUPS", "20"))
+SKETCH_MAX_CENTROIDS = int(os.environ.get("BKS_SKETCH_MAX_CENTROIDS", "512"))
+DISTRIBUTION_CACHE_SIZE = int(os.environ.get("BKS_DISTRIBUTION_CACHE_SIZE", "128"))
+BINNING_MODES = {"equal_width", "quantile"}
+
+COHORT_TTL_SECONDS = int(os.environ.get("BKS_COHORT_TTL_SECONDS", "1800"))
+COHORT_MAX_BYTES = int(os.environ.get("BKS_COHORT_MAX_BYTES", str(64 * 1024 * 1024)))
+COHORT_ROW_ID_BYTES = 8
+COHORT_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_-]{0,63}$")
+
 ANALYTICS_API_URL = os.environ.get(
     "BKS_ANALYTICS_API_URL",
     "https://bks-explorer-production.up.railway.app/survey/api/analytics",
 )
 ANALYTICS_API_KEY = os.environ.get("BKS_ANALYTICS_KEY")
+LOCAL_TABLE_NAMES = {DATA_TABLE, f"main.{DATA_TABLE}"}
+ANALYTICS_CACHE_TTL_SECONDS = float(os.environ.get("BKS_ANALYTICS_CACHE_TTL_SECONDS", "30"))
+ANALYTICS_CACHE_STALE_SECONDS = float(os.environ.get("BKS_ANALYTICS_CACHE_STALE_SECONDS", "300"))
+ANALYTICS_CACHE_MAX_ENTRIES = int(os.environ.get("BKS_ANALYTICS_CACHE_MAX_ENTRIES", "256"))
+ANALYTICS_MAX_CONNECTIONS = int(os.environ.get("BKS_ANALYTICS_MAX_CONNECTIONS", "8"))
+ANALYTICS_MAX_CONCURRENT = int(os.environ.get("BKS_ANALYTICS_MAX_CONCURRENT", "4"))
+ANALYTICS_BREAKER_FAILURES = int(os.environ.get("BKS_ANALYTICS_BREAKER_FAILURES", "5"))
+ANALYTICS_BREAKER_RESET_SECONDS = float(
+    os.environ.get("BKS_ANALYTICS_BREAKER_RESET_SECONDS", "30")
+)
 
 READ_ONLY_PREFIXES = {"SELECT", "WITH", "DESCRIBE", "EXPLAIN"}
 MUTATING_KEYWORDS_RE = re.compile(
@@ -70,6 +119,35 @@ if _transport == "streamable-http":
 mcp = FastMCP("Big Kink Survey", **_mcp_kwargs)
 
 
+class SingleFlight:
+    """Share one in-flight execution between concurrent callers with the same key.
+
+    The work runs in a worker thread as a detached task, so a caller that is
+    cancelled does not cancel the execution the other callers are waiting on.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+
+    async def run(self, key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(fn))
+            self._inflight[key] = task
+
+            def forget(done: asyncio.Future[Any]) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+        return await asyncio.shield(task), coalesced
+
+
+single_flight = SingleFlight()
+low_priority_lane = threading.BoundedSemaphore(max(1, LOW_PRIORITY_CONCURRENCY))
+
+
 def success(data: Any, meta: dict[str, Any] | None = None) -> dict[str, Any]:
     payload: dict[str, Any] = {"ok": True, "data": data}
     if meta is not None:
@@ -84,6 +162,14 @@ def failure(code: str, message: str, details: Any | None = None) -> dict[str, An
     return {"ok": False, "error": error}
 
 
+def mark_coalesced(payload: dict[str, Any], coalesced: bool) -> dict[str, Any]:
+    if not payload.get("ok"):
+        return payload
+    meta = dict(payload.get("meta") or {})
+    meta["coalesced"] = coalesced
+    return {**payload, "meta": meta}
+
+
 def normalize_limit(
     limit: int | None,
     *,
@@ -188,21 +274,577 @@ def with_timeout(conn: DuckDBPyConnection, timeout_ms: int) -> bool:
         return False
 
 
-def get_connection(timeout_ms: int = DEFAULT_TIMEOUT_MS) -> tuple[DuckDBPyConnection, bool]:
+def dataset_fingerprint() -> str:
+    dataset_path = Path(PARQUET_PATH)
+    try:
+        stat = dataset_path.stat()
+    except OSError:
+        return f"missing:{dataset_path}"
+    raw = f"{dataset_path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def coalesce_key(tool: str, arguments: dict[str, Any]) -> str:
+    return json.dumps(
+        {"tool": tool, "arguments": arguments, "dataset": dataset_fingerprint()},
+        sort_keys=True,
+    )
+
+
+async def run_coalesced(
+    tool: str,
+    arguments: dict[str, Any],
+    fn: Callable[[], dict[str, Any]],
+) -> dict[str, Any]:
+    payload, coalesced = await single_flight.run(coalesce_key(tool, arguments), fn)
+    return mark_coalesced(payload, coalesced)
+
+
+class CohortExpiredError(LookupError):
+    """A cohort disappeared between lookup_cohort and opening its connection."""
+
+
+@dataclass
+class Cohort:
+    session: str
+    name: str
+    where_sql: str
+    table: str
+    row_count: int
+    fingerprint: str
+    created_at: float
+    expires_at: float
+    last_used_at: float
+
+    @property
+    def size_bytes(self) -> int:
+        return self.row_count * COHORT_ROW_ID_BYTES
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "whereSql": self.where_sql,
+            "rowCount": self.row_count,
+            "sizeBytes": self.size_bytes,
+            "createdAt": datetime.fromtimestamp(self.created_at).isoformat(),
+            "expiresAt": datetime.fromtimestamp(self.expires_at).isoformat(),
+        }
+
+
+class CohortStore:
+    """Session-scoped named cohorts, materialized once as row-id tables.
+
+    Row ids are parquet file row numbers kept in an in-memory DuckDB database
+    owned by the session; tool connections for a cohort are cursors on that
+    database with a temporary `data` view that semi-joins the parquet against
+    the row ids, so the cohort filter is never re-evaluated and SQL run for one
+    session cannot see another session's tables. Cohorts expire after a TTL and
+    the least recently used ones are evicted once the row-id tables exceed the
+    memory cap; a session's database is closed once it holds no cohorts.
+    """
+
+    def __init__(self, ttl_seconds: int, max_bytes: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._cohorts: dict[tuple[str, str], Cohort] = {}
+        self._databases: dict[str, DuckDBPyConnection] = {}
+        self._defining: dict[str, int] = {}
+
+    def cursor(self, cohort: Cohort) -> DuckDBPyConnection:
+        """A cursor on the cohort's session database, without ever creating one.
+
+        Raises CohortExpiredError once the cohort has been evicted, expired or
+        replaced since it was looked up.
+        """
+        with self._lock:
+            db = self._databases.get(cohort.session)
+            if self._cohorts.get((cohort.session, cohort.name)) is not cohort or db is None:
+                raise CohortExpiredError(cohort.name)
+            return db.cursor()
+
+    def _database_locked(self, session: str) -> DuckDBPyConnection:
+        db = self._databases.get(session)
+        if db is None:
+            db = self._databases[session] = duckdb.connect(":memory:")
+        return db
+
+    def define(
+        self,
+        session: str,
+        name: str,
+        where_sql: str,
+        timeout_ms: int,
+    ) -> tuple[Cohort, bool]:
+        table = f"cohort_{uuid.uuid4().hex}"
+        with self._lock:
+            db = self._database_locked(session)
+            self._defining[session] = self._defining.get(session, 0) + 1
+        try:
+            conn = db.cursor()
+            try:
+                timeout_enforced = with_timeout(conn, timeout_ms)
+                conn.execute(
+                    f"CREATE TABLE {table} AS "
+                    f"SELECT file_row_number AS row_id "
+                    f"FROM {parquet_source(file_row_number=True)} AS {DATA_TABLE} "
+                    f"WHERE ({where_sql}) ORDER BY 1"
+                )
+                row_count = int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+            finally:
+                conn.close()
+
+            now = time.time()
+            cohort = Cohort(
+                session=session,
+                name=name,
+                where_sql=where_sql,
+                table=table,
+                row_count=row_count,
+                fingerprint=dataset_fingerprint(),
+                created_at=now,
+                expires_at=now + self.ttl_seconds,
+                last_used_at=now,
+            )
+            if cohort.size_bytes > self.max_bytes:
+                self._drop_tables([cohort])
+                raise ValueError(
+                    f"Cohort '{name}' needs {cohort.size_bytes} bytes of row ids, "
+                    f"above the {self.max_bytes} byte cap."
+                )
+
+            with self._lock:
+                replaced = self._cohorts.pop((session, name), None)
+                self._cohorts[(session, name)] = cohort
+                stale = self._evict_locked(now)
+            if replaced is not None:
+                stale.append(replaced)
+            self._drop_tables(stale)
+            return cohort, timeout_enforced
+        finally:
+            with self._lock:
+                self._defining[session] -= 1
+                if not self._defining[session]:
+                    del self._defining[session]
+            self._close_idle({session})
+
+    def get(self, session: str, name: str) -> Cohort | None:
+        now = time.time()
+        fingerprint = dataset_fingerprint()
+        with self._lock:
+            stale = self._evict_locked(now)
+            cohort = self._cohorts.get((session, name))
+            if cohort is not None and cohort.fingerprint != fingerprint:
+                del self._cohorts[(session, name)]
+                stale.append(cohort)
+                cohort = None
+            if cohort is not None:
+                cohort.last_used_at = now
+                cohort.expires_at = now + self.ttl_seconds
+        self._drop_tables(stale)
+        return cohort
+
+    def _evict_locked(self, now: float) -> list[Cohort]:
+        evicted = [key for key, cohort in self._cohorts.items() if cohort.expires_at <= now]
+        stale = [self._cohorts.pop(key) for key in evicted]
+
+        total = sum(cohort.size_bytes for cohort in self._cohorts.values())
+        by_age = sorted(self._cohorts.items(), key=lambda item: item[1].last_used_at)
+        for key, cohort in by_age[:-1]:
+            if total <= self.max_bytes:
+                break
+            del self._cohorts[key]
+            stale.append(cohort)
+            total -= cohort.size_bytes
+        return stale
+
+    def _drop_tables(self, cohorts: list[Cohort]) -> None:
+        if not cohorts:
+            return
+        for cohort in cohorts:
+            with self._lock:
+                db = self._databases.get(cohort.session)
+            if db is None:
+                continue
+            try:
+                conn = db.cursor()
+            except duckdb.ConnectionException:
+                continue  # closed concurrently; the table went with it
+            try:
+                conn.execute(f"DROP TABLE IF EXISTS {cohort.table}")
+            finally:
+                conn.close()
+        self._close_idle({cohort.session for cohort in cohorts})
+
+    def _close_idle(self, sessions: set[str]) -> None:
+        idle: list[DuckDBPyConnection] = []
+        with self._lock:
+            live = {session for session, _ in self._cohorts} | set(self._defining)
+            for session in sessions - live:
+                db = self._databases.pop(session, None)
+                if db is not None:
+                    idle.append(db)
+        for db in idle:
+            db.close()
+
+
+cohort_store = CohortStore(COHORT_TTL_SECONDS, COHORT_MAX_BYTES)
+
+
+def session_key(ctx: Context | None) -> str:
+    if ctx is None:
+        return "local"
+    try:
+        request = ctx.request_context.request
+    except ValueError:
+        return "local"
+    headers = getattr(request, "headers", None)
+    session_id = headers.get("mcp-session-id") if headers is not None else None
+    return session_id or "local"
+
+
+def lookup_cohort(
+    ctx: Context | None,
+    cohort: str | None,
+) -> tuple[Cohort | None, dict[str, Any] | None]:
+    if cohort is None or not str(cohort).strip():
+        return None, None
+    name = str(cohort).strip()
+    found = cohort_store.get(session_key(ctx), name)
+    if found is None:
+        return None, cohort_not_found(name)
+    return found, None
+
+
+def cohort_not_found(name: str) -> dict[str, Any]:
+    return failure(
+        "COHORT_NOT_FOUND",
+        f"Cohort '{name}' is not defined for this session (it may have expired).",
+        {"hint": "Call define_cohort(name, where_sql) first."},
+    )
+
+
+def cohort_meta(cohort: Cohort | None) -> dict[str, Any]:
+    if cohort is None:
+        return {}
+    return {"cohort": {"name": cohort.name, "rowCount": cohort.row_count}}
+
+
+def parquet_source(*, file_row_number: bool = False) -> str:
+    escaped_path = str(Path(PARQUET_PATH)).replace("'", "''")
+    if file_row_number:
+        return f"read_parquet('{escaped_path}', file_row_number=true)"
+    return f"read_parquet('{escaped_path}')"
+
+
+def get_connection(
+    timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    cohort: Cohort | None = None,
+) -> tuple[DuckDBPyConnection, bool]:
     dataset_path = Path(PARQUET_PATH)
     if not dataset_path.exists():
         raise FileNotFoundError(str(dataset_path))
 
-    conn = duckdb.connect(":memory:")
-    escaped_path = str(dataset_path).replace("'", "''")
-    conn.execute(
-        f"CREATE OR REPLACE VIEW {DATA_TABLE} AS "
-        f"SELECT * FROM read_parquet('{escaped_path}')"
-    )
+    if cohort is None:
+        conn = duckdb.connect(":memory:")
+        conn.execute(
+            f"CREATE OR REPLACE VIEW {DATA_TABLE} AS SELECT * FROM {parquet_source()}"
+        )
+    else:
+        conn = cohort_store.cursor(cohort)
+        conn.execute(
+            f"CREATE OR REPLACE TEMP VIEW {DATA_TABLE} AS "
+            f"SELECT * EXCLUDE (file_row_number) "
+            f"FROM {parquet_source(file_row_number=True)} "
+            f"WHERE file_row_number IN (SELECT row_id FROM {cohort.table})"
+        )
     timeout_enforced = with_timeout(conn, timeout_ms)
     return conn, timeout_enforced
 
 
+def parse_cardinality(value: Any) -> int | None:
+    if value is None:
+        return None
+    match = re.search(r"\d+", str(value).replace(",", ""))
+    return int(match.group(0)) if match else None
+
+
+def estimate_query_cost(conn: DuckDBPyConnection, sql: str) -> dict[str, Any]:
+    """Estimate query cost from DuckDB's optimizer plan without executing it.
+
+    Operators without a cardinality estimate inherit their largest input, except
+    cross products, which are charged the product of their inputs.
+    """
+    row = conn.execute(f"EXPLAIN (FORMAT JSON) {sql}").fetchone()
+    plan = json.loads(row[1]) if row else []
+    operators: list[tuple[str, int]] = []
+
+    def visit(node: dict[str, Any]) -> int:
+        child_rows = [visit(child) for child in node.get("children") or []]
+        name = str(node.get("name", "")).strip()
+        info = node.get("extra_info") or {}
+        estimate = parse_cardinality(info.get("Estimated Cardinality"))
+        if estimate is None:
+            if name == "CROSS_PRODUCT" and child_rows:
+                estimate = 1
+                for rows in child_rows:
+                    estimate *= max(rows, 1)
+            else:
+                estimate = max(child_rows, default=0)
+        operators.append((name, estimate))
+        return estimate
+
+    for root in plan if isinstance(plan, list) else [plan]:
+        visit(root)
+
+    estimated_rows = max((rows for _, rows in operators), default=0)
+    unconstrained_joins = [name for name, _ in operators if name in UNCONSTRAINED_JOIN_OPERATORS]
+    if estimated_rows > QUERY_REJECT_ROWS:
+        lane = "rejected"
+    elif estimated_rows > QUERY_LOW_PRIORITY_ROWS or unconstrained_joins:
+        lane = "low_priority"
+    else:
+        lane = "normal"
+    return {
+        "estimatedRows": estimated_rows,
+        "estimatedWork": sum(rows for _, rows in operators),
+        "operatorCount": len(operators),
+        "unconstrainedJoins": unconstrained_joins,
+        "lane": lane,
+        "rejectRows": QUERY_REJECT_ROWS,
+        "lowPriorityRows": QUERY_LOW_PRIORITY_ROWS,
+    }
+
+
+def use_exact_counts(exact: bool | None, estimated_distinct: int) -> bool:
+    if exact is not None:
+        return bool(exact)
+    return estimated_distinct <= APPROX_DISTINCT_THRESHOLD
+
+
+def distinct_count_error(estimate: int) -> dict[str, Any]:
+    margin = 1.96 * HLL_RELATIVE_STANDARD_ERROR * estimate
+    return {
+        "method": "hyperloglog",
+        "relativeStandardError": HLL_RELATIVE_STANDARD_ERROR,
+        "ci95Low": max(0, int(estimate - margin)),
+        "ci95High": int(estimate + margin + 0.5),
+    }
+
+
+def top_k_error(non_null: int, top_n: int) -> dict[str, Any]:
+    # Space-Saving monitors at least k values, so any value seen in more than
+    # n / k rows is guaranteed to be a candidate; candidate counts are exact.
+    return {
+        "method": "approx_top_k",
+        "countsExact": True,
+        "guaranteedAboveCount": non_null // max(top_n, 1),
+    }
+
+
+def top_value_counts(
+    conn: DuckDBPyConnection,
+    base_sql: str,
+    value_column: str,
+    top_n: int,
+    exact: bool,
+) -> tuple[list[tuple[Any, int]], int | None]:
+    """Return the top values of `value_column` in `base_sql` with their counts.
+
+    The exact path also returns the exact distinct count from the same GROUP BY.
+    The approximate path picks candidates with a heavy-hitters sketch and only
+    counts those, skipping the group-by and sort over every distinct value.
+    """
+    if exact:
+        rows = conn.execute(
+            f"WITH base AS ({base_sql}) "
+            f"SELECT {value_column}, COUNT(*)::BIGINT AS count, "
+            f"COUNT(*) OVER ()::BIGINT AS distinct_count "
+            f"FROM base GROUP BY 1 "
+            f"ORDER BY count DESC, {value_column} ASC "
+            f"LIMIT ?",
+            [top_n],
+        ).fetchall()
+        distinct_count = int(rows[0][2]) if rows else 0
+        return [(row[0], int(row[1])) for row in rows], distinct_count
+
+    rows = conn.execute(
+        f"WITH base AS ({base_sql}), "
+        f"hitters AS (SELECT unnest(approx_top_k({value_column}, ?)) AS hitter FROM base) "
+        f"SELECT {value_column}, COUNT(*)::BIGINT AS count "
+        f"FROM base WHERE {value_column} IN (SELECT hitter FROM hitters) "
+        f"GROUP BY 1 "
+        f"ORDER BY count DESC, {value_column} ASC "
+        f"LIMIT ?",
+        [top_n, top_n],
+    ).fetchall()
+    return [(row[0], int(row[1])) for row in rows], None
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch over weighted centroids.
+
+    Built from exact (value, count) pairs, so it stays exact until more than
+    `max_centroids` distinct values force adjacent centroids to be merged. Two
+    sketches merge by pooling centroids and recompressing, which lets per-group
+    sketches be combined into the overall distribution without another scan.
+    """
+
+    def __init__(
+        self,
+        centroids: list[tuple[float, int]],
+        *,
+        minimum: float | None,
+        maximum: float | None,
+        exact: bool = True,
+        max_centroids: int = SKETCH_MAX_CENTROIDS,
+    ) -> None:
+        self.centroids = sorted(centroids)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.exact = exact
+        self.max_centroids = max_centroids
+        self.compress()
+
+    @classmethod
+    def from_value_counts(
+        cls,
+        value_counts: list[tuple[float, int]],
+        max_centroids: int = SKETCH_MAX_CENTROIDS,
+    ) -> QuantileSketch:
+        values = [value for value, _ in value_counts]
+        return cls(
+            [(float(value), int(count)) for value, count in value_counts],
+            minimum=min(values) if values else None,
+            maximum=max(values) if values else None,
+            max_centroids=max_centroids,
+        )
+
+    @property
+    def count(self) -> int:
+        return sum(weight for _, weight in self.centroids)
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        bounds = [value for value in (self.minimum, other.minimum) if value is not None]
+        upper = [value for value in (self.maximum, other.maximum) if value is not None]
+        return QuantileSketch(
+            self.centroids + other.centroids,
+            minimum=min(bounds) if bounds else None,
+            maximum=max(upper) if upper else None,
+            exact=self.exact and other.exact,
+            max_centroids=max(self.max_centroids, other.max_centroids),
+        )
+
+    def compress(self) -> None:
+        merged: list[tuple[float, int]] = []
+        for value, weight in self.centroids:
+            if merged and merged[-1][0] == value:
+                merged[-1] = (value, merged[-1][1] + weight)
+            else:
+                merged.append((value, weight))
+        if len(merged) > self.max_centroids:
+            # Equal-weight buckets keep quantile error roughly uniform in rank.
+            target = self.count / self.max_centroids
+            compressed: list[tuple[float, int]] = []
+            total_sum = 0.0
+            total_weight = 0
+            for value, weight in merged:
+                total_sum += value * weight
+                total_weight += weight
+                if total_weight >= target:
+                    compressed.append((total_sum / total_weight, total_weight))
+                    total_sum, total_weight = 0.0, 0
+            if total_weight:
+                compressed.append((total_sum / total_weight, total_weight))
+            merged = compressed
+            self.exact = False
+        self.centroids = merged
+
+    def mean(self) -> float | None:
+        count = self.count
+        if not count:
+            return None
+        return sum(value * weight for value, weight in self.centroids) / count
+
+    def value_at_rank(self, rank: int) -> float:
+        cumulative = 0
+        for value, weight in self.centroids:
+            cumulative += weight
+            if rank < cumulative:
+                return value
+        return self.centroids[-1][0]
+
+    def quantile(self, q: float) -> float | None:
+        """Interpolated quantile, matching DuckDB `quantile_cont` on exact sketches."""
+        count = self.count
+        if not count:
+            return None
+        position = (count - 1) * q
+        lower_rank = int(position)
+        lower = self.value_at_rank(lower_rank)
+        upper = self.value_at_rank(min(lower_rank + 1, count - 1))
+        return lower + (upper - lower) * (position - lower_rank)
+
+    def histogram(self, edges: list[float]) -> list[int]:
+        counts = [0] * (len(edges) - 1)
+        if not counts:
+            return counts
+        for value, weight in self.centroids:
+            index = bisect.bisect_right(edges, value) - 1
+            counts[max(0, min(index, len(counts) - 1))] += weight
+        return counts
+
+
+distribution_cache: OrderedDict[str, dict[str, QuantileSketch]] = OrderedDict()
+distribution_cache_lock = threading.Lock()
+
+
+def cached_sketches(
+    key: str,
+    build: Callable[[], dict[str, QuantileSketch]],
+) -> tuple[dict[str, QuantileSketch], bool]:
+    with distribution_cache_lock:
+        sketches = distribution_cache.get(key)
+        if sketches is not None:
+            distribution_cache.move_to_end(key)
+            return sketches, True
+    sketches = build()
+    with distribution_cache_lock:
+        distribution_cache[key] = sketches
+        distribution_cache.move_to_end(key)
+        while len(distribution_cache) > DISTRIBUTION_CACHE_SIZE:
+            distribution_cache.popitem(last=False)
+    return sketches, False
+
+
+def normalize_quantiles(quantiles: list[float] | None) -> list[float]:
+    if not quantiles:
+        return list(DEFAULT_QUANTILES)
+    cleaned = sorted({float(q) for q in quantiles})
+    if any(q < 0 or q > 1 for q in cleaned):
+        raise ValueError("quantiles must be between 0 and 1")
+    return cleaned[:MAX_QUANTILES]
+
+
+def distribution_summary(
+    sketch: QuantileSketch,
+    quantiles: list[float],
+    edges: list[float],
+) -> dict[str, Any]:
+    counts = sketch.histogram(edges)
+    return {
+        "count": sketch.count,
+        "min": sketch.minimum,
+        "max": sketch.maximum,
+        "mean": sketch.mean(),
+        "quantiles": [{"q": q, "value": sketch.quantile(q)} for q in quantiles],
+        "histogram": [
+            {"low": edges[index], "high": edges[index + 1], "count": count}
+            for index, count in enumerate(counts)
+        ],
+    }
+
+
 def describe_columns(conn: DuckDBPyConnection) -> list[dict[str, Any]]:
     rows = conn.execute(f"DESCRIBE {DATA_TABLE}").fetchall()
     return [
@@ -270,12 +912,19 @@ def get_schema(timeout_ms: int = DEFAULT_TIMEOUT_MS) -> dict[str, Any]:
 
 
 @mcp.tool()
-def query_data(
+async def query_data(
     sql: str,
     limit: int = DEFAULT_LIMIT,
     timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    cohort: str | None = None,
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
-    """Run a bounded read-only SQL query against the BKS dataset (table name: data)."""
+    """Run a bounded read-only SQL query against the BKS dataset (table name: data).
+
+    With `cohort`, `data` only contains the rows of that named cohort. Queries are
+    cost-estimated first: very expensive plans are rejected with QUERY_TOO_EXPENSIVE
+    and expensive ones run one at a time in a low-priority lane.
+    """
     if not isinstance(sql, str) or not sql.strip():
         return failure("MISSING_SQL", "sql field is required")
 
@@ -285,20 +934,53 @@ def query_data(
     if cleaned is None:
         return failure("UNSAFE_SQL", "Invalid SQL query")
 
+    cohort_entry, cohort_error = await asyncio.to_thread(lookup_cohort, ctx, cohort)
+    if cohort_error:
+        return cohort_error
+
     bounded_limit = normalize_limit(limit)
     timeout = normalize_timeout_ms(timeout_ms)
-    stmt_type = statement_type(cleaned)
+    return await asyncio.to_thread(
+        execute_query, cleaned, bounded_limit, timeout, cohort_entry
+    )
 
+
+def execute_query(
+    cleaned: str,
+    bounded_limit: int,
+    timeout: int,
+    cohort: Cohort | None = None,
+) -> dict[str, Any]:
+    stmt_type = statement_type(cleaned)
     conn: DuckDBPyConnection | None = None
+    lane_acquired = False
     start = time.perf_counter()
     try:
-        conn, timeout_enforced = get_connection(timeout)
+        conn, timeout_enforced = get_connection(timeout, cohort)
         if stmt_type in {"SELECT", "WITH"}:
             bounded_sql = (
                 f"SELECT * FROM ({cleaned}) AS _bks_query_result LIMIT {bounded_limit}"
             )
+            cost = estimate_query_cost(conn, bounded_sql)
         else:
             bounded_sql = cleaned
+            cost = None
+
+        if cost is not None and cost["lane"] == "rejected":
+            return failure(
+                "QUERY_TOO_EXPENSIVE",
+                "Query plan is estimated to be too expensive to run.",
+                {"costEstimate": cost, "suggestion": APPROXIMATE_SUGGESTION},
+            )
+        if cost is not None and cost["lane"] == "low_priority":
+            lane_acquired = low_priority_lane.acquire(timeout=max(timeout / 1000, 1))
+            if not lane_acquired:
+                return failure(
+                    "QUERY_QUEUE_TIMEOUT",
+                    "Timed out waiting for the low-priority query lane.",
+                    {"costEstimate": cost, "suggestion": APPROXIMATE_SUGGESTION},
+                )
+            cost = {**cost, "suggestion": APPROXIMATE_SUGGESTION}
 
         result = conn.execute(bounded_sql)
         columns = [desc[0] for desc in (result.description or [])]
@@ -320,8 +1002,12 @@ def query_data(
                 "timeoutEnforced": timeout_enforced,
                 "durationMs": elapsed_ms,
                 "mayBeTruncated": may_be_truncated,
+                "costEstimate": cost,
+                **cohort_meta(cohort),
             },
         )
+    except CohortExpiredError as exc:
+        return cohort_not_found(exc.args[0])
     except FileNotFoundError:
         return failure(
             "DATASET_NOT_FOUND",
@@ -337,95 +1023,308 @@ def query_data(
         )
         return failure(code, message, {"reason": str(exc)})
     finally:
+        if lane_acquired:
+            low_priority_lane.release()
         if conn is not None:
             conn.close()
 
 
 @mcp.tool()
-def query_analytics(
-    sql: str,
-    limit: int = DEFAULT_LIMIT,
+async def define_cohort(
+    name: str,
+    where_sql: str,
     timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
-    """Proxy a bounded read-only analytics SQL query to the Explorer `/api/analytics` endpoint."""
-    if not ANALYTICS_API_KEY:
-        return failure(
-          "ANALYTICS_KEY_MISSING",
-          "Set BKS_ANALYTICS_KEY on the MCP service to enable analytics queries.",
-      )
+    """Materialize a named subgroup once so get_stats, cross_tabulate and query_data can reuse it via `cohort`.
 
-    if not ANALYTICS_API_URL:
+    `where_sql` is a boolean filter over `data` columns, e.g. `biomale = 0 AND straightness = 'Not straight'`.
+    Cohorts are scoped to the MCP session, expire after an idle TTL, and redefining a name replaces it.
+    """
+    if not isinstance(name, str) or not COHORT_NAME_RE.match(name.strip()):
         return failure(
-          "ANALYTICS_URL_MISSING",
-          "Set BKS_ANALYTICS_API_URL to the Explorer analytics endpoint.",
-      )
-
-    if not isinstance(sql, str) or not sql.strip():
-        return failure("MISSING_SQL", "sql field is required")
+            "INVALID_COHORT_NAME",
+            "name must start with a letter and contain only letters, digits, '_' or '-' (max 64).",
+        )
+    if not isinstance(where_sql, str) or not where_sql.strip():
+        return failure("MISSING_WHERE_SQL", "where_sql is required")
 
-    cleaned, sql_error = validate_read_only_sql(sql)
+    cohort_name = name.strip()
+    predicate = where_sql.strip()
+    _, sql_error = validate_read_only_sql(f"SELECT * FROM {DATA_TABLE} WHERE {predicate}")
     if sql_error:
         return failure("UNSAFE_SQL", sql_error)
-    if cleaned is None:
-        return failure("UNSAFE_SQL", "Invalid SQL query")
 
-    bounded_limit = normalize_limit(limit)
     timeout = normalize_timeout_ms(timeout_ms)
+    if not Path(PARQUET_PATH).exists():
+        return failure(
+            "DATASET_NOT_FOUND",
+            "Dataset parquet file was not found.",
+            {"path": str(Path(PARQUET_PATH))},
+        )
 
-    payload_bytes = json.dumps(
+    start = time.perf_counter()
+    try:
+        cohort, timeout_enforced = await asyncio.to_thread(
+            cohort_store.define, session_key(ctx), cohort_name, predicate, timeout
+        )
+    except ValueError as exc:
+        return failure("COHORT_TOO_LARGE", str(exc))
+    except Exception as exc:
+        code = "QUERY_TIMEOUT" if is_timeout_error(exc) else "COHORT_QUERY_FAILED"
+        message = (
+            "Cohort definition exceeded the configured timeout."
+            if code == "QUERY_TIMEOUT"
+            else "Failed to materialize cohort."
+        )
+        return failure(code, message, {"reason": str(exc)})
+
+    elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+    return success(
+        cohort.describe(),
         {
-            "sql": cleaned,
-            "limit": bounded_limit,
-        }
-    ).encode("utf-8")
-
-    request = Request(
-        ANALYTICS_API_URL,
-        data=payload_bytes,
-        headers={
-            "Content-Type": "application/json",
-            "x-bks-analytics-key": ANALYTICS_API_KEY,
+            "ttlSeconds": cohort_store.ttl_seconds,
+            "maxBytes": cohort_store.max_bytes,
+            "timeoutMs": timeout,
+            "timeoutEnforced": timeout_enforced,
+            "durationMs": elapsed_ms,
         },
-        method="POST",
     )
 
-    started_at = time.perf_counter()
 
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures, probing again after a cooldown.
+
+    closed -> open after `failure_threshold` consecutive failures; open -> half-open
+    once `reset_seconds` have passed, admitting a single trial request whose outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _state_locked(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def retry_after_seconds(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+            return round(max(0.0, remaining), 2)
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state_locked(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial that ended without an upstream verdict."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+@dataclass
+class CachedResponse:
+    payload: dict[str, Any]
+    fetched_at: float
+
+
+class AnalyticsCache:
+    """LRU response cache with stale-while-revalidate semantics.
+
+    Entries younger than `ttl_seconds` are fresh. Until `stale_seconds` beyond that
+    they are served immediately while a single background refresh runs.
+    """
+
+    def __init__(self, ttl_seconds: float, stale_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._revalidating: set[str] = set()
+
+    def lookup(self, key: str) -> tuple[CachedResponse | None, str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            age = now - entry.fetched_at
+            if age > self.ttl_seconds + self.stale_seconds:
+                del self._entries[key]
+                return None, "miss"
+            self._entries.move_to_end(key)
+            return entry, "hit" if age <= self.ttl_seconds else "stale"
+
+    def store(self, key: str, payload: dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = CachedResponse(payload, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def begin_revalidate(self, key: str) -> bool:
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def end_revalidate(self, key: str) -> None:
+        with self._lock:
+            self._revalidating.discard(key)
+
+
+analytics_cache = AnalyticsCache(
+    ANALYTICS_CACHE_TTL_SECONDS, ANALYTICS_CACHE_STALE_SECONDS, ANALYTICS_CACHE_MAX_ENTRIES
+)
+analytics_breaker = CircuitBreaker(ANALYTICS_BREAKER_FAILURES, ANALYTICS_BREAKER_RESET_SECONDS)
+analytics_background_tasks: set[asyncio.Task[Any]] = set()
+
+
+@dataclass
+class AnalyticsClient:
+    loop: asyncio.AbstractEventLoop
+    http: httpx.AsyncClient
+    slots: asyncio.Semaphore
+
+
+analytics_client: AnalyticsClient | None = None
+
+
+def get_analytics_client() -> AnalyticsClient:
+    """Pooled async client plus concurrency slots, bound to the running event loop."""
+    global analytics_client
+    loop = asyncio.get_running_loop()
+    if analytics_client is None or analytics_client.loop is not loop:
+        analytics_client = AnalyticsClient(
+            loop=loop,
+            # No client-side timeout: the asyncio.timeout in fetch_analytics bounds
+            # each request by the tool's timeout_ms, which may exceed httpx's 5 s default.
+            http=httpx.AsyncClient(
+                timeout=httpx.Timeout(None),
+                limits=httpx.Limits(
+                    max_connections=ANALYTICS_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANALYTICS_MAX_CONNECTIONS,
+                ),
+            ),
+            slots=asyncio.Semaphore(max(1, ANALYTICS_MAX_CONCURRENT)),
+        )
+    return analytics_client
+
+
+async def fetch_analytics(
+    cleaned: str,
+    bounded_limit: int,
+    timeout: int,
+) -> tuple[dict[str, Any], bool | None]:
+    """POST one query to the Explorer analytics endpoint over the pooled async client.
+
+    Waiting for a concurrency slot and the request itself share the tool timeout;
+    when it fires the in-flight request is cancelled. Returns the envelope plus
+    whether the failure (if any) means the upstream is unhealthy, which is what
+    the circuit breaker counts; None when the request never reached upstream.
+    """
+    client = get_analytics_client()
+    started_at = time.perf_counter()
+    sent = False
     try:
-        with urlopen(request, timeout=max(timeout / 1000, 1)) as response:
-            status_code = response.status
-            body = response.read().decode("utf-8")
-    except HTTPError as exc:
+        async with asyncio.timeout(max(timeout / 1000, 1)):
+            async with client.slots:
+                sent = True
+                response = await client.http.post(
+                    ANALYTICS_API_URL,
+                    json={"sql": cleaned, "limit": bounded_limit},
+                    headers={"x-bks-analytics-key": ANALYTICS_API_KEY or ""},
+                )
+    except TimeoutError as exc:
+        if not sent:
+            return failure(
+                "ANALYTICS_BUSY",
+                "Timed out waiting for a free analytics request slot.",
+                {"maxConcurrent": ANALYTICS_MAX_CONCURRENT},
+            ), None
+        return failure(
+            "QUERY_TIMEOUT",
+            "Analytics query exceeded the configured timeout.",
+            {"reason": str(exc) or "request cancelled at timeout"},
+        ), True
+    except httpx.TimeoutException as exc:
+        return failure(
+            "QUERY_TIMEOUT",
+            "Analytics query exceeded the configured timeout.",
+            {"reason": str(exc)},
+        ), True
+    except httpx.TransportError as exc:
+        return failure(
+            "ANALYTICS_PROXY_FAILED",
+            "Failed to reach analytics API.",
+            {"reason": str(exc)},
+        ), True
+    except Exception as exc:
+        return failure(
+            "ANALYTICS_PROXY_FAILED",
+            "Failed to execute analytics query.",
+            {"reason": str(exc)},
+        ), True
+
+    status_code = response.status_code
+    body = response.text
+    upstream_failed = status_code >= 500
+
+    if status_code >= 400:
         try:
-            parsed = json.loads(exc.read().decode("utf-8"))
+            parsed = json.loads(body)
         except Exception:
             parsed = None
 
         if isinstance(parsed, dict) and parsed.get("ok") is False:
-            return parsed
+            return parsed, upstream_failed
 
         return failure(
             "ANALYTICS_PROXY_FAILED",
-            f"Analytics API request failed with status {exc.code}.",
+            f"Analytics API request failed with status {status_code}.",
             {
-                "status": exc.code,
-                "reason": str(exc),
+                "status": status_code,
+                "reason": response.reason_phrase,
             },
-        )
-    except URLError as exc:
-        return failure(
-            "ANALYTICS_PROXY_FAILED",
-            "Failed to reach analytics API.",
-            {"reason": str(exc.reason)},
-        )
-    except Exception as exc:
-        code = "QUERY_TIMEOUT" if is_timeout_error(exc) else "ANALYTICS_PROXY_FAILED"
-        message = (
-            "Analytics query exceeded the configured timeout."
-            if code == "QUERY_TIMEOUT"
-            else "Failed to execute analytics query."
-        )
-        return failure(code, message, {"reason": str(exc)})
+        ), upstream_failed
 
     try:
         envelope = json.loads(body)
@@ -437,10 +1336,10 @@ def query_analytics(
                 "status": status_code,
                 "body": body[:500],
             },
-        )
+        ), True
 
     if not isinstance(envelope, dict):
-        return failure("ANALYTICS_PROXY_FAILED", "Analytics API response was not an object.")
+        return failure("ANALYTICS_PROXY_FAILED", "Analytics API response was not an object."), True
 
     elapsed_ms = round((time.perf_counter() - started_at) * 1000, 2)
 
@@ -453,34 +1352,216 @@ def query_analytics(
             "source": "analytics_proxy",
             "url": ANALYTICS_API_URL,
         }
-        return success(data, merged_meta)
+        return success(data, merged_meta), False
 
     if envelope.get("ok") is False and isinstance(envelope.get("error"), dict):
         return {
             "ok": False,
             "error": envelope["error"],
+        }, False
+
+    return failure("ANALYTICS_PROXY_FAILED", "Unexpected analytics API response envelope."), True
+
+
+async def fetch_analytics_guarded(
+    key: str,
+    cleaned: str,
+    bounded_limit: int,
+    timeout: int,
+) -> dict[str, Any]:
+    upstream_failed: bool | None = None
+    try:
+        payload, upstream_failed = await fetch_analytics(cleaned, bounded_limit, timeout)
+    finally:
+        if upstream_failed is None:
+            # Cancelled, or never got a request slot: no verdict on the upstream.
+            analytics_breaker.release_trial()
+        elif upstream_failed:
+            analytics_breaker.record_failure()
+        else:
+            analytics_breaker.record_success()
+    if payload.get("ok") is True:
+        analytics_cache.store(key, payload)
+    return payload
+
+
+async def revalidate_analytics(key: str, cleaned: str, bounded_limit: int, timeout: int) -> None:
+    try:
+        await fetch_analytics_guarded(key, cleaned, bounded_limit, timeout)
+    finally:
+        analytics_cache.end_revalidate(key)
+
+
+def referenced_tables(sql: str) -> set[str]:
+    parser = duckdb.connect(":memory:")
+    try:
+        names = parser.get_table_names(sql, qualified=True)
+    finally:
+        parser.close()
+    return {name.replace('"', "").lower() for name in names}
+
+
+def route_analytics_query(sql: str) -> tuple[str, list[str] | None]:
+    """Pick `local` when the query only reads the survey table this server already has.
+
+    Anything that references other tables (e.g. `events`) or cannot be parsed
+    locally is proxied to the Explorer analytics endpoint.
+    """
+    try:
+        tables = referenced_tables(sql)
+    except Exception:
+        return "analytics_proxy", None
+    if tables <= LOCAL_TABLE_NAMES:
+        return "local", sorted(tables)
+    return "analytics_proxy", sorted(tables)
+
+
+def with_cache_meta(
+    payload: dict[str, Any],
+    status: str,
+    entry: CachedResponse | None = None,
+    tables: list[str] | None = None,
+) -> dict[str, Any]:
+    if not payload.get("ok"):
+        return payload
+    cache_meta: dict[str, Any] = {"status": status}
+    if entry is not None:
+        cache_meta["ageSeconds"] = round(time.monotonic() - entry.fetched_at, 2)
+    meta = {
+        **(payload.get("meta") or {}),
+        "tables": tables,
+        "cache": cache_meta,
+        "circuit": analytics_breaker.state,
+    }
+    return {**payload, "meta": meta}
+
+
+@mcp.tool()
+async def query_analytics(
+    sql: str,
+    limit: int = DEFAULT_LIMIT,
+    timeout_ms: int = DEFAULT_TIMEOUT_MS,
+) -> dict[str, Any]:
+    """Run a bounded read-only analytics SQL query, locally or via the Explorer `/api/analytics` endpoint.
+
+    Queries that only touch `data` run on the local DuckDB path; others (e.g. over
+    `events`) are proxied. `meta.source` reports the route. Proxied responses are
+    cached briefly and served stale while a background refresh runs; repeated
+    upstream failures open a circuit breaker that fails fast.
+    """
+    if not isinstance(sql, str) or not sql.strip():
+        return failure("MISSING_SQL", "sql field is required")
+
+    cleaned, sql_error = validate_read_only_sql(sql)
+    if sql_error:
+        return failure("UNSAFE_SQL", sql_error)
+    if cleaned is None:
+        return failure("UNSAFE_SQL", "Invalid SQL query")
+
+    bounded_limit = normalize_limit(limit)
+    timeout = normalize_timeout_ms(timeout_ms)
+
+    route, tables = route_analytics_query(cleaned)
+    if route == "local":
+        payload = await asyncio.to_thread(execute_query, cleaned, bounded_limit, timeout)
+        if not payload.get("ok"):
+            return payload
+        return {
+            **payload,
+            "meta": {**payload["meta"], "source": "local", "tables": tables},
         }
 
-    return failure("ANALYTICS_PROXY_FAILED", "Unexpected analytics API response envelope.")
+    if not ANALYTICS_API_KEY:
+        return failure(
+          "ANALYTICS_KEY_MISSING",
+          "Set BKS_ANALYTICS_KEY on the MCP service to enable analytics queries.",
+      )
+
+    if not ANALYTICS_API_URL:
+        return failure(
+          "ANALYTICS_URL_MISSING",
+          "Set BKS_ANALYTICS_API_URL to the Explorer analytics endpoint.",
+      )
+
+    key = json.dumps([ANALYTICS_API_URL, cleaned, bounded_limit])
+
+    entry, freshness = analytics_cache.lookup(key)
+    if entry is not None and freshness == "hit":
+        return with_cache_meta(entry.payload, "hit", entry, tables)
+    if entry is not None:
+        if analytics_cache.begin_revalidate(key):
+            if analytics_breaker.allow():
+                task = asyncio.create_task(
+                    revalidate_analytics(key, cleaned, bounded_limit, timeout)
+                )
+                analytics_background_tasks.add(task)
+                task.add_done_callback(analytics_background_tasks.discard)
+            else:
+                analytics_cache.end_revalidate(key)
+        return with_cache_meta(entry.payload, "stale", entry, tables)
+
+    if not analytics_breaker.allow():
+        return failure(
+            "ANALYTICS_CIRCUIT_OPEN",
+            "Analytics API is failing; requests are short-circuited until it recovers.",
+            {"retryAfterSeconds": analytics_breaker.retry_after_seconds()},
+        )
+
+    payload = await fetch_analytics_guarded(key, cleaned, bounded_limit, timeout)
+    return with_cache_meta(payload, "miss", tables=tables)
 
 
 @mcp.tool()
-def get_stats(
+async def get_stats(
     column: str,
     top_n: int = 10,
     timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    cohort: str | None = None,
+    exact: bool | None = None,
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
-    """Get typed summary statistics for one column."""
+    """Get typed summary statistics for one column, optionally within a named cohort.
+
+    For categorical columns, `exact=false` uses HyperLogLog distinct counts and a
+    heavy-hitters sketch for top categories, with error bounds in the stats. When
+    `exact` is omitted, approximation is used if the estimated cardinality is large.
+    """
     if not isinstance(column, str) or not column.strip():
         return failure("MISSING_COLUMN", "column is required")
 
+    cohort_entry, cohort_error = await asyncio.to_thread(lookup_cohort, ctx, cohort)
+    if cohort_error:
+        return cohort_error
+
     requested_column = column.strip()
     bounded_top_n = normalize_top_n(top_n, default=10)
     timeout = normalize_timeout_ms(timeout_ms)
 
+    return await run_coalesced(
+        "get_stats",
+        {
+            "column": requested_column,
+            "topN": bounded_top_n,
+            "timeoutMs": timeout,
+            "cohort": cohort_entry.table if cohort_entry else None,
+            "exact": exact,
+        },
+        lambda: compute_stats(
+            requested_column, bounded_top_n, timeout, cohort_entry, exact
+        ),
+    )
+
+
+def compute_stats(
+    requested_column: str,
+    bounded_top_n: int,
+    timeout: int,
+    cohort: Cohort | None = None,
+    exact: bool | None = None,
+) -> dict[str, Any]:
     conn: DuckDBPyConnection | None = None
     try:
-        conn, timeout_enforced = get_connection(timeout)
+        conn, timeout_enforced = get_connection(timeout, cohort)
         columns = describe_columns(conn)
         try:
             column_name = resolve_column_name(requested_column, columns)
@@ -495,9 +1576,14 @@ def get_stats(
         column_info = next(item for item in columns if item["name"] == column_name)
         column_ident = quote_ident(column_name)
 
+        numeric = is_numeric_type(column_info["type"])
+        distinct_estimate_sql = (
+            "NULL" if numeric else f"approx_count_distinct({column_ident})::BIGINT"
+        )
         totals = conn.execute(
             f"SELECT COUNT(*)::BIGINT AS total, "
-            f"COUNT({column_ident})::BIGINT AS non_null "
+            f"COUNT({column_ident})::BIGINT AS non_null, "
+            f"{distinct_estimate_sql} AS distinct_estimate "
             f"FROM {DATA_TABLE}"
         ).fetchone()
         total = int(totals[0])
@@ -505,7 +1591,7 @@ def get_stats(
         nulls = total - non_null
         null_ratio = round((nulls / total), 6) if total else 0.0
 
-        if is_numeric_type(column_info["type"]):
+        if numeric:
             numeric_row = conn.execute(
                 f"SELECT AVG({column_ident}) AS mean, "
                 f"STDDEV_SAMP({column_ident}) AS stddev, "
@@ -528,27 +1614,21 @@ def get_stats(
             }
             logical_type = "numeric"
         else:
-            distinct_count = int(
-                conn.execute(
-                    f"SELECT COUNT(DISTINCT {column_ident})::BIGINT "
-                    f"FROM {DATA_TABLE} "
-                    f"WHERE {column_ident} IS NOT NULL"
-                ).fetchone()[0]
-            )
-            top_rows = conn.execute(
-                f"SELECT CAST({column_ident} AS VARCHAR) AS value, "
-                f"COUNT(*)::BIGINT AS count "
+            distinct_estimate = int(totals[2] or 0)
+            use_exact = use_exact_counts(exact, distinct_estimate)
+            top_rows, exact_distinct = top_value_counts(
+                conn,
+                f"SELECT CAST({column_ident} AS VARCHAR) AS value "
                 f"FROM {DATA_TABLE} "
-                f"WHERE {column_ident} IS NOT NULL "
-                f"GROUP BY 1 "
-                f"ORDER BY count DESC, value ASC "
-                f"LIMIT ?",
-                [bounded_top_n],
-            ).fetchall()
+                f"WHERE {column_ident} IS NOT NULL",
+                "value",
+                bounded_top_n,
+                use_exact,
+            )
+            distinct_count = exact_distinct if exact_distinct is not None else distinct_estimate
 
             top_categories = []
-            for value, count in top_rows:
-                count_int = int(count)
+            for value, count_int in top_rows:
                 top_categories.append(
                     {
                         "value": to_json_value(value),
@@ -564,7 +1644,11 @@ def get_stats(
                 "topCategories": top_categories,
                 "topN": bounded_top_n,
                 "truncated": distinct_count > len(top_categories),
+                "exact": use_exact,
             }
+            if not use_exact:
+                stats["distinctCountError"] = distinct_count_error(distinct_count)
+                stats["topCategoriesError"] = top_k_error(non_null, bounded_top_n)
             logical_type = "categorical"
 
         return success(
@@ -581,8 +1665,11 @@ def get_stats(
             {
                 "timeoutMs": timeout,
                 "timeoutEnforced": timeout_enforced,
+                **cohort_meta(cohort),
             },
         )
+    except CohortExpiredError as exc:
+        return cohort_not_found(exc.args[0])
     except FileNotFoundError:
         return failure(
             "DATASET_NOT_FOUND",
@@ -603,27 +1690,72 @@ def get_stats(
 
 
 @mcp.tool()
-def cross_tabulate(
+async def cross_tabulate(
     x_column: str,
     y_column: str,
     top_n: int = DEFAULT_TOP_N,
     include_nulls: bool = False,
     timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    cohort: str | None = None,
+    exact: bool | None = None,
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
-    """Build a cross-tab matrix with marginal totals for two columns."""
+    """Build a cross-tab matrix with marginal totals for two columns, optionally within a named cohort.
+
+    `exact=false` approximates per-axis distinct counts (HyperLogLog) and picks top
+    values with a heavy-hitters sketch; when omitted, each axis is approximated only
+    if its estimated cardinality is large. Matrix cell counts are always exact.
+    """
     if not isinstance(x_column, str) or not x_column.strip():
         return failure("MISSING_X_COLUMN", "x_column is required")
     if not isinstance(y_column, str) or not y_column.strip():
         return failure("MISSING_Y_COLUMN", "y_column is required")
 
+    cohort_entry, cohort_error = await asyncio.to_thread(lookup_cohort, ctx, cohort)
+    if cohort_error:
+        return cohort_error
+
     requested_x = x_column.strip()
     requested_y = y_column.strip()
     bounded_top_n = normalize_top_n(top_n)
     timeout = normalize_timeout_ms(timeout_ms)
+    include_nulls = bool(include_nulls)
+
+    return await run_coalesced(
+        "cross_tabulate",
+        {
+            "xColumn": requested_x,
+            "yColumn": requested_y,
+            "topN": bounded_top_n,
+            "includeNulls": include_nulls,
+            "timeoutMs": timeout,
+            "cohort": cohort_entry.table if cohort_entry else None,
+            "exact": exact,
+        },
+        lambda: compute_cross_tab(
+            requested_x,
+            requested_y,
+            bounded_top_n,
+            include_nulls,
+            timeout,
+            cohort_entry,
+            exact,
+        ),
+    )
 
+
+def compute_cross_tab(
+    requested_x: str,
+    requested_y: str,
+    bounded_top_n: int,
+    include_nulls: bool,
+    timeout: int,
+    cohort: Cohort | None = None,
+    exact: bool | None = None,
+) -> dict[str, Any]:
     conn: DuckDBPyConnection | None = None
     try:
-        conn, timeout_enforced = get_connection(timeout)
+        conn, timeout_enforced = get_connection(timeout, cohort)
         columns = describe_columns(conn)
 
         try:
@@ -659,30 +1791,22 @@ def cross_tabulate(
 
         distinct_row = conn.execute(
             "WITH base AS (" + base_sql + ") "
-            "SELECT COUNT(DISTINCT x_value)::BIGINT, "
-            "COUNT(DISTINCT y_value)::BIGINT, "
+            "SELECT approx_count_distinct(x_value)::BIGINT, "
+            "approx_count_distinct(y_value)::BIGINT, "
             "COUNT(*)::BIGINT FROM base"
         ).fetchone()
-        x_distinct = int(distinct_row[0])
-        y_distinct = int(distinct_row[1])
         base_row_count = int(distinct_row[2])
 
-        x_rows = conn.execute(
-            "WITH base AS (" + base_sql + ") "
-            "SELECT x_value, COUNT(*)::BIGINT AS count "
-            "FROM base GROUP BY 1 "
-            "ORDER BY count DESC, x_value ASC "
-            "LIMIT ?",
-            [bounded_top_n],
-        ).fetchall()
-        y_rows = conn.execute(
-            "WITH base AS (" + base_sql + ") "
-            "SELECT y_value, COUNT(*)::BIGINT AS count "
-            "FROM base GROUP BY 1 "
-            "ORDER BY count DESC, y_value ASC "
-            "LIMIT ?",
-            [bounded_top_n],
-        ).fetchall()
+        x_exact = use_exact_counts(exact, int(distinct_row[0]))
+        y_exact = use_exact_counts(exact, int(distinct_row[1]))
+        x_rows, x_exact_distinct = top_value_counts(
+            conn, base_sql, "x_value", bounded_top_n, x_exact
+        )
+        y_rows, y_exact_distinct = top_value_counts(
+            conn, base_sql, "y_value", bounded_top_n, y_exact
+        )
+        x_distinct = x_exact_distinct if x_exact else int(distinct_row[0])
+        y_distinct = y_exact_distinct if y_exact else int(distinct_row[1])
 
         x_values = [to_json_value(row[0]) for row in x_rows]
         y_values = [to_json_value(row[0]) for row in y_rows]
@@ -747,10 +1871,31 @@ def cross_tabulate(
                 "yDistinctCount": y_distinct,
                 "xTruncated": x_distinct > len(x_values),
                 "yTruncated": y_distinct > len(y_values),
+                "xExact": x_exact,
+                "yExact": y_exact,
+                **(
+                    {}
+                    if x_exact
+                    else {
+                        "xDistinctCountError": distinct_count_error(x_distinct),
+                        "xTopValuesError": top_k_error(base_row_count, bounded_top_n),
+                    }
+                ),
+                **(
+                    {}
+                    if y_exact
+                    else {
+                        "yDistinctCountError": distinct_count_error(y_distinct),
+                        "yTopValuesError": top_k_error(base_row_count, bounded_top_n),
+                    }
+                ),
                 "timeoutMs": timeout,
                 "timeoutEnforced": timeout_enforced,
+                **cohort_meta(cohort),
             },
         )
+    except CohortExpiredError as exc:
+        return cohort_not_found(exc.args[0])
     except FileNotFoundError:
         return failure(
             "DATASET_NOT_FOUND",
@@ -770,6 +1915,219 @@ def cross_tabulate(
             conn.close()
 
 
+@mcp.tool()
+async def get_distribution(
+    column: str,
+    bins: int = DEFAULT_BINS,
+    quantiles: list[float] | None = None,
+    binning: str = "equal_width",
+    group_by: str | None = None,
+    timeout_ms: int = DEFAULT_TIMEOUT_MS,
+    cohort: str | None = None,
+    ctx: Context | None = None,
+) -> dict[str, Any]:
+    """Get a histogram plus arbitrary quantiles for a numeric column in one pass.
+
+    `binning` is `equal_width` or `quantile`. With `group_by` (a low-cardinality
+    column), each group gets its own histogram on the shared bin edges. Results are
+    backed by mergeable quantile sketches cached per dataset version.
+    """
+    if not isinstance(column, str) or not column.strip():
+        return failure("MISSING_COLUMN", "column is required")
+    if binning not in BINNING_MODES:
+        return failure(
+            "INVALID_BINNING",
+            f"binning must be one of: {', '.join(sorted(BINNING_MODES))}",
+        )
+    try:
+        quantile_list = normalize_quantiles(quantiles)
+    except (TypeError, ValueError) as exc:
+        return failure("INVALID_QUANTILES", str(exc))
+
+    cohort_entry, cohort_error = await asyncio.to_thread(lookup_cohort, ctx, cohort)
+    if cohort_error:
+        return cohort_error
+
+    requested_column = column.strip()
+    requested_group = group_by.strip() if isinstance(group_by, str) and group_by.strip() else None
+    bounded_bins = normalize_limit(bins, default=DEFAULT_BINS, maximum=MAX_BINS)
+    timeout = normalize_timeout_ms(timeout_ms)
+
+    return await run_coalesced(
+        "get_distribution",
+        {
+            "column": requested_column,
+            "bins": bounded_bins,
+            "quantiles": quantile_list,
+            "binning": binning,
+            "groupBy": requested_group,
+            "timeoutMs": timeout,
+            "cohort": cohort_entry.table if cohort_entry else None,
+        },
+        lambda: compute_distribution(
+            requested_column,
+            bounded_bins,
+            quantile_list,
+            binning,
+            requested_group,
+            timeout,
+            cohort_entry,
+        ),
+    )
+
+
+def compute_distribution(
+    requested_column: str,
+    bounded_bins: int,
+    quantile_list: list[float],
+    binning: str,
+    requested_group: str | None,
+    timeout: int,
+    cohort: Cohort | None = None,
+) -> dict[str, Any]:
+    conn: DuckDBPyConnection | None = None
+    try:
+        conn, timeout_enforced = get_connection(timeout, cohort)
+        columns = describe_columns(conn)
+        try:
+            column_name = resolve_column_name(requested_column, columns)
+            group_name = (
+                resolve_column_name(requested_group, columns) if requested_group else None
+            )
+        except KeyError as exc:
+            return failure("COLUMN_NOT_FOUND", f"Column '{exc.args[0]}' was not found.")
+        except ValueError as exc:
+            return failure("AMBIGUOUS_COLUMN", str(exc))
+
+        column_info = next(item for item in columns if item["name"] == column_name)
+        if not is_numeric_type(column_info["type"]):
+            return failure(
+                "NOT_NUMERIC_COLUMN",
+                f"Column '{column_name}' is {column_info['type']}; get_distribution needs a numeric column.",
+            )
+
+        column_ident = quote_ident(column_name)
+        group_expr = (
+            f"COALESCE(CAST({quote_ident(group_name)} AS VARCHAR), '{NULL_LABEL}')"
+            if group_name
+            else "NULL"
+        )
+
+        present = (
+            f"{column_ident} IS NOT NULL AND NOT isnan(CAST({column_ident} AS DOUBLE))"
+        )
+
+        def build() -> dict[str, QuantileSketch]:
+            if group_name:
+                # Refuse high-cardinality groupings before aggregating any values.
+                group_count = conn.execute(
+                    f"SELECT COUNT(*) FROM ("
+                    f"SELECT DISTINCT {group_expr} FROM {DATA_TABLE} WHERE {present} "
+                    f"LIMIT {MAX_DISTRIBUTION_GROUPS + 1})"
+                ).fetchone()[0]
+                if group_count > MAX_DISTRIBUTION_GROUPS:
+                    raise ValueError(
+                        f"group_by column has more than {MAX_DISTRIBUTION_GROUPS} groups"
+                    )
+            rows = conn.execute(
+                f"SELECT {group_expr} AS group_value, "
+                f"CAST({column_ident} AS DOUBLE) AS value, "
+                f"COUNT(*)::BIGINT AS count "
+                f"FROM {DATA_TABLE} "
+                f"WHERE {present} "
+                f"GROUP BY 1, 2"
+            ).fetchall()
+            value_counts: dict[str, list[tuple[float, int]]] = {}
+            for group_value, value, count in rows:
+                value_counts.setdefault(group_value, []).append((value, int(count)))
+            return {
+                group_value: QuantileSketch.from_value_counts(pairs)
+                for group_value, pairs in value_counts.items()
+            }
+
+        cache_key = json.dumps(
+            [
+                dataset_fingerprint(),
+                cohort.table if cohort else None,
+                column_name,
+                group_name,
+            ]
+        )
+        try:
+            sketches, cache_hit = cached_sketches(cache_key, build)
+        except ValueError as exc:
+            return failure("TOO_MANY_GROUPS", str(exc))
+
+        overall = QuantileSketch([], minimum=None, maximum=None)
+        for sketch in sketches.values():
+            overall = overall.merge(sketch)
+
+        if overall.count == 0:
+            edges: list[float] = []
+        elif overall.minimum == overall.maximum:
+            # A zero-width range is one bin, not `bins` collapsed edges.
+            edges = [overall.minimum, overall.maximum]
+        elif binning == "quantile":
+            edges = sorted(
+                {overall.quantile(index / bounded_bins) for index in range(bounded_bins + 1)}
+            )
+        else:
+            low, high = overall.minimum, overall.maximum
+            edges = [
+                low + (high - low) * index / bounded_bins for index in range(bounded_bins)
+            ] + [high]
+        if len(edges) == 1:
+            edges = edges * 2
+
+        groups = [
+            {"group": to_json_value(group_value), **distribution_summary(sketch, quantile_list, edges)}
+            for group_value, sketch in sorted(sketches.items(), key=lambda item: str(item[0]))
+        ] if group_name else []
+
+        return success(
+            {
+                "column": column_name,
+                "columnType": column_info["type"],
+                "groupBy": group_name,
+                "binning": binning,
+                "binEdges": edges,
+                "overall": distribution_summary(overall, quantile_list, edges),
+                "groups": groups,
+            },
+            {
+                "bins": bounded_bins,
+                "sketch": {
+                    "exact": overall.exact,
+                    "centroids": len(overall.centroids),
+                    "maxCentroids": SKETCH_MAX_CENTROIDS,
+                },
+                "cacheHit": cache_hit,
+                "timeoutMs": timeout,
+                "timeoutEnforced": timeout_enforced,
+                **cohort_meta(cohort),
+            },
+        )
+    except CohortExpiredError as exc:
+        return cohort_not_found(exc.args[0])
+    except FileNotFoundError:
+        return failure(
+            "DATASET_NOT_FOUND",
+            "Dataset parquet file was not found.",
+            {"path": str(Path(PARQUET_PATH))},
+        )
+    except Exception as exc:
+        code = "QUERY_TIMEOUT" if is_timeout_error(exc) else "DISTRIBUTION_QUERY_FAILED"
+        message = (
+            "Distribution request exceeded the configured timeout."
+            if code == "QUERY_TIMEOUT"
+            else "Failed to compute column distribution."
+        )
+        return failure(code, message, {"reason": str(exc)})
+    finally:
+        if conn is not None:
+            conn.close()
+
+
 @mcp.tool()
 def search_columns(query: str, limit: int = 25) -> dict[str, Any]:
     """Search for columns by case-insensitive name match."""
@@ -0,0 +1,97 @@
+"""Shared fixtures for the MCP server tests, including a local stand-in analytics server."""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
+
+import server  # noqa: E402
+
+
+class StandInAnalytics:
+    """A local HTTP server speaking the Explorer `/api/analytics` envelope.
+
+    `status`, `payload` and `delay_seconds` can be changed between calls; every
+    POSTed body is recorded in `requests`.
+    """
+
+    def __init__(self) -> None:
+        self.status = 200
+        self.payload: dict[str, Any] = {"ok": True, "data": {"columns": ["n"], "rows": [[1]]}}
+        self.delay_seconds = 0.0
+        self.requests: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stand_in._lock:
+                    stand_in.requests.append(body)
+                    status, payload, delay = stand_in.status, stand_in.payload, stand_in.delay_seconds
+                time.sleep(delay)
+                encoded = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("content-type", "application/json")
+                    self.send_header("content-length", str(len(encoded)))
+                    self.end_headers()
+                    self.wfile.write(encoded)
+                except OSError:
+                    pass  # the client gave up (timeout tests)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/survey/api/analytics"
+
+    def respond(self, rows: list[list[Any]]) -> None:
+        with self._lock:
+            self.status = 200
+            self.payload = {"ok": True, "data": {"columns": ["n"], "rows": rows}}
+
+    def fail(self, status: int = 503) -> None:
+        with self._lock:
+            self.status = status
+            self.payload = {"error": "upstream unavailable"}
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stand_in(monkeypatch: pytest.MonkeyPatch):
+    """Point query_analytics at a stand-in server with a fresh cache, breaker and client."""
+    analytics = StandInAnalytics()
+    analytics.start()
+    monkeypatch.setattr(server, "ANALYTICS_API_URL", analytics.url)
+    monkeypatch.setattr(server, "ANALYTICS_API_KEY", "test-key")
+    monkeypatch.setattr(server, "analytics_cache", server.AnalyticsCache(30, 300, 16))
+    monkeypatch.setattr(server, "analytics_breaker", server.CircuitBreaker(2, 30))
+    monkeypatch.setattr(server, "analytics_client", None)
+    try:
+        yield analytics
+    finally:
+        analytics.stop()
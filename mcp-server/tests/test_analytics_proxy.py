@@ -0,0 +1,188 @@
+"""Tests for the query_analytics proxy: circuit breaker and stale-while-revalidate cache."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import server
+
+EVENTS_SQL = "SELECT COUNT(*) AS n FROM events"
+
+
+async def settle_background_tasks() -> None:
+    while server.analytics_background_tasks:
+        await asyncio.gather(*list(server.analytics_background_tasks))
+
+
+def test_circuit_breaker_closed_open_half_open() -> None:
+    breaker = server.CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after_seconds() > 0
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial request at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_opens_and_recovers_against_stand_in(
+    stand_in, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "analytics_breaker", server.CircuitBreaker(2, 0.2))
+    stand_in.fail(503)
+
+    async def scenario() -> None:
+        for _ in range(2):
+            result = await server.query_analytics(EVENTS_SQL)
+            assert result["error"]["code"] == "ANALYTICS_PROXY_FAILED"
+        short_circuited = await server.query_analytics(EVENTS_SQL)
+        assert short_circuited["error"]["code"] == "ANALYTICS_CIRCUIT_OPEN"
+        assert len(stand_in.requests) == 2
+
+        stand_in.respond([[7]])
+        await asyncio.sleep(0.25)
+        recovered = await server.query_analytics(EVENTS_SQL)
+        assert recovered["ok"] and recovered["data"]["rows"] == [[7]]
+        assert recovered["meta"]["circuit"] == "closed"
+        assert len(stand_in.requests) == 3
+
+    asyncio.run(scenario())
+
+
+def test_stale_while_revalidate(stand_in, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(server, "analytics_cache", server.AnalyticsCache(0.1, 60, 16))
+    stand_in.respond([[1]])
+
+    async def scenario() -> None:
+        first = await server.query_analytics(EVENTS_SQL)
+        assert first["meta"]["cache"]["status"] == "miss"
+        hit = await server.query_analytics(EVENTS_SQL)
+        assert hit["meta"]["cache"]["status"] == "hit"
+        assert len(stand_in.requests) == 1
+
+        stand_in.respond([[2]])
+        await asyncio.sleep(0.15)
+        stale = await server.query_analytics(EVENTS_SQL)
+        assert stale["meta"]["cache"]["status"] == "stale"
+        assert stale["data"]["rows"] == [[1]]
+        await settle_background_tasks()
+        assert len(stand_in.requests) == 2
+
+        refreshed = await server.query_analytics(EVENTS_SQL)
+        assert refreshed["meta"]["cache"]["status"] == "hit"
+        assert refreshed["data"]["rows"] == [[2]]
+
+    asyncio.run(scenario())
+
+
+def test_stale_entries_are_served_while_circuit_is_open(
+    stand_in, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "analytics_cache", server.AnalyticsCache(0.05, 60, 16))
+    monkeypatch.setattr(server, "analytics_breaker", server.CircuitBreaker(1, 60))
+
+    async def scenario() -> None:
+        await server.query_analytics(EVENTS_SQL)
+        stand_in.fail(502)
+        await server.query_analytics("SELECT COUNT(*) AS n FROM events WHERE 1 = 1")
+        assert server.analytics_breaker.state == "open"
+
+        await asyncio.sleep(0.1)
+        degraded = await server.query_analytics(EVENTS_SQL)
+        assert degraded["ok"] and degraded["data"]["rows"] == [[1]]
+        assert degraded["meta"]["cache"]["status"] == "stale"
+        assert degraded["meta"]["circuit"] == "open"
+        await settle_background_tasks()
+        assert len(stand_in.requests) == 2  # no refresh attempted while open
+
+    asyncio.run(scenario())
+
+
+def test_slow_upstream_is_bounded_by_the_tool_timeout(stand_in) -> None:
+    # Slower than httpx's 5 s default read timeout, well inside timeout_ms.
+    stand_in.respond([[3]])
+    stand_in.delay_seconds = 5.5
+
+    async def scenario() -> None:
+        slow = await server.query_analytics(EVENTS_SQL, timeout_ms=20000)
+        assert slow["ok"], slow
+        assert slow["data"]["rows"] == [[3]]
+
+        timed_out = await server.query_analytics(
+            "SELECT COUNT(*) AS n FROM events WHERE 2 = 2", timeout_ms=1000
+        )
+        assert timed_out["error"]["code"] == "QUERY_TIMEOUT"
+        assert timed_out["error"]["details"]["reason"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_half_open_trial_is_released(
+    stand_in, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "analytics_breaker", server.CircuitBreaker(1, 0.05))
+    stand_in.fail(503)
+
+    async def scenario() -> None:
+        await server.query_analytics(EVENTS_SQL)
+        await asyncio.sleep(0.1)
+        assert server.analytics_breaker.state == "half_open"
+
+        stand_in.respond([[1]])
+        stand_in.delay_seconds = 2
+        trial = asyncio.create_task(
+            server.query_analytics("SELECT COUNT(*) AS n FROM events WHERE 3 = 3")
+        )
+        await asyncio.sleep(0.3)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        assert server.analytics_breaker.state == "half_open"
+        assert server.analytics_breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_busy_half_open_trial_does_not_close_the_circuit(
+    stand_in, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "analytics_breaker", server.CircuitBreaker(1, 0.05))
+    monkeypatch.setattr(server, "ANALYTICS_MAX_CONCURRENT", 1)
+    stand_in.fail(503)
+
+    async def scenario() -> None:
+        await server.query_analytics(EVENTS_SQL)
+        await asyncio.sleep(0.1)
+
+        slots = server.get_analytics_client().slots
+        await slots.acquire()
+        try:
+            busy = await server.query_analytics(
+                "SELECT COUNT(*) AS n FROM events WHERE 4 = 4", timeout_ms=1000
+            )
+        finally:
+            slots.release()
+        assert busy["error"]["code"] == "ANALYTICS_BUSY"
+        assert len(stand_in.requests) == 1
+
+        assert server.analytics_breaker.state == "half_open"
+        assert server.analytics_breaker.allow()
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""Tests for in-flight coalescing of identical tool calls."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import server
+
+
+def test_single_flight_coalesces_concurrent_callers() -> None:
+    flight = server.SingleFlight()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def work() -> dict[str, int]:
+        calls.append(1)
+        release.wait(5)
+        return {"value": 42}
+
+    async def scenario() -> list[tuple[dict[str, int], bool]]:
+        waiters = [asyncio.create_task(flight.run("key", work)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [payload for payload, _ in results] == [{"value": 42}] * 3
+    assert sorted(coalesced for _, coalesced in results) == [False, True, True]
+
+
+def test_get_stats_marks_coalesced_calls() -> None:
+    async def scenario() -> list[dict]:
+        return await asyncio.gather(*(server.get_stats("biomale") for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert all(result["ok"] for result in results)
+    assert len({str(result["data"]) for result in results}) == 1
+    assert [result["meta"]["coalesced"] for result in results].count(False) == 1
+
+
+def test_cross_tabulate_coalesces_only_identical_arguments() -> None:
+    async def scenario() -> list[dict]:
+        return await asyncio.gather(
+            server.cross_tabulate("biomale", "politics"),
+            server.cross_tabulate("biomale", "politics"),
+            server.cross_tabulate("biomale", "politics", top_n=3),
+        )
+
+    same, joined, different = asyncio.run(scenario())
+    assert same["ok"] and different["ok"]
+    assert same["data"] == joined["data"]
+    assert sorted([same["meta"]["coalesced"], joined["meta"]["coalesced"]]) == [False, True]
+    assert different["meta"]["coalesced"] is False
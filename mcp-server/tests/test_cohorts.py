@@ -0,0 +1,94 @@
+"""Tests for named cohorts: session isolation and database lifecycle."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+def session_ctx(session_id: str) -> SimpleNamespace:
+    request = SimpleNamespace(headers={"mcp-session-id": session_id})
+    return SimpleNamespace(request_context=SimpleNamespace(request=request))
+
+
+@pytest.fixture
+def store(monkeypatch: pytest.MonkeyPatch) -> server.CohortStore:
+    fresh = server.CohortStore(ttl_seconds=600, max_bytes=64 * 1024 * 1024)
+    monkeypatch.setattr(server, "cohort_store", fresh)
+    return fresh
+
+
+def test_cohort_tables_are_invisible_to_other_sessions(store: server.CohortStore) -> None:
+    alice, bob = session_ctx("alice"), session_ctx("bob")
+
+    async def scenario() -> None:
+        defined = await server.define_cohort("men", "biomale = 1", ctx=alice)
+        assert defined["ok"], defined
+        await server.define_cohort("women", "biomale = 0", ctx=bob)
+        alice_table = store.get("alice", "men").table
+
+        own = await server.query_data(
+            f"SELECT COUNT(*) AS n FROM {alice_table}", cohort="men", ctx=alice
+        )
+        assert own["ok"], own
+        assert own["data"]["rows"][0][0] == defined["data"]["rowCount"]
+
+        leaked = await server.query_data(
+            f"SELECT COUNT(*) AS n FROM {alice_table}", cohort="women", ctx=bob
+        )
+        assert not leaked["ok"]
+        listed = await server.query_data(
+            "SELECT table_name FROM duckdb_tables()", cohort="women", ctx=bob
+        )
+        assert alice_table not in str(listed["data"]["rows"])
+
+    asyncio.run(scenario())
+
+
+def test_session_database_is_closed_once_its_cohorts_are_gone(
+    store: server.CohortStore,
+) -> None:
+    async def scenario() -> None:
+        ctx = session_ctx("carol")
+        await server.define_cohort("everyone", "1 = 1", ctx=ctx)
+        assert "carol" in store._databases
+
+        store.get("carol", "everyone").expires_at = 0
+        missing = await server.get_stats("biomale", cohort="everyone", ctx=ctx)
+        assert missing["error"]["code"] == "COHORT_NOT_FOUND"
+        assert "carol" not in store._databases
+
+        failed = await server.define_cohort("broken", "no_such_column = 1", ctx=ctx)
+        assert failed["error"]["code"] == "COHORT_QUERY_FAILED"
+        assert "carol" not in store._databases
+
+    asyncio.run(scenario())
+
+
+def test_cohort_evicted_after_lookup_reports_not_found(
+    store: server.CohortStore, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ctx = session_ctx("dave")
+
+    async def scenario() -> None:
+        await server.define_cohort("everyone", "1 = 1", ctx=ctx)
+        stale = store.get("dave", "everyone")
+        stale.expires_at = 0
+        assert store.get("dave", "everyone") is None
+        assert "dave" not in store._databases
+
+        # The cohort disappears between lookup_cohort and get_connection.
+        monkeypatch.setattr(server, "lookup_cohort", lambda ctx, cohort: (stale, None))
+        for result in (
+            await server.query_data("SELECT COUNT(*) FROM data", cohort="everyone", ctx=ctx),
+            await server.get_stats("biomale", cohort="everyone", ctx=ctx),
+            await server.cross_tabulate("biomale", "politics", cohort="everyone", ctx=ctx),
+            await server.get_distribution("age", cohort="everyone", ctx=ctx),
+        ):
+            assert result["error"]["code"] == "COHORT_NOT_FOUND", result
+        assert "dave" not in store._databases
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+"""Tests for get_distribution binning edge cases."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import duckdb
+import pytest
+
+import server
+
+
+@pytest.fixture
+def small_dataset(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "small.parquet"
+    conn = duckdb.connect(":memory:")
+    try:
+        conn.execute(
+            f"COPY (SELECT * FROM (VALUES "
+            f"(4.0, 1.0, 'a'), (4.0, 2.0, 'b'), (4.0, 'NaN'::DOUBLE, 'c'), (NULL, 3.0, 'd'), "
+            f"(4.0, 4.0, 'e')"
+            f") AS t(constant, spread, label)) TO '{path}' (FORMAT PARQUET)"
+        )
+    finally:
+        conn.close()
+    monkeypatch.setattr(server, "PARQUET_PATH", str(path))
+    return path
+
+
+def test_zero_width_range_is_a_single_bin(small_dataset: Path) -> None:
+    result = asyncio.run(server.get_distribution("constant", bins=5))
+    assert result["ok"], result
+    assert result["data"]["binEdges"] == [4.0, 4.0]
+    assert result["data"]["overall"]["histogram"] == [{"low": 4.0, "high": 4.0, "count": 4}]
+
+
+def test_nan_values_are_excluded_before_binning(small_dataset: Path) -> None:
+    result = asyncio.run(server.get_distribution("spread", bins=3))
+    assert result["ok"], result
+    overall = result["data"]["overall"]
+    assert overall["count"] == 4
+    assert (overall["min"], overall["max"]) == (1.0, 4.0)
+    assert result["data"]["binEdges"] == [1.0, 2.0, 3.0, 4.0]
+    assert [bucket["count"] for bucket in overall["histogram"]] == [1, 1, 2]
+
+
+def test_group_cap_is_checked_before_aggregating(
+    small_dataset: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(server, "MAX_DISTRIBUTION_GROUPS", 3)
+    refused = asyncio.run(server.get_distribution("spread", group_by="label"))
+    assert refused["error"]["code"] == "TOO_MANY_GROUPS"
+    assert "more than 3 groups" in refused["error"]["message"]
+
+    # The NaN row's label does not count towards the cap.
+    monkeypatch.setattr(server, "MAX_DISTRIBUTION_GROUPS", 4)
+    allowed = asyncio.run(server.get_distribution("spread", group_by="label"))
+    assert allowed["ok"], allowed
+    assert [group["group"] for group in allowed["data"]["groups"]] == ["a", "b", "d", "e"]
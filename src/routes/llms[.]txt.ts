@@ -20,10 +20,20 @@ const MCP_TOOLS = [
     name: "cross_tabulate",
     description: "Builds a bounded cross-tab matrix for two columns.",
   },
+  {
+    name: "get_distribution",
+    description:
+      "Returns a histogram and arbitrary quantiles for a numeric column, optionally per group.",
+  },
   {
     name: "query_data",
     description: "Executes a bounded read-only DuckDB SQL query.",
   },
+  {
+    name: "define_cohort",
+    description:
+      "Materializes a named row filter once; pass `cohort` to get_stats, cross_tabulate or query_data to reuse it.",
+  },
   {
     name: "search_columns",
     description: "Finds columns by case-insensitive substring match.",